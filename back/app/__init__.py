@@ -76,7 +76,60 @@ def create_app(config_name=None):
     
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-change-in-production')
-    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
+    # Short-lived access tokens; clients renew them through /api/auth/refresh
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(minutes=int(os.environ.get('ACCESS_TOKEN_MINUTES', 15)))
+    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=int(os.environ.get('REFRESH_TOKEN_DAYS', 30)))
+    
+    # Per-process cache of authenticated users (seconds, 0 disables)
+    app.config['PRINCIPAL_CACHE_TTL'] = int(os.environ.get('PRINCIPAL_CACHE_TTL', 60))
+    app.config['PRINCIPAL_CACHE_SIZE'] = int(os.environ.get('PRINCIPAL_CACHE_SIZE', 1024))
+    # Authorize from the role claim without loading the user (see role_required)
+    app.config['AUTH_TRUST_CLAIMS'] = os.environ.get('AUTH_TRUST_CLAIMS', '0') == '1'
+    # How often revocations written by other workers are picked up (seconds)
+    app.config['REVOCATION_SYNC_INTERVAL'] = int(os.environ.get('REVOCATION_SYNC_INTERVAL', 5))
+    # Each sync re-reads revocations this much older than the newest one seen,
+    # so rows committed out of order by slower transactions are not missed (seconds)
+    app.config['REVOCATION_SYNC_OVERLAP'] = int(os.environ.get('REVOCATION_SYNC_OVERLAP', 60))
+    # Teacher -> classroom access index, rebuilt at least this often (seconds)
+    app.config['ACCESS_INDEX_TTL'] = int(os.environ.get('ACCESS_INDEX_TTL', 300))
+    
+    # Keyset pagination: page size when ?limit is missing, and its upper bound
+    app.config['PAGE_SIZE_DEFAULT'] = int(os.environ.get('PAGE_SIZE_DEFAULT', 50))
+    app.config['PAGE_SIZE_MAX'] = int(os.environ.get('PAGE_SIZE_MAX', 500))
+    
+    # Whole-list responses are streamed from a server-side cursor in batches
+    app.config['STREAM_LISTS'] = os.environ.get('STREAM_LISTS', '1') == '1'
+    app.config['STREAM_BATCH_SIZE'] = int(os.environ.get('STREAM_BATCH_SIZE', 1000))
+    # Longest date range of the classroom attendance matrix (days)
+    app.config['ATTENDANCE_MATRIX_MAX_DAYS'] = int(os.environ.get('ATTENDANCE_MATRIX_MAX_DAYS', 366))
+    
+    # Delta sync: rows per table per response, how long fresh writes are held
+    # back (seconds) and the largest batch of offline writes accepted at once
+    app.config['SYNC_BATCH_SIZE'] = int(os.environ.get('SYNC_BATCH_SIZE', 1000))
+    app.config['SYNC_LAG_SECONDS'] = int(os.environ.get('SYNC_LAG_SECONDS', 5))
+    app.config['SYNC_PUSH_MAX_OPERATIONS'] = int(os.environ.get('SYNC_PUSH_MAX_OPERATIONS', 500))
+    # Bulk grade entry: largest batch, and whether valid rows are saved when others are rejected
+    app.config['GRADES_BULK_MAX_ROWS'] = int(os.environ.get('GRADES_BULK_MAX_ROWS', 1000))
+    app.config['GRADES_BULK_PARTIAL'] = os.environ.get('GRADES_BULK_PARTIAL', '0') == '1'
+    # Grade statistics cache: seconds before other workers' writes show up, entries, histogram bins
+    app.config['GRADE_STATS_CACHE_TTL'] = int(os.environ.get('GRADE_STATS_CACHE_TTL', 300))
+    app.config['GRADE_STATS_CACHE_SIZE'] = int(os.environ.get('GRADE_STATS_CACHE_SIZE', 4096))
+    app.config['GRADE_STATS_BINS'] = int(os.environ.get('GRADE_STATS_BINS', 10))
+    # Report cards: where PDFs are written, and worker processes of `flask reports generate-all`
+    app.config['REPORTS_DIR'] = os.path.abspath(os.environ.get('REPORTS_DIR', 'reports'))
+    app.config['REPORTS_WORKERS'] = int(os.environ.get('REPORTS_WORKERS', os.cpu_count() or 1))
+    
+    # Audit log writer: queued and written in batches unless AUDIT_ASYNC=0
+    app.config['AUDIT_ASYNC'] = os.environ.get('AUDIT_ASYNC', '1') == '1'
+    app.config['AUDIT_QUEUE_SIZE'] = int(os.environ.get('AUDIT_QUEUE_SIZE', 10000))
+    app.config['AUDIT_BATCH_SIZE'] = int(os.environ.get('AUDIT_BATCH_SIZE', 200))
+    app.config['AUDIT_FLUSH_INTERVAL'] = float(os.environ.get('AUDIT_FLUSH_INTERVAL', 1.0))
+    
+    # Password hashing: werkzeug method string and the bounded worker pool
+    app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    app.config['PASSWORD_POOL_WORKERS'] = int(os.environ.get('PASSWORD_POOL_WORKERS', os.cpu_count() or 2))
+    app.config['PASSWORD_POOL_MAX_PENDING'] = int(os.environ.get('PASSWORD_POOL_MAX_PENDING', 64))
+    app.config['PASSWORD_RETRY_AFTER'] = int(os.environ.get('PASSWORD_RETRY_AFTER', 1))
     
     # Initialize extensions
     db.init_app(app)
@@ -93,8 +146,10 @@ def create_app(config_name=None):
              'X-Requested-With', 
              'Cache-Control',
              'Accept',
-             'Origin'
+             'Origin',
+             'If-None-Match'
          ],
+         expose_headers=['ETag'],
          supports_credentials=True,
          max_age=86400)  # Cache preflight for 24 hours
     
@@ -107,7 +162,7 @@ def create_app(config_name=None):
             headers = response.headers
             headers['Access-Control-Allow-Origin'] = request.headers.get('Origin', '*')
             headers['Access-Control-Allow-Methods'] = 'GET,POST,PUT,PATCH,DELETE,OPTIONS'
-            headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization,X-Requested-With,Cache-Control,Accept,Origin'
+            headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization,X-Requested-With,Cache-Control,Accept,Origin,If-None-Match'
             headers['Access-Control-Allow-Credentials'] = 'true'
             headers['Access-Control-Max-Age'] = '86400'
             return response
@@ -122,6 +177,15 @@ def create_app(config_name=None):
             response.headers['Access-Control-Allow-Credentials'] = 'true'
         return response
     
+    # Reject revoked tokens on every JWT-protected request
+    from app.services.RevocationService import RevocationService
+    # Count writes per table so list endpoints can answer If-None-Match (see etag)
+    from app.services.TableVersionService import TableVersionService
+    # Record tombstones of deleted rows for offline clients (see /api/sync)
+    from app.services.SyncService import SyncService
+    # Drop cached grade statistics when grades or evaluations change
+    from app.services.GradeStatsService import GradeStatsService
+    
     # Register blueprints
     from app.routes.auth import auth_bp
     from app.routes.admin import admin_bp
@@ -130,6 +194,7 @@ def create_app(config_name=None):
     from app.routes.grades import grades_bp
     from app.routes.reports import reports_bp
     from app.routes.attendance import attendance_bp
+    from app.routes.sync import sync_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
@@ -138,5 +203,6 @@ def create_app(config_name=None):
     app.register_blueprint(grades_bp, url_prefix='/api/grades')
     app.register_blueprint(reports_bp, url_prefix='/api/reports')
     app.register_blueprint(attendance_bp, url_prefix='/api/attendance')
+    app.register_blueprint(sync_bp, url_prefix='/api/sync')
     
     return app
\ No newline at end of file
@@ -5,11 +5,13 @@ from datetime import datetime
 class Attendance(db.Model):
     __tablename__ = 'attendances'
     
+    STATUSES = ('present', 'absent', 'late', 'excused')
+    
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
     classroom_id = db.Column(db.Integer, db.ForeignKey('classrooms.id'), nullable=False)
     date = db.Column(db.Date, nullable=False)
-    status = db.Column(db.String(50), nullable=False)  # e.g., 'present', 'absent', 'late', 'excused'
+    status = db.Column(db.String(50), nullable=False)  # one of STATUSES
     recorded_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -19,6 +21,14 @@ class Attendance(db.Model):
     classroom = db.relationship('Classroom', backref='attendances')
     recorder = db.relationship('User', backref='recorded_attendances')
 
+    __table_args__ = (
+        db.Index('ix_attendances_classroom_id_date', 'classroom_id', 'date'),
+        # One status per student and day; roll calls upsert on it
+        db.UniqueConstraint('student_id', 'date', name='uq_attendances_student_id_date'),
+        # Delta sync reads changes in (updated_at, id) order
+        db.Index('ix_attendances_updated_at_id', 'updated_at', 'id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -0,0 +1,73 @@
+# app/models/AttendanceRollup.py
+from app import db
+
+class AttendanceDailyRollup(db.Model):
+    """Attendance counts per classroom, day and status, kept in step with
+    attendances by AttendanceRollupService"""
+    __tablename__ = 'attendance_daily_rollup'
+    
+    classroom_id = db.Column(db.Integer, db.ForeignKey('classrooms.id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True, index=True)
+    present = db.Column(db.Integer, nullable=False, default=0)
+    absent = db.Column(db.Integer, nullable=False, default=0)
+    late = db.Column(db.Integer, nullable=False, default=0)
+    excused = db.Column(db.Integer, nullable=False, default=0)
+    
+    @property
+    def total(self):
+        return self.present + self.absent + self.late + self.excused
+    
+    def to_dict(self):
+        return {
+            'classroom_id': self.classroom_id,
+            'date': self.date.isoformat(),
+            'present': self.present,
+            'absent': self.absent,
+            'late': self.late,
+            'excused': self.excused,
+            'total': self.total
+        }
+
+
+class StudentAttendanceTally(db.Model):
+    """Attendance counts per student, evaluation period and status"""
+    __tablename__ = 'student_attendance_tallies'
+    
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), primary_key=True)
+    evaluation_period_id = db.Column(db.Integer, db.ForeignKey('evaluation_periods.id'), primary_key=True, index=True)
+    present = db.Column(db.Integer, nullable=False, default=0)
+    absent = db.Column(db.Integer, nullable=False, default=0)
+    late = db.Column(db.Integer, nullable=False, default=0)
+    excused = db.Column(db.Integer, nullable=False, default=0)
+    
+    @property
+    def total(self):
+        return self.present + self.absent + self.late + self.excused
+    
+    def to_dict(self):
+        total = self.total
+        return {
+            'student_id': self.student_id,
+            'evaluation_period_id': self.evaluation_period_id,
+            'present': self.present,
+            'absent': self.absent,
+            'late': self.late,
+            'excused': self.excused,
+            'total': total,
+            # Late still counts as attended
+            'attendance_rate': round((self.present + self.late) * 100.0 / total, 2) if total else None
+        }
+
+
+class StudentAttendanceBitmap(db.Model):
+    """One bit per day of an evaluation period for each status, bit i being
+    start_date + i days (little-endian within each byte). Planes only grow as
+    far as the last day marked, so they can be shorter than the period."""
+    __tablename__ = 'student_attendance_bitmaps'
+    
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), primary_key=True)
+    evaluation_period_id = db.Column(db.Integer, db.ForeignKey('evaluation_periods.id'), primary_key=True, index=True)
+    present = db.Column(db.LargeBinary, nullable=False, default=b'')
+    absent = db.Column(db.LargeBinary, nullable=False, default=b'')
+    late = db.Column(db.LargeBinary, nullable=False, default=b'')
+    excused = db.Column(db.LargeBinary, nullable=False, default=b'')
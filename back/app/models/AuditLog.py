@@ -14,6 +14,7 @@ class AuditLog(db.Model):
     new_values = db.Column(db.JSON)
     ip_address = db.Column(db.String(45))
     user_agent = db.Column(db.Text)
+    status_code = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Fixed relationship with explicit backref
@@ -30,6 +31,7 @@ class AuditLog(db.Model):
             'new_values': self.new_values,
             'ip_address': self.ip_address,
             'user_agent': self.user_agent,
+            'status_code': self.status_code,
             'created_at': self.created_at.isoformat() if self.created_at else None,  # Fixed: was self.creation_date
             'user': self.user.to_dict() if self.user else None
         }
\ No newline at end of file
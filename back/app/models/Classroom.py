@@ -9,16 +9,30 @@ class Classroom(db.Model):
     name = db.Column(db.String(50), nullable=False)
     level = db.Column(db.String(50), nullable=False)
     academic_year = db.Column(db.String(10), nullable=False)
-    head_teacher_id = db.Column(db.Integer, db.ForeignKey('teachers.id'))
+    head_teacher_id = db.Column(db.Integer, db.ForeignKey('teachers.id'), index=True)
     max_students = db.Column(db.Integer, default=30)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     assigned_by = db.Column(db.Integer, db.ForeignKey('users.id'))
     
     # Relationships
     assignments = db.relationship('TeacherAssignment', backref='classroom', lazy=True)
     assigner = db.relationship('User', foreign_keys=[assigned_by], backref='assigned_classrooms')
     
-    def to_dict(self, include_relationships=True):
+    __table_args__ = (
+        # Delta sync reads changes in (updated_at, id) order
+        db.Index('ix_classrooms_updated_at_id', 'updated_at', 'id'),
+    )
+    
+    def count_students(self):
+        """Number of students, counted in SQL unless the collection is already loaded"""
+        if 'students' in self.__dict__:
+            return len(self.students)
+        from app.models.Student import Student
+        return db.session.query(db.func.count(Student.id)).filter(Student.classroom_id == self.id).scalar()
+    
+    def to_dict(self, include_relationships=True, students_count=None):
+        """students_count can be passed in when counts were fetched for many classrooms at once"""
         result = {
             'id': self.id,
             'name': self.name,
@@ -27,8 +41,9 @@ class Classroom(db.Model):
             'head_teacher_id': self.head_teacher_id,
             'max_students': self.max_students,
             'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'assigned_by': self.assigned_by,
-            'students_count': len(self.students)
+            'students_count': self.count_students() if students_count is None else students_count
         }
         
         if include_relationships and self.head_teacher:
@@ -31,7 +31,7 @@ class Evaluation(db.Model):
     classroom_id = db.Column(db.Integer, db.ForeignKey('classrooms.id'), nullable=False)
     
     evaluation_date = db.Column(db.Date, nullable=False)
-    created_by = db.Column(db.Integer, db.ForeignKey('teachers.id'), nullable=False)
+    created_by = db.Column(db.Integer, db.ForeignKey('teachers.id'), nullable=False, index=True)
     
     max_points = db.Column(db.Numeric(6, 2), default=20.00)
     weight = db.Column(db.Float, default=1.0)
@@ -45,7 +45,19 @@ class Evaluation(db.Model):
     classroom = db.relationship('Classroom', backref='evaluations')
     # Remove this line completely - backref defined in Teacher model
     
-    def to_dict(self, include_relationships=True):
+    __table_args__ = (
+        db.Index('ix_evaluations_evaluation_period_id_classroom_id', 'evaluation_period_id', 'classroom_id'),
+    )
+    
+    def count_grades(self):
+        """Number of grades, counted in SQL unless the collection is already loaded"""
+        if 'grades' in self.__dict__:
+            return len(self.grades)
+        from app.models.Grade import Grade
+        return db.session.query(db.func.count(Grade.id)).filter(Grade.evaluation_id == self.id).scalar()
+    
+    def to_dict(self, include_relationships=True, grades_count=None):
+        """grades_count can be passed in when counts were fetched for many evaluations at once"""
         result = {
             'id': self.id,
             'name': self.name,
@@ -60,7 +72,7 @@ class Evaluation(db.Model):
             'weight': self.weight,
             'is_published': self.is_published,
             'created_at': self.created_at.isoformat(),
-            'grades_count': len(self.grades)
+            'grades_count': self.count_grades() if grades_count is None else grades_count
         }
         
         if include_relationships:
@@ -21,7 +21,22 @@ class EvaluationPeriod(db.Model):
     evaluations = db.relationship('Evaluation', backref='evaluation_period', lazy=True)
     # Remove the conflicting line: report_cards relationship will be defined in ReportCard
     
-    def to_dict(self):
+    def count_evaluations(self):
+        """Number of evaluations, counted in SQL unless the collection is already loaded"""
+        if 'evaluations' in self.__dict__:
+            return len(self.evaluations)
+        from app.models.Evaluation import Evaluation
+        return db.session.query(db.func.count(Evaluation.id)).filter(Evaluation.evaluation_period_id == self.id).scalar()
+    
+    def count_report_cards(self):
+        """Number of report cards, counted in SQL unless the collection is already loaded"""
+        if 'report_cards' in self.__dict__:
+            return len(self.report_cards)
+        from app.models.ReportCard import ReportCard
+        return db.session.query(db.func.count(ReportCard.id)).filter(ReportCard.evaluation_period_id == self.id).scalar()
+    
+    def to_dict(self, evaluations_count=None, report_cards_count=None):
+        """Counts can be passed in when they were fetched for many periods at once"""
         return {
             'id': self.id,
             'name': self.name,
@@ -30,6 +45,6 @@ class EvaluationPeriod(db.Model):
             'end_date': self.end_date.isoformat(),
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat(),
-            'evaluations_count': len(self.evaluations),
-            'report_cards_count': len(self.report_cards) if hasattr(self, 'report_cards') else 0
+            'evaluations_count': self.count_evaluations() if evaluations_count is None else evaluations_count,
+            'report_cards_count': self.count_report_cards() if report_cards_count is None else report_cards_count
         }
\ No newline at end of file
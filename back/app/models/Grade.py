@@ -7,17 +7,19 @@ class Grade(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
-    evaluation_id = db.Column(db.Integer, db.ForeignKey('evaluations.id'), nullable=False)
+    evaluation_id = db.Column(db.Integer, db.ForeignKey('evaluations.id'), nullable=False, index=True)
     subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), nullable=False)
     
     points_earned = db.Column(db.Numeric(6, 2), nullable=False)
     points_possible = db.Column(db.Numeric(6, 2), nullable=False)
+    # Derived from the points and the classroom's grading scale by GradingScaleService
     percentage = db.Column(db.Numeric(5, 2))
     letter_grade = db.Column(db.String(5))
     
     comments = db.Column(db.Text)
     is_excused = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
     
     # Fixed relationships - backref now handled in Evaluation model
@@ -26,11 +28,13 @@ class Grade(db.Model):
     subject = db.relationship('Subject', foreign_keys=[subject_id], backref='grades')
     grade_creator = db.relationship('User', foreign_keys=[created_by], backref='created_grades')
     
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        if not self.percentage and self.points_possible > 0:
-            self.percentage = (self.points_earned / self.points_possible) * 100
-    
+    __table_args__ = (
+        # One grade per student and evaluation; grade entry upserts on it
+        db.UniqueConstraint('student_id', 'evaluation_id', name='uq_grades_student_id_evaluation_id'),
+        # Delta sync reads changes in (updated_at, id) order
+        db.Index('ix_grades_updated_at_id', 'updated_at', 'id'),
+    )
+
     def to_dict(self, include_relationships=True):
         result = {
             'id': self.id,
@@ -44,6 +48,7 @@ class Grade(db.Model):
             'comments': self.comments,
             'is_excused': self.is_excused,
             'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'created_by': self.created_by
         }
         
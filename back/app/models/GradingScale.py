@@ -0,0 +1,60 @@
+# app/models/GradingScale.py
+from app import db
+from datetime import datetime
+
+class GradingScale(db.Model):
+    """Letter grades by percentage for a classroom level and/or academic year.
+
+    A classroom uses the most specific scale that matches it: level and year,
+    then level only, then year only, then the scale with neither (the school
+    default). Without any, GradingScaleService.DEFAULT_BANDS applies.
+    """
+    __tablename__ = 'grading_scales'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    level = db.Column(db.String(50))  # Classroom.level; NULL for every level
+    academic_year = db.Column(db.String(10))  # NULL for every year
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    bands = db.relationship('GradingScaleBand', backref='scale', cascade='all, delete-orphan',
+                            order_by='GradingScaleBand.min_percentage.desc()')
+
+    def matches(self, level, academic_year):
+        return self.level in (None, level) and self.academic_year in (None, academic_year)
+
+    @property
+    def specificity(self):
+        return (self.level is not None) * 2 + (self.academic_year is not None)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'level': self.level,
+            'academic_year': self.academic_year,
+            'bands': [band.to_dict() for band in self.bands],
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class GradingScaleBand(db.Model):
+    """One letter of a scale: grades from min_percentage up to the next band"""
+    __tablename__ = 'grading_scale_bands'
+
+    id = db.Column(db.Integer, primary_key=True)
+    scale_id = db.Column(db.Integer, db.ForeignKey('grading_scales.id'), nullable=False, index=True)
+    letter = db.Column(db.String(5), nullable=False)
+    min_percentage = db.Column(db.Numeric(5, 2), nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('scale_id', 'letter', name='uq_grading_scale_bands_scale_id_letter'),
+    )
+
+    def to_dict(self):
+        return {
+            'letter': self.letter,
+            'min_percentage': float(self.min_percentage)
+        }
@@ -35,6 +35,12 @@ class ReportCard(db.Model):
         backref=db.backref('generated_report_cards', lazy=True)
     )
     
+    __table_args__ = (
+        # One report card per student and period; batches upsert on it
+        db.UniqueConstraint('student_id', 'evaluation_period_id',
+                            name='uq_report_cards_student_id_evaluation_period_id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -49,4 +55,37 @@ class ReportCard(db.Model):
             'file_path': self.file_path,
             'student': self.student.to_dict(include_relationships=False) if self.student else None,
             'evaluation_period': self.evaluation_period.to_dict() if self.evaluation_period else None
-        }
\ No newline at end of file
+        }
+
+
+class ReportBatch(db.Model):
+    """One run of report card generation for a classroom, or the whole school
+    when classroom_id is NULL, with its timing to track end-of-term throughput"""
+    __tablename__ = 'report_batches'
+
+    id = db.Column(db.Integer, primary_key=True)
+    evaluation_period_id = db.Column(db.Integer, db.ForeignKey('evaluation_periods.id'), nullable=False, index=True)
+    classroom_id = db.Column(db.Integer, db.ForeignKey('classrooms.id'))
+    requested_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    # Set by `flask reports generate-all`: one batch per classroom, so an interrupted run can resume
+    run_id = db.Column(db.String(32), index=True)
+    written = db.Column(db.Integer, nullable=False, default=0)  # Report cards created or updated
+    skipped = db.Column(db.Integer, nullable=False, default=0)  # Students without grades or generator
+    pdfs = db.Column(db.Integer, nullable=False, default=0)  # Report card PDFs rendered
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    duration_ms = db.Column(db.Integer)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'evaluation_period_id': self.evaluation_period_id,
+            'classroom_id': self.classroom_id,
+            'requested_by': self.requested_by,
+            'run_id': self.run_id,
+            'written': self.written,
+            'skipped': self.skipped,
+            'pdfs': self.pdfs,
+            'started_at': self.started_at.isoformat(),
+            'duration_ms': self.duration_ms,
+            'per_second': round(self.written * 1000 / self.duration_ms, 1) if self.duration_ms else None
+        }
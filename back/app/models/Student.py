@@ -6,7 +6,7 @@ class Student(db.Model):
     __tablename__ = 'students'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     student_number = db.Column(db.String(20), unique=True, nullable=False)
     classroom_id = db.Column(db.Integer, db.ForeignKey('classrooms.id'))
     date_of_birth = db.Column(db.Date)
@@ -17,12 +17,21 @@ class Student(db.Model):
     parent_phone = db.Column(db.String(20))
     enrollment_date = db.Column(db.Date, default=date.today)
     is_enrolled = db.Column(db.Boolean, default=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Fixed relationships using back_populates
     user = db.relationship('User', foreign_keys=[user_id], back_populates='student_profile')
     classroom = db.relationship('Classroom', backref='students')
     grades = db.relationship('Grade', back_populates='student', lazy=True)
     
+    __table_args__ = (
+        # Only enrolled students are listed per classroom
+        db.Index('ix_students_classroom_id_enrolled', 'classroom_id',
+                 postgresql_where=db.text('is_enrolled'), sqlite_where=db.text('is_enrolled = 1')),
+        # Delta sync reads changes in (updated_at, id) order
+        db.Index('ix_students_updated_at_id', 'updated_at', 'id'),
+    )
+
     def to_dict(self, include_relationships=True):
         result = {
             'id': self.id,
@@ -37,6 +46,7 @@ class Student(db.Model):
             'parent_phone': self.parent_phone,
             'enrollment_date': self.enrollment_date.isoformat(),
             'is_enrolled': self.is_enrolled,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'user': self.user.to_dict() if self.user else None
         }
         
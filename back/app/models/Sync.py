@@ -0,0 +1,51 @@
+# app/models/Sync.py
+from app import db
+from datetime import datetime
+
+class SyncTombstone(db.Model):
+    """A deleted row of a synced table, so offline clients can drop it too.
+    Written by SyncService in the flush that deletes the row."""
+    __tablename__ = 'sync_tombstones'
+
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(64), nullable=False)
+    row_id = db.Column(db.Integer, nullable=False)
+    # Classroom the row belonged to, to scope tombstones per teacher (no FK: it may be gone too)
+    classroom_id = db.Column(db.Integer, index=True)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'table_name': self.table_name,
+            'row_id': self.row_id,
+            'classroom_id': self.classroom_id,
+            'deleted_at': self.deleted_at.isoformat()
+        }
+
+
+class SyncOperation(db.Model):
+    """An offline write already pushed by a client, with the result it got;
+    replaying the same operation id returns that result instead of applying
+    it again"""
+    __tablename__ = 'sync_operations'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    client_op_id = db.Column(db.String(64), nullable=False)
+    op_type = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False)  # applied, rejected
+    message = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'client_op_id', name='uq_sync_operations_user_id_client_op_id'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.client_op_id,
+            'type': self.op_type,
+            'status': self.status,
+            'message': self.message
+        }
@@ -0,0 +1,15 @@
+# app/models/TableVersion.py
+from app import db
+
+class TableVersion(db.Model):
+    """Change counter per table, incremented by every commit that writes to it"""
+    __tablename__ = 'table_versions'
+    
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'table_name': self.table_name,
+            'version': self.version
+        }
@@ -6,7 +6,7 @@ class Teacher(db.Model):
     __tablename__ = 'teachers'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     employee_number = db.Column(db.String(20), unique=True, nullable=False)
     specialization = db.Column(db.String(100))
     hire_date = db.Column(db.Date, default=date.today)
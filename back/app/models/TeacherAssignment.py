@@ -20,6 +20,9 @@ class TeacherAssignment(db.Model):
     # Unique constraint
     __table_args__ = (
         db.UniqueConstraint('teacher_id', 'subject_id', 'classroom_id', 'academic_year'),
+        # Access checks and teacher lists only look at active assignments
+        db.Index('ix_teacher_subject_classroom_active', 'teacher_id', 'classroom_id',
+                 postgresql_where=db.text('is_active'), sqlite_where=db.text('is_active = 1')),
     )
     
     def to_dict(self, include_relationships=True):
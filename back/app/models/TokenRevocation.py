@@ -0,0 +1,25 @@
+# app/models/TokenRevocation.py
+from app import db
+from datetime import datetime
+
+class TokenRevocation(db.Model):
+    """Tokens issued to user_id before revoked_at are no longer accepted"""
+    __tablename__ = 'token_revocations'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    reason = db.Column(db.String(50))
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    # Past this point every token covered by the row has expired anyway
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    user = db.relationship('User', foreign_keys=[user_id], backref=db.backref('token_revocations', lazy=True))
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'reason': self.reason,
+            'revoked_at': self.revoked_at.isoformat(),
+            'expires_at': self.expires_at.isoformat()
+        }
@@ -1,6 +1,6 @@
 # app/models/User.py
 from app import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.services.PasswordService import PasswordService, PasswordPoolBusy
 from datetime import datetime
 
 class User(db.Model):
@@ -34,13 +34,15 @@ class User(db.Model):
     )
     
     def set_password(self, password):
-        """Set password with scrypt method"""
-        self.password_hash = generate_password_hash(password, method='scrypt')
+        """Set password with the configured hash method (PASSWORD_HASH_METHOD)"""
+        self.password_hash = PasswordService.hash_password(password)
     
     def check_password(self, password):
         """Check password with fallback for legacy hashes"""
         try:
-            return check_password_hash(self.password_hash, password)
+            return PasswordService.verify_password(self.password_hash, password)
+        except PasswordPoolBusy:
+            raise
         except Exception as e:
             print(f"Password check error: {e}")
             # Handle plain text passwords during development
@@ -50,6 +52,10 @@ class User(db.Model):
                 return True
             return False
     
+    def password_needs_rehash(self):
+        """Whether the stored hash uses other parameters than the configured ones"""
+        return PasswordService.needs_rehash(self.password_hash)
+    
     @property 
     def teacher(self):
         """Convenience property for API compatibility"""
@@ -5,15 +5,22 @@ from app.models.Teacher import Teacher
 from app.models.Classroom import Classroom
 from app.models.Subject import Subject
 from app.models.Grade import Grade
-from app.models.ReportCard import ReportCard
+from app.models.ReportCard import ReportCard, ReportBatch
 from app.models.AuditLog import AuditLog
 from app.models.EvaluationPeriod import EvaluationPeriod
 from app.models.TeacherAssignment import TeacherAssignment
 from app.models.Attendance import Attendance
 from app.models.Evaluation import Evaluation, EvaluationType
+from app.models.TokenRevocation import TokenRevocation
+from app.models.TableVersion import TableVersion
+from app.models.AttendanceRollup import AttendanceDailyRollup, StudentAttendanceTally, StudentAttendanceBitmap
+from app.models.Sync import SyncTombstone, SyncOperation
+from app.models.GradingScale import GradingScale, GradingScaleBand
 
 __all__ = [
     'User', 'Student', 'Teacher', 'Classroom', 'Subject', 
-    'Grade', 'ReportCard', 'AuditLog', 'EvaluationPeriod', 
-    'TeacherAssignment', 'Attendance', 'Evaluation', 'EvaluationType'
+    'Grade', 'ReportCard', 'ReportBatch', 'AuditLog', 'EvaluationPeriod', 
+    'TeacherAssignment', 'Attendance', 'Evaluation', 'EvaluationType',
+    'TokenRevocation', 'TableVersion', 'AttendanceDailyRollup', 'StudentAttendanceTally',
+    'StudentAttendanceBitmap', 'SyncTombstone', 'SyncOperation', 'GradingScale', 'GradingScaleBand'
 ]
\ No newline at end of file
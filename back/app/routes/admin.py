@@ -8,8 +8,16 @@ from app.models.Classroom import Classroom
 from app.models.Subject import Subject
 from app.models.TeacherAssignment import TeacherAssignment
 from app.models.AuditLog import AuditLog
+from app.models.GradingScale import GradingScale
 from app.services.AuthService import AuthService
-from app.utils.decorators import role_required, log_action
+from app.services.AccessService import AccessService
+from app.services.GradingScaleService import GradingScaleService
+from app.services.PrincipalService import PrincipalService
+from app.services.RevocationService import RevocationService
+from app.utils.decorators import role_required, log_action, etag
+from app.utils.serializers import (serialize_teachers, serialize_classrooms, serialize_students,
+                                   serialize_assignments, serialize_users)
+from app.utils.pagination import paginate, list_response, as_bool
 from app import db
 from datetime import datetime
 import logging
@@ -21,6 +29,7 @@ admin_bp = Blueprint('admin', __name__)
 @admin_bp.route('/teachers', methods=['POST'])
 @jwt_required()
 @role_required('admin')
+@etag(Teacher, User, Classroom, TeacherAssignment, Subject)
 @log_action('CREATE_TEACHER', 'teachers')
 def create_teacher(current_user):
     data = request.get_json()
@@ -53,12 +62,14 @@ def create_teacher(current_user):
 @role_required('admin')
 def get_teachers(current_user):
     try:
-        # This is the most efficient approach - filter teachers whose users are active
-        active_user_ids = db.session.query(User.id).filter(User.is_active == True).subquery()
-        teachers = Teacher.query.filter(Teacher.user_id.in_(active_user_ids)).all()
+        query = Teacher.query.join(User, Teacher.user_id == User.id).filter(User.is_active == True)
         
-        logger.info(f"Admin {current_user.id} retrieved {len(teachers)} teachers (efficient method)")
-        return jsonify([teacher.to_dict() for teacher in teachers])
+        head_teacher = request.args.get('head_teacher', type=as_bool)
+        if head_teacher is not None:
+            query = query.filter(Teacher.is_head_teacher == head_teacher)
+        
+        logger.info(f"Admin {current_user.id} listing teachers")
+        return paginate(query, [Teacher.id], serialize_teachers)
     except Exception as e:
         logger.error(f"Error retrieving teachers (efficient): {str(e)}")
         return jsonify({'message': str(e)}), 400
@@ -83,6 +94,7 @@ def update_teacher(current_user, teacher_id):
                 setattr(user, field, data[field])
         
         db.session.commit()
+        PrincipalService.invalidate(user.id)
         
         return jsonify({
             'message': 'Teacher updated successfully',
@@ -102,7 +114,9 @@ def delete_teacher(current_user, teacher_id):
         user = teacher.user
         
         user.is_active = False
+        RevocationService.revoke_user(user.id, 'DELETE_TEACHER')
         db.session.commit()
+        PrincipalService.invalidate(user.id)
     
         return jsonify({'message': 'Teacher deactivated successfully'})
     except Exception as e:
@@ -122,7 +136,10 @@ def promote_to_admin(current_user, teacher_id):
             return jsonify({'message': 'User is already an admin'}), 400
         
         user.role = 'admin'
+        # Outstanding tokens still carry the old role claim
+        RevocationService.revoke_user(user.id, 'PROMOTE_TO_ADMIN')
         db.session.commit()
+        PrincipalService.invalidate(user.id)
         
         return jsonify({
             'message': 'Teacher promoted to admin successfully',
@@ -159,29 +176,17 @@ def create_classroom(current_user):
 @admin_bp.route('/classrooms', methods=['GET'])
 @jwt_required()
 @role_required(['admin', 'teacher'])
+@etag(Classroom, Student, Teacher, User, TeacherAssignment)
 def get_classrooms(current_user):
-    if current_user.role == 'admin':  # Fixed: Use string comparison
-        classrooms = Classroom.query.all()
-    else:
+    query = Classroom.query.order_by(Classroom.id)
+    if current_user.role != 'admin':  # Fixed: Use string comparison
         teacher = current_user.teacher_profile
-        if teacher:
-            head_classrooms = Classroom.query.filter_by(head_teacher_id=teacher.id).all()
-            
-            assigned_classrooms = db.session.query(Classroom).join(
-                TeacherAssignment,
-                Classroom.id == TeacherAssignment.classroom_id
-            ).filter(
-                TeacherAssignment.teacher_id == teacher.id,
-                TeacherAssignment.is_active == True
-            ).distinct().all()
-            
-            all_classrooms = {c.id: c for c in head_classrooms + assigned_classrooms}
-            classrooms = list(all_classrooms.values())
-        else:
-            classrooms = []
-    
-    logger.info(f"User {current_user.id} retrieving {len(classrooms)} classrooms")
-    return jsonify([classroom.to_dict() for classroom in classrooms])
+        classroom_ids = AccessService.classroom_ids(teacher.id) if teacher else frozenset()
+        # An empty IN matches nothing but keeps ?fields and the list shape
+        query = query.filter(Classroom.id.in_(classroom_ids))
+    
+    logger.info(f"User {current_user.id} retrieving classrooms")
+    return list_response(query, serialize_classrooms)
 
 @admin_bp.route('/classrooms/<int:classroom_id>', methods=['PUT'])
 @jwt_required()
@@ -236,6 +241,7 @@ def assign_classroom_teacher(current_user, classroom_id):
     classroom.head_teacher_id = teacher_id
     teacher.is_head_teacher = True
     db.session.commit()
+    PrincipalService.invalidate(teacher.user_id)
     
     return jsonify({
         'message': 'Teacher assigned to classroom successfully',
@@ -267,6 +273,7 @@ def create_subject(current_user):
 @admin_bp.route('/subjects', methods=['GET'])
 @jwt_required()
 @role_required(['admin', 'teacher'])
+@etag(Subject)
 def get_subjects(current_user):
     subjects = Subject.query.all()
     return jsonify([subject.to_dict() for subject in subjects])
@@ -310,34 +317,21 @@ def delete_subject(current_user, subject_id):
 @admin_bp.route('/students', methods=['GET'])
 @jwt_required()
 @role_required(['admin', 'teacher'])
+@etag(Student, User, Classroom, Teacher, TeacherAssignment)
 def get_all_students(current_user):
-    if current_user.role == 'admin':  # Fixed: Use string comparison
-        students = Student.query.filter_by(is_enrolled=True).all()
-    else:
+    query = Student.query.filter(Student.is_enrolled == request.args.get('enrolled', True, type=as_bool))
+    
+    classroom_id = request.args.get('classroom_id', type=int)
+    if classroom_id:
+        query = query.filter(Student.classroom_id == classroom_id)
+    
+    if current_user.role != 'admin':  # Fixed: Use string comparison
         teacher = current_user.teacher_profile
-        if teacher:
-            head_classrooms = Classroom.query.filter_by(head_teacher_id=teacher.id).all()
-            head_classroom_ids = [c.id for c in head_classrooms]
-            
-            assigned_classrooms = db.session.query(Classroom.id).join(
-                TeacherAssignment,
-                Classroom.id == TeacherAssignment.classroom_id
-            ).filter(
-                TeacherAssignment.teacher_id == teacher.id,
-                TeacherAssignment.is_active == True
-            ).distinct().all()
-            assigned_classroom_ids = [c.id for c in assigned_classrooms]
-            
-            all_classroom_ids = list(set(head_classroom_ids + assigned_classroom_ids))
-            
-            students = Student.query.filter(
-                Student.classroom_id.in_(all_classroom_ids),
-                Student.is_enrolled == True
-            ).all() if all_classroom_ids else []
-        else:
-            students = []
-    
-    return jsonify([student.to_dict() for student in students])
+        all_classroom_ids = list(AccessService.classroom_ids(teacher.id)) if teacher else []
+        # An empty IN matches nothing but still honours ?limit/?after and ?fields
+        query = query.filter(Student.classroom_id.in_(all_classroom_ids))
+    
+    return paginate(query, [Student.id], serialize_students)
 
 @admin_bp.route('/students', methods=['POST'])
 @jwt_required()
@@ -366,8 +360,7 @@ def update_student(current_user, student_id):
     
     if current_user.role == 'teacher':  # Fixed: Use string comparison
         teacher = current_user.teacher_profile
-        if not (teacher and teacher.is_head_teacher and student.classroom and 
-                student.classroom.head_teacher_id == teacher.id):
+        if not (teacher and AccessService.is_head_teacher_of(teacher.id, student.classroom_id)):
             return jsonify({'message': 'Only head teacher can update student information'}), 403
     
     data = request.get_json()
@@ -382,6 +375,7 @@ def update_student(current_user, student_id):
             setattr(user, field, data[field])
     
     db.session.commit()
+    PrincipalService.invalidate(user.id)
     
     return jsonify({
         'message': 'Student updated successfully',
@@ -398,7 +392,9 @@ def delete_student(current_user, student_id):
     
     user.is_active = False
     student.is_enrolled = False
+    RevocationService.revoke_user(user.id, 'DELETE_STUDENT')
     db.session.commit()
+    PrincipalService.invalidate(user.id)
     
     return jsonify({'message': 'Student deactivated successfully'})
 
@@ -407,12 +403,13 @@ def delete_student(current_user, student_id):
 @jwt_required()
 @role_required('admin')
 def get_dashboard_stats(current_user):
-    from app.models.Attendance import Attendance
+    from app.models.AttendanceRollup import AttendanceDailyRollup
     from datetime import date
     
-    today = date.today()
-    today_attendance = db.session.query(Attendance).filter_by(date=today).all()
-    present_today = sum(1 for att in today_attendance if att.status in ['present', 'late'])
+    # Read from the per-classroom daily rollup, not from attendances
+    present_today = db.session.query(
+        db.func.coalesce(db.func.sum(AttendanceDailyRollup.present + AttendanceDailyRollup.late), 0)
+    ).filter(AttendanceDailyRollup.date == date.today()).scalar()
     
     stats = {
         'total_teachers': Teacher.query.count(),
@@ -457,8 +454,14 @@ def create_assignment(current_user):
 @jwt_required()
 @role_required('admin')
 def get_assignments(current_user):
-    assignments = TeacherAssignment.query.filter_by(is_active=True).all()
-    return jsonify([assignment.to_dict() for assignment in assignments])
+    query = TeacherAssignment.query.filter_by(is_active=True)
+    
+    for field in ('teacher_id', 'classroom_id', 'subject_id'):
+        value = request.args.get(field, type=int)
+        if value:
+            query = query.filter(getattr(TeacherAssignment, field) == value)
+    
+    return paginate(query, [TeacherAssignment.id], serialize_assignments)
 
 @admin_bp.route('/assignments/<int:assignment_id>', methods=['DELETE'])
 @jwt_required()
@@ -476,8 +479,13 @@ def delete_assignment(current_user, assignment_id):
 @jwt_required()
 @role_required('admin')
 def get_all_users(current_user):
-    users = User.query.filter_by(is_active=True).all()
-    return jsonify([user.to_dict() for user in users])
+    query = User.query.filter(User.is_active == request.args.get('active', True, type=as_bool))
+    
+    role = request.args.get('role')
+    if role:
+        query = query.filter(User.role == role)
+    
+    return paginate(query, [User.id], serialize_users)
 
 @admin_bp.route('/users/<int:user_id>/deactivate', methods=['POST'])
 @jwt_required()
@@ -486,6 +494,88 @@ def get_all_users(current_user):
 def deactivate_user(current_user, user_id):
     user = User.query.get_or_404(user_id)
     user.is_active = False
+    RevocationService.revoke_user(user.id, 'DEACTIVATE_USER')
+    db.session.commit()
+    PrincipalService.invalidate(user.id)
+    
+    return jsonify({'message': 'User deactivated successfully'})
+# GRADING SCALES
+@admin_bp.route('/grading-scales', methods=['GET'])
+@jwt_required()
+@role_required(['admin', 'teacher'])
+def get_grading_scales(current_user):
+    scales = GradingScale.query.order_by(GradingScale.id).all()
+    return jsonify({
+        'scales': [scale.to_dict() for scale in scales],
+        'default_bands': [{'letter': letter, 'min_percentage': minimum}
+                          for letter, minimum in GradingScaleService.DEFAULT_BANDS]
+    })
+
+@admin_bp.route('/grading-scales', methods=['POST'])
+@jwt_required()
+@role_required('admin')
+@log_action('CREATE_GRADING_SCALE', 'grading_scales')
+def create_grading_scale(current_user):
+    try:
+        scale = GradingScale()
+        regraded = GradingScaleService.save(scale, request.get_json() or {})
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+    
+    return jsonify({
+        'message': 'Grading scale created successfully',
+        'scale': scale.to_dict(),
+        'regraded': regraded
+    }), 201
+
+@admin_bp.route('/grading-scales/<int:scale_id>', methods=['PUT'])
+@jwt_required()
+@role_required('admin')
+@log_action('UPDATE_GRADING_SCALE', 'grading_scales')
+def update_grading_scale(current_user, scale_id):
+    scale = GradingScale.query.get_or_404(scale_id)
+    try:
+        regraded = GradingScaleService.save(scale, request.get_json() or {})
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+    
+    return jsonify({
+        'message': 'Grading scale updated successfully',
+        'scale': scale.to_dict(),
+        'regraded': regraded
+    })
+
+@admin_bp.route('/grading-scales/<int:scale_id>', methods=['DELETE'])
+@jwt_required()
+@role_required('admin')
+@log_action('DELETE_GRADING_SCALE', 'grading_scales')
+def delete_grading_scale(current_user, scale_id):
+    scale = GradingScale.query.get_or_404(scale_id)
+    regraded = GradingScaleService.delete(scale)
+    db.session.commit()
+    
+    return jsonify({'message': 'Grading scale deleted successfully', 'regraded': regraded})
+
+@admin_bp.route('/grades/recompute', methods=['POST'])
+@jwt_required()
+@role_required('admin')
+@log_action('RECOMPUTE_GRADES', 'grades')
+def recompute_grades(current_user):
+    """Regrade an evaluation, a classroom or a period (everything without filters),
+    e.g. after an evaluation's max_points changed"""
+    data = request.get_json() or {}
+    try:
+        evaluation_id = int(data['evaluation_id']) if data.get('evaluation_id') else None
+        classroom_ids = [int(data['classroom_id'])] if data.get('classroom_id') else None
+        period_id = int(data['evaluation_period_id']) if data.get('evaluation_period_id') else None
+    except (TypeError, ValueError):
+        return jsonify({'message': 'evaluation_id, classroom_id and evaluation_period_id must be integers'}), 400
+    
+    regraded = GradingScaleService.recompute(evaluation_id, classroom_ids, period_id)
     db.session.commit()
     
-    return jsonify({'message': 'User deactivated successfully'})
\ No newline at end of file
+    return jsonify({'message': f'{regraded} grades updated', 'regraded': regraded})
@@ -1,12 +1,17 @@
 # app/routes/attendance.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.Attendance import Attendance
 from app.models.Student import Student
-from app.models.Classroom import Classroom
 from app.models.Teacher import Teacher
-from app.models.TeacherAssignment import TeacherAssignment
+from app.models.EvaluationPeriod import EvaluationPeriod
+from app.services.AccessService import AccessService
+from app.services.AttendanceService import AttendanceService
+from app.services.AttendanceBitmapService import AttendanceBitmapService
+from app.services.AttendanceMatrixService import AttendanceMatrixService
 from app.utils.decorators import role_required, log_action
+from app.utils.serializers import serialize_attendances
+from app.utils.pagination import paginate, list_response
 from app import db
 from datetime import datetime
 import logging
@@ -19,61 +24,28 @@ attendance_bp = Blueprint('attendance', __name__)
 @role_required(['teacher', 'admin'])
 @log_action('RECORD_ATTENDANCE', 'attendance')
 def record_attendance(current_user):
-    data = request.get_json()
-    classroom_id = data.get('classroom_id')
-    date_str = data.get('date')
-    records = data.get('attendance_records')
-
-    if not all([classroom_id, date_str, records]):
-        return jsonify({'message': 'Missing required fields'}), 400
+    data = request.get_json() or {}
 
+    # One roll call, or {"roll_calls": [...]} for several classrooms/days at once
     try:
-        attendance_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-    except ValueError:
-        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        roll_calls = AttendanceService.parse_roll_calls(data)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
 
     if current_user.role == 'teacher':  # Fixed: String comparison
         teacher = current_user.teacher_profile
         if not teacher:
             return jsonify({'message': 'Teacher profile not found'}), 403
-            
-        assignment = TeacherAssignment.query.filter_by(
-            teacher_id=teacher.id,
-            classroom_id=classroom_id,
-            is_active=True
-        ).first()
-        is_head_teacher = teacher.is_head_teacher and \
-                         Classroom.query.filter_by(id=classroom_id, head_teacher_id=teacher.id).first()
-
-        if not assignment and not is_head_teacher:
-            return jsonify({'message': 'You do not have access to this classroom'}), 403
+
+        for classroom_id in {classroom_id for classroom_id, _, _ in roll_calls}:
+            if not AccessService.can_access_classroom(teacher.id, classroom_id):
+                return jsonify({'message': 'You do not have access to this classroom'}), 403
 
     try:
-        Attendance.query.filter_by(classroom_id=classroom_id, date=attendance_date).delete()
-
-        new_attendances = []
-        for record in records:
-            student_id = record.get('student_id')
-            status = record.get('status')
-
-            student = Student.query.filter_by(id=student_id, classroom_id=classroom_id).first()
-            if not student:
-                db.session.rollback()
-                return jsonify({'message': f'Student with id {student_id} not found in this classroom'}), 400
-
-            attendance = Attendance(
-                student_id=student_id,
-                classroom_id=classroom_id,
-                date=attendance_date,
-                status=status,
-                recorded_by=current_user.id
-            )
-            new_attendances.append(attendance)
-        
-        db.session.add_all(new_attendances)
+        count = AttendanceService.record(roll_calls, current_user.id)
         db.session.commit()
 
-        return jsonify({'message': 'Attendance recorded successfully'}), 201
+        return jsonify({'message': 'Attendance recorded successfully', 'records': count}), 201
     
     except Exception as e:
         db.session.rollback()
@@ -97,21 +69,46 @@ def get_classroom_attendance(current_user, classroom_id):
         teacher = current_user.teacher_profile
         if not teacher:
             return jsonify({'message': 'Teacher profile not found'}), 403
-            
-        is_head_teacher = teacher.is_head_teacher and \
-                         Classroom.query.filter_by(id=classroom_id, head_teacher_id=teacher.id).first()
-        
-        has_assignment = TeacherAssignment.query.filter_by(
-            teacher_id=teacher.id,
-            classroom_id=classroom_id,
-            is_active=True
-        ).first()
         
-        if not (is_head_teacher or has_assignment):
+        if not AccessService.can_access_classroom(teacher.id, classroom_id):
             return jsonify({'message': 'No access to this classroom'}), 403
 
-    attendances = Attendance.query.filter_by(classroom_id=classroom_id, date=attendance_date).all()
-    return jsonify([att.to_dict() for att in attendances])
+    query = Attendance.query.filter_by(classroom_id=classroom_id, date=attendance_date).order_by(Attendance.id)
+    return list_response(query, serialize_attendances)
+
+
+@attendance_bp.route('/classroom/<int:classroom_id>/matrix', methods=['GET'])
+@jwt_required()
+@role_required(['teacher', 'admin'])
+def get_classroom_attendance_matrix(current_user, classroom_id):
+    """Students x dates grid for start..end in one response; cells hold one
+    digit per day (0 = not recorded, otherwise 1 + index in "statuses")"""
+    try:
+        start_date = datetime.strptime(request.args.get('start', ''), '%Y-%m-%d').date()
+        end_date = datetime.strptime(request.args.get('end', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'message': 'start and end are required. Use YYYY-MM-DD'}), 400
+
+    max_days = current_app.config.get('ATTENDANCE_MATRIX_MAX_DAYS', 366)
+    if end_date < start_date or (end_date - start_date).days >= max_days:
+        return jsonify({'message': f'end must be on or after start and at most {max_days} days later'}), 400
+
+    if current_user.role == 'teacher':
+        teacher = current_user.teacher_profile
+        if not teacher:
+            return jsonify({'message': 'Teacher profile not found'}), 403
+
+        if not AccessService.can_access_classroom(teacher.id, classroom_id):
+            return jsonify({'message': 'No access to this classroom'}), 403
+
+    matrix = AttendanceMatrixService.build(classroom_id, start_date, end_date)
+    chunks = AttendanceMatrixService.iter_json(
+        classroom_id, start_date, end_date, matrix, current_app.json.dumps,
+        batch_size=current_app.config.get('STREAM_BATCH_SIZE', 1000)
+    )
+    if current_app.config.get('STREAM_LISTS', True):
+        return Response(stream_with_context(chunks), mimetype='application/json')
+    return Response(''.join(chunks), mimetype='application/json')
 
 
 @attendance_bp.route('/student/<int:student_id>', methods=['GET'])
@@ -129,26 +126,8 @@ def get_student_attendance(current_user, student_id):
                 logger.error(f"Teacher profile not found for user {current_user.id}")
                 return jsonify({'message': 'Teacher profile not found'}), 403
                 
-            # Check if teacher has access to this student
-            has_access = False
-            
-            # Head teacher access
-            if teacher.is_head_teacher and student.classroom and student.classroom.head_teacher_id == teacher.id:
-                has_access = True
-                logger.debug(f"Head teacher {teacher.id} has access to student {student_id}")
-            
-            # Assignment access
-            if not has_access and student.classroom_id:
-                assignment = TeacherAssignment.query.filter_by(
-                    teacher_id=teacher.id,
-                    classroom_id=student.classroom_id,
-                    is_active=True
-                ).first()
-                has_access = bool(assignment)
-                if has_access:
-                    logger.debug(f"Teacher {teacher.id} has assignment access to student {student_id}")
-            
-            if not has_access:
+            # Head teacher or assignment access to the student's classroom
+            if not AccessService.can_access_student(teacher.id, student):
                 logger.warning(f"Teacher {teacher.id} denied access to student {student_id}")
                 return jsonify({'message': 'No access to this student'}), 403
         
@@ -176,13 +155,7 @@ def get_student_attendance(current_user, student_id):
                 logger.error(f"Invalid end_date format: {end_date}")
                 return jsonify({'message': 'Invalid end_date format. Use YYYY-MM-DD'}), 400
         
-        attendances = query.order_by(Attendance.date.desc()).all()
-        logger.info(f"Retrieved {len(attendances)} attendance records for student {student_id}")
-        
-        response_data = [att.to_dict() for att in attendances]
-        logger.debug(f"Student attendance count: {len(response_data)}")
-        
-        return jsonify(response_data)
+        return list_response(query.order_by(Attendance.date.desc(), Attendance.id.desc()), serialize_attendances)
     except Exception as e:
         logger.error(f"Error retrieving student attendance: {str(e)}")
         return jsonify({'message': str(e)}), 400
@@ -203,47 +176,84 @@ def get_teacher_attendance(current_user, teacher_id):
         logger.info(f"Retrieving attendance records for teacher {teacher_id}")
         
         # Get all attendance records for classrooms this teacher is responsible for
-        date_str = request.args.get('date')
-        
-        # Get teacher's classrooms
-        head_classrooms = Classroom.query.filter_by(head_teacher_id=teacher_id).all()
-        assigned_classrooms = db.session.query(Classroom).join(
-            TeacherAssignment,
-            Classroom.id == TeacherAssignment.classroom_id
-        ).filter(
-            TeacherAssignment.teacher_id == teacher_id,
-            TeacherAssignment.is_active == True
-        ).distinct().all()
-        
-        all_classroom_ids = list(set([c.id for c in head_classrooms + assigned_classrooms]))
+        all_classroom_ids = list(AccessService.classroom_ids(teacher_id))
         logger.info(f"Teacher {teacher_id} has access to {len(all_classroom_ids)} classrooms")
         
         if not all_classroom_ids:
             logger.info(f"Teacher {teacher_id} has no assigned classrooms")
-            return jsonify([])
         
+        classroom_id = request.args.get('classroom_id', type=int)
+        if classroom_id:
+            all_classroom_ids = [classroom_id] if classroom_id in all_classroom_ids else []
+        
+        # An empty IN matches nothing but still honours ?limit/?after and ?fields
         query = Attendance.query.filter(Attendance.classroom_id.in_(all_classroom_ids))
         
-        if date_str:
+        status = request.args.get('status')
+        if status:
+            query = query.filter(Attendance.status == status)
+        
+        for param, column_filter in (('date', lambda d: Attendance.date == d),
+                                     ('start_date', lambda d: Attendance.date >= d),
+                                     ('end_date', lambda d: Attendance.date <= d)):
+            value = request.args.get(param)
+            if not value:
+                continue
             try:
-                attendance_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                query = query.filter_by(date=attendance_date)
-                logger.debug(f"Filtering attendance for date: {attendance_date}")
+                query = query.filter(column_filter(datetime.strptime(value, '%Y-%m-%d').date()))
+                logger.debug(f"Filtering attendance on {param}: {value}")
             except ValueError:
-                logger.error(f"Invalid date format: {date_str}")
-                return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
+                logger.error(f"Invalid {param} format: {value}")
+                return jsonify({'message': f'Invalid {param} format. Use YYYY-MM-DD'}), 400
         
-        attendances = query.order_by(Attendance.date.desc()).all()
-        logger.info(f"Retrieved {len(attendances)} attendance records for teacher {teacher_id}")
-        
-        response_data = [att.to_dict() for att in attendances]
-        logger.debug(f"Teacher attendance records count: {len(response_data)}")
-        
-        return jsonify(response_data)
+        # Newest first; id breaks ties between records of the same day
+        return paginate(query, [Attendance.date, Attendance.id], serialize_attendances, descending=True)
     except Exception as e:
         logger.error(f"Error retrieving teacher attendance: {str(e)}")
         return jsonify({'message': str(e)}), 400
 
+@attendance_bp.route('/summary', methods=['GET'])
+@jwt_required()
+@role_required(['teacher', 'admin'])
+def get_attendance_summary(current_user):
+    """Days present/absent/late/excused per student of a classroom between two
+    dates of an evaluation period (the whole period by default)"""
+    classroom_id = request.args.get('classroom_id', type=int)
+    period_id = request.args.get('evaluation_period_id', type=int)
+    if not classroom_id or not period_id:
+        return jsonify({'message': 'classroom_id and evaluation_period_id are required'}), 400
+
+    if current_user.role == 'teacher':
+        teacher = current_user.teacher_profile
+        if not teacher:
+            return jsonify({'message': 'Teacher profile not found'}), 403
+
+        if not AccessService.can_access_classroom(teacher.id, classroom_id):
+            return jsonify({'message': 'No access to this classroom'}), 403
+
+    period = EvaluationPeriod.query.get_or_404(period_id)
+
+    bounds = {}
+    for param, default in (('start_date', period.start_date), ('end_date', period.end_date)):
+        value = request.args.get(param)
+        try:
+            bounds[param] = datetime.strptime(value, '%Y-%m-%d').date() if value else default
+        except ValueError:
+            return jsonify({'message': f'Invalid {param} format. Use YYYY-MM-DD'}), 400
+
+    start_date = max(bounds['start_date'], period.start_date)
+    end_date = min(bounds['end_date'], period.end_date)
+    if start_date > end_date:
+        return jsonify({'message': 'The date range does not overlap the evaluation period'}), 400
+
+    return jsonify({
+        'classroom_id': classroom_id,
+        'evaluation_period_id': period_id,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'students': AttendanceBitmapService.classroom_summary(classroom_id, period, start_date, end_date)
+    })
+
 @attendance_bp.route('/<int:attendance_id>', methods=['PUT'])
 @jwt_required()
 @role_required(['teacher', 'admin'])
@@ -265,8 +275,7 @@ def update_attendance(current_user, attendance_id):
                 
             if attendance.recorded_by != current_user.id:
                 # Or check if the user is a head teacher for that classroom
-                is_head_teacher = teacher.is_head_teacher and Classroom.query.filter_by(id=attendance.classroom_id, head_teacher_id=teacher.id).first()
-                if not is_head_teacher:
+                if not AccessService.is_head_teacher_of(teacher.id, attendance.classroom_id):
                     logger.warning(f"Teacher {teacher.id} denied permission to update attendance {attendance_id}")
                     return jsonify({'message': 'You do not have permission to update this record'}), 403
 
@@ -275,8 +284,7 @@ def update_attendance(current_user, attendance_id):
             logger.error("Status field missing in attendance update")
             return jsonify({'message': 'Status is required'}), 400
 
-        attendance.status = new_status
-        attendance.updated_at = datetime.utcnow()
+        AttendanceService.update_status(attendance, new_status)
         db.session.commit()
 
         response_data = {
@@ -311,12 +319,11 @@ def delete_attendance(current_user, attendance_id):
                 
             if attendance.recorded_by != current_user.id:
                 # Or check if the user is a head teacher for that classroom
-                is_head_teacher = teacher.is_head_teacher and Classroom.query.filter_by(id=attendance.classroom_id, head_teacher_id=teacher.id).first()
-                if not is_head_teacher:
+                if not AccessService.is_head_teacher_of(teacher.id, attendance.classroom_id):
                     logger.warning(f"Teacher {teacher.id} denied permission to delete attendance {attendance_id}")
                     return jsonify({'message': 'You do not have permission to delete this record'}), 403
 
-        db.session.delete(attendance)
+        AttendanceService.delete(attendance)
         db.session.commit()
 
         logger.info(f"Attendance record {attendance_id} deleted successfully")
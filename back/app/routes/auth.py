@@ -3,6 +3,8 @@ from flask_jwt_extended import jwt_required, create_access_token, get_jwt_identi
 from app.models.User import User
 from app.models.Student import Student
 from app.services.AuthService import AuthService
+from app.services.PrincipalService import PrincipalService
+from app.services.PasswordService import PasswordPoolBusy
 from app.utils.decorators import log_action
 from app import db
 from datetime import datetime, timedelta
@@ -41,11 +43,20 @@ def login():
             logger.warning(f"Login failed - inactive user for email: {email}")
             return jsonify({'message': 'Account is deactivated'}), 401
         
+        # Upgrade hashes made with older parameters while we have the password
+        if user.password_needs_rehash():
+            try:
+                user.set_password(password)
+                db.session.commit()
+                logger.info(f"Password hash upgraded for user {user.id}")
+            except PasswordPoolBusy:
+                db.session.rollback()
+        
         access_token = create_access_token(
             identity=str(user.id),
             additional_claims={'email': user.email, 'role': user.role}
         )
-        refresh_token = create_refresh_token(identity=user.id)
+        refresh_token = create_refresh_token(identity=str(user.id))
         
         user_data = user.to_dict()
         
@@ -57,17 +68,43 @@ def login():
         
         logger.info(f"Login successful for user {user.id} ({email}) - Role: {user.role}")
         return jsonify(response_data)
+    
+    except PasswordPoolBusy as e:
+        logger.warning(f"Login deferred - password pool busy for email: {email}")
+        response = jsonify({'message': 'Too many login attempts in progress, please retry'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response
         
     except Exception as e:
         logger.error(f"Login error for email {email}: {str(e)}")
         return jsonify({'message': 'Internal server error'}), 500
 
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """Issue a new access token from a refresh token, without any password work"""
+    current_user_id = get_jwt_identity()
+    principal = PrincipalService.load(int(current_user_id))
+    user = principal.user if principal else None
+    
+    if not user or not user.is_active:
+        logger.warning(f"Token refresh refused for user {current_user_id}")
+        return jsonify({'message': 'Invalid or inactive user'}), 401
+    
+    access_token = create_access_token(
+        identity=str(user.id),
+        additional_claims={'email': user.email, 'role': user.role}
+    )
+    return jsonify({'access_token': access_token})
+
 @auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        principal = PrincipalService.load(int(current_user_id))
+        user = principal.user if principal else None
         
         if not user:
             return jsonify({'message': 'User not found'}), 404
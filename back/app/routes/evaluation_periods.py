@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from app.models.EvaluationPeriod import EvaluationPeriod
 from app.utils.decorators import role_required, log_action
+from app.utils.serializers import serialize_evaluation_periods
 from app import db
 from datetime import datetime
 
@@ -14,7 +15,7 @@ evaluation_periods_bp = Blueprint('evaluation_periods', __name__)
 def get_evaluation_periods(current_user):
     """Get all evaluation periods"""
     periods = EvaluationPeriod.query.filter_by(is_active=True).order_by(EvaluationPeriod.start_date).all()
-    return jsonify([period.to_dict() for period in periods])
+    return jsonify(serialize_evaluation_periods(periods))
 
 @evaluation_periods_bp.route('/', methods=['POST'])
 @jwt_required()
@@ -166,4 +167,4 @@ def get_periods_by_academic_year(current_user, academic_year):
         is_active=True
     ).order_by(EvaluationPeriod.start_date).all()
     
-    return jsonify([period.to_dict() for period in periods])
\ No newline at end of file
+    return jsonify(serialize_evaluation_periods(periods))
\ No newline at end of file
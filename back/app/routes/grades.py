@@ -1,13 +1,18 @@
 # app/routes/grades.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required
 from app.models.Grade import Grade
-from app.models.TeacherAssignment import TeacherAssignment
 from app.models.Student import Student
-from app.models.Classroom import Classroom
+from app.models.Evaluation import Evaluation
+from app.services.AccessService import AccessService
+from app.services.GradeService import GradeService
+from app.services.GradeStatsService import GradeStatsService
+from app.services.AverageService import AverageService
+from app.services.GradebookService import GradebookService
 from app.utils.decorators import role_required, log_action
+from app.utils.serializers import serialize_grades
+from app.utils.pagination import paginate, list_response
 from app import db
-from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,60 +23,96 @@ grades_bp = Blueprint('grades', __name__)
 @role_required(['teacher', 'admin'])
 @log_action('ADD_GRADE', 'grades')
 def add_grade(current_user):
-    data = request.get_json()
+    data = request.get_json() or {}
+    if 'grades' in data:
+        return jsonify({'message': 'Use /api/grades/bulk to add several grades'}), 400
     
-    required_fields = ['student_id', 'subject_id', 'evaluation_period_id', 'grade']
-    missing_fields = [field for field in required_fields if field not in data]
-    if missing_fields:
-        return jsonify({'message': f'Missing required fields: {", ".join(missing_fields)}'}), 400
+    try:
+        entries = GradeService.parse_entries(data)
+        evaluations = GradeService.evaluations(entries)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    entry = entries[0]
+    evaluation = evaluations[entry['evaluation_id']]
+    
+    if current_user.role == 'teacher':
+        teacher = current_user.teacher_profile
+        if not teacher:
+            return jsonify({'message': 'Teacher profile not found'}), 403
+        if not AccessService.can_teach(teacher.id, evaluation.classroom_id, evaluation.subject_id):
+            return jsonify({'message': 'No assignment found for this subject/classroom'}), 403
     
     try:
-        if current_user.role == 'teacher':  # Fixed: String comparison
-            teacher = current_user.teacher_profile
-            if not teacher:
-                return jsonify({'message': 'Teacher profile not found'}), 403
-            
-            student = Student.query.get_or_404(data['student_id'])
-            
-            assignment = TeacherAssignment.query.filter_by(
-                teacher_id=teacher.id,
-                subject_id=data['subject_id'],
-                classroom_id=student.classroom_id,
-                is_active=True
-            ).first()
-            
-            if not assignment:
-                return jsonify({'message': 'No assignment found for this subject/classroom'}), 403
-        
-        student = Student.query.filter_by(
-            id=data['student_id'],
-            is_enrolled=True
-        ).first()
-        
-        if not student:
-            return jsonify({'message': 'Student not found or not enrolled'}), 404
-        
-        grade = Grade(
-            student_id=data['student_id'],
-            subject_id=data['subject_id'],
-            evaluation_id=data.get('evaluation_id'),  # Fixed: Use evaluation_id instead
-            points_earned=float(data['grade']),
-            points_possible=float(data.get('max_grade', 20)),
-            comments=data.get('comments'),
-            created_by=current_user.id
+        # Percentage and letter come from the classroom's grading scale
+        GradeService.record(entries, current_user.id, evaluations)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+    
+    grade = Grade.query.filter_by(student_id=entry['student_id'], evaluation_id=evaluation.id).first()
+    return jsonify({
+        'message': 'Grade added successfully',
+        'grade': grade.to_dict()
+    }), 201
+
+@grades_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@role_required(['teacher', 'admin'])
+@log_action('ADD_GRADES_BULK', 'grades')
+def add_grades_bulk(current_user):
+    """Grade a whole evaluation: {evaluation_id, grades: [{student_id, points, comments}], partial}.
+
+    Invalid rows are reported per row; with partial (GRADES_BULK_PARTIAL by
+    default) the valid rows are still written, otherwise nothing is.
+    """
+    data = request.get_json() or {}
+    if not data.get('evaluation_id') or not isinstance(data.get('grades'), list):
+        return jsonify({'message': 'evaluation_id and a list of grades are required'}), 400
+    max_rows = current_app.config.get('GRADES_BULK_MAX_ROWS', 1000)
+    if len(data['grades']) > max_rows:
+        return jsonify({'message': f'At most {max_rows} grades per request'}), 400
+
+    try:
+        entries = GradeService.parse_entries(data, evaluation_id=data['evaluation_id'])
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    evaluation = db.session.get(Evaluation, entries[0]['evaluation_id'])
+    if not evaluation:
+        return jsonify({'message': 'Evaluation not found'}), 404
+    if current_user.role == 'teacher':
+        teacher = current_user.teacher_profile
+        if not teacher:
+            return jsonify({'message': 'Teacher profile not found'}), 403
+        if not AccessService.can_teach(teacher.id, evaluation.classroom_id, evaluation.subject_id):
+            return jsonify({'message': 'No assignment found for this subject/classroom'}), 403
+
+    evaluations = {evaluation.id: evaluation}
+    errors = GradeService.validate(entries, evaluations)
+    partial = data.get('partial', current_app.config.get('GRADES_BULK_PARTIAL', False))
+    if errors and not partial:
+        return jsonify({'message': 'Some grades are invalid, none were saved', 'errors': errors}), 400
+
+    invalid = {error['index'] for error in errors}
+    try:
+        written = GradeService.write(
+            [entry for index, entry in enumerate(entries) if index not in invalid],
+            current_user.id, evaluations
         )
-        
-        db.session.add(grade)
         db.session.commit()
-        
-        return jsonify({
-            'message': 'Grade added successfully',
-            'grade': grade.to_dict()
-        }), 201
     except Exception as e:
         db.session.rollback()
+        logger.error(f"Error saving grades for evaluation {evaluation.id}: {str(e)}")
         return jsonify({'message': str(e)}), 400
 
+    return jsonify({
+        'message': f'{written} grades saved',
+        'evaluation_id': evaluation.id,
+        'written': written,
+        'errors': errors
+    })
+
 @grades_bp.route('/student/<int:student_id>', methods=['GET'])
 @jwt_required()
 @role_required(['teacher', 'admin'])
@@ -83,20 +124,7 @@ def get_student_grades(current_user, student_id):
         if not teacher:
             return jsonify({'message': 'Teacher profile not found'}), 403
             
-        has_access = False
-        
-        if teacher.is_head_teacher and student.classroom and student.classroom.head_teacher_id == teacher.id:
-            has_access = True
-        
-        if not has_access and student.classroom_id:
-            assignment = TeacherAssignment.query.filter_by(
-                teacher_id=teacher.id,
-                classroom_id=student.classroom_id,
-                is_active=True
-            ).first()
-            has_access = bool(assignment)
-        
-        if not has_access:
+        if not AccessService.can_access_student(teacher.id, student):
             return jsonify({'message': 'No access to this student'}), 403
     
     period_id = request.args.get('period_id', type=int)
@@ -110,8 +138,7 @@ def get_student_grades(current_user, student_id):
     if subject_id:
         query = query.filter_by(subject_id=subject_id)
     
-    grades = query.all()
-    return jsonify([grade.to_dict() for grade in grades])
+    return list_response(query.order_by(Grade.id), serialize_grades)
 
 @grades_bp.route('/<int:grade_id>', methods=['PUT'])
 @jwt_required()
@@ -131,24 +158,24 @@ def update_grade(current_user, grade_id):
                 logger.error(f"Teacher profile not found for user {current_user.id}")
                 return jsonify({'message': 'Teacher profile not found'}), 403
                 
-            # Only the teacher who created the grade can update it
-            if grade.teacher_id != teacher.id:
-                logger.warning(f"Teacher {teacher.id} denied access to update grade {grade_id} "
-                             f"(created by teacher {grade.teacher_id})")
-                return jsonify({'message': 'You can only update your own grades'}), 403
+            # Teachers change the grades of the subjects and classrooms they teach
+            evaluation = grade.evaluation
+            if not AccessService.can_teach(teacher.id, evaluation.classroom_id, evaluation.subject_id):
+                logger.warning(f"Teacher {teacher.id} denied access to update grade {grade_id}")
+                return jsonify({'message': 'You can only update grades of the subjects you teach'}), 403
         
-        data = request.get_json()
+        data = request.get_json() or {}
         logger.info(f"Updating grade {grade_id} with data: {data}")
         
-        # Update grade fields
-        for field in ['grade', 'max_grade', 'evaluation_type', 'evaluation_name', 'comments']:
-            if field in data:
-                setattr(grade, field, data[field])
-        
-        if 'evaluation_date' in data and data['evaluation_date']:
-            grade.evaluation_date = datetime.strptime(data['evaluation_date'], '%Y-%m-%d').date()
-        
-        grade.updated_at = datetime.utcnow()
+        # Points possible come from the evaluation; percentage and letter are recomputed
+        entries = GradeService.parse_entries({
+            'student_id': grade.student_id,
+            'evaluation_id': grade.evaluation_id,
+            'points_earned': data.get('points_earned', data.get('grade', grade.points_earned)),
+            'comments': data.get('comments'),
+            'is_excused': data.get('is_excused', grade.is_excused)
+        })
+        GradeService.record(entries, current_user.id)
         db.session.commit()
         
         new_data = grade.to_dict()
@@ -183,11 +210,11 @@ def delete_grade(current_user, grade_id):
                 logger.error(f"Teacher profile not found for user {current_user.id}")
                 return jsonify({'message': 'Teacher profile not found'}), 403
                 
-            # Only the teacher who created the grade can delete it
-            if grade.teacher_id != teacher.id:
-                logger.warning(f"Teacher {teacher.id} denied access to delete grade {grade_id} "
-                             f"(created by teacher {grade.teacher_id})")
-                return jsonify({'message': 'You can only delete your own grades'}), 403
+            # Teachers delete the grades of the subjects and classrooms they teach
+            evaluation = grade.evaluation
+            if not AccessService.can_teach(teacher.id, evaluation.classroom_id, evaluation.subject_id):
+                logger.warning(f"Teacher {teacher.id} denied access to delete grade {grade_id}")
+                return jsonify({'message': 'You can only delete grades of the subjects you teach'}), 403
         
         db.session.delete(grade)
         db.session.commit()
@@ -213,37 +240,97 @@ def get_classroom_grades(current_user, classroom_id, period_id):
                 logger.error(f"Teacher profile not found for user {current_user.id}")
                 return jsonify({'message': 'Teacher profile not found'}), 403
             
-            # Check if head teacher of this classroom
-            is_head_teacher = teacher.is_head_teacher and \
-                             Classroom.query.filter_by(id=classroom_id, head_teacher_id=teacher.id).first()
-            
-            # Check if assigned to this classroom
-            has_assignment = TeacherAssignment.query.filter_by(
-                teacher_id=teacher.id,
-                classroom_id=classroom_id,
-                is_active=True
-            ).first()
-            
-            if not (is_head_teacher or has_assignment):
+            # Head teacher of, or assigned to, this classroom
+            if not AccessService.can_access_classroom(teacher.id, classroom_id):
                 logger.warning(f"Teacher {teacher.id} denied access to classroom {classroom_id}")
                 return jsonify({'message': 'No access to this classroom'}), 403
         
-        grades = Grade.query.join(Student).filter(
+        # Grades belong to a period through their evaluation
+        query = Grade.query.join(Student).join(Evaluation, Grade.evaluation_id == Evaluation.id).filter(
             Student.classroom_id == classroom_id,
             Student.is_enrolled == True,
-            Grade.evaluation_period_id == period_id
-        ).all()
-        
-        logger.info(f"Retrieved {len(grades)} grades for classroom {classroom_id}, period {period_id}")
-        
-        response_data = [grade.to_dict() for grade in grades]
-        logger.debug(f"Classroom {classroom_id} grades count: {len(response_data)}")
+            Evaluation.evaluation_period_id == period_id
+        ).order_by(Grade.id)
         
-        return jsonify(response_data)
+        return list_response(query, serialize_grades)
     except Exception as e:
         logger.error(f"Error retrieving classroom grades: {str(e)}")
         return jsonify({'message': str(e)}), 400
 
+@grades_bp.route('/classroom/<int:classroom_id>/period/<int:period_id>/matrix', methods=['GET'])
+@jwt_required()
+@role_required(['teacher', 'admin'])
+def get_classroom_gradebook(current_user, classroom_id, period_id):
+    """Students x evaluations points matrix with per-subject weighted averages"""
+    if current_user.role == 'teacher':
+        teacher = current_user.teacher_profile
+        if not teacher:
+            return jsonify({'message': 'Teacher profile not found'}), 403
+        
+        if not AccessService.can_access_classroom(teacher.id, classroom_id):
+            return jsonify({'message': 'No access to this classroom'}), 403
+    
+    gradebook = GradebookService.build(classroom_id, period_id)
+    return jsonify(GradebookService.to_json(classroom_id, period_id, gradebook))
+
+@grades_bp.route('/averages/classroom/<int:classroom_id>/period/<int:period_id>', methods=['GET'])
+@jwt_required()
+@role_required(['teacher', 'admin'])
+def get_classroom_averages(current_user, classroom_id, period_id):
+    """Subject and overall weighted averages out of 20 of a classroom's students"""
+    if current_user.role == 'teacher':
+        teacher = current_user.teacher_profile
+        if not teacher:
+            return jsonify({'message': 'Teacher profile not found'}), 403
+        
+        if not AccessService.can_access_classroom(teacher.id, classroom_id):
+            return jsonify({'message': 'No access to this classroom'}), 403
+    
+    averages = AverageService.averages(period_id, classroom_id=classroom_id)
+    return jsonify(AverageService.to_json(period_id, averages, classroom_id))
+
+@grades_bp.route('/averages/period/<int:period_id>', methods=['GET'])
+@jwt_required()
+@role_required('admin')
+def get_school_averages(current_user, period_id):
+    """Subject and overall weighted averages out of 20 of every student in the school"""
+    averages = AverageService.averages(period_id)
+    return jsonify(AverageService.to_json(period_id, averages))
+
+@grades_bp.route('/stats/evaluation/<int:evaluation_id>', methods=['GET'])
+@jwt_required()
+@role_required(['teacher', 'admin'])
+def get_evaluation_stats(current_user, evaluation_id):
+    """Mean, median, std-dev, min/max and histogram of an evaluation's points"""
+    stats = GradeStatsService.evaluation_stats(evaluation_id)
+    if stats is None:
+        return jsonify({'message': 'Evaluation not found'}), 404
+    
+    if current_user.role == 'teacher':
+        teacher = current_user.teacher_profile
+        if not teacher:
+            return jsonify({'message': 'Teacher profile not found'}), 403
+        
+        if not AccessService.can_access_classroom(teacher.id, stats['classroom_id']):
+            return jsonify({'message': 'No access to this classroom'}), 403
+    
+    return jsonify(stats)
+
+@grades_bp.route('/stats/classroom/<int:classroom_id>/period/<int:period_id>/subject/<int:subject_id>', methods=['GET'])
+@jwt_required()
+@role_required(['teacher', 'admin'])
+def get_subject_stats(current_user, classroom_id, period_id, subject_id):
+    """Statistics of all grades of a subject in a classroom and period, out of 20"""
+    if current_user.role == 'teacher':
+        teacher = current_user.teacher_profile
+        if not teacher:
+            return jsonify({'message': 'Teacher profile not found'}), 403
+        
+        if not AccessService.can_access_classroom(teacher.id, classroom_id):
+            return jsonify({'message': 'No access to this classroom'}), 403
+    
+    return jsonify(GradeStatsService.subject_stats(subject_id, classroom_id, period_id))
+
 @grades_bp.route('/teacher/<int:teacher_id>', methods=['GET'])
 @jwt_required()
 @role_required(['teacher', 'admin'])
@@ -265,24 +352,21 @@ def get_teacher_grades(current_user, teacher_id):
         
         logger.debug(f"Filtering teacher grades - period_id: {period_id}, subject_id: {subject_id}, classroom_id: {classroom_id}")
         
-        query = Grade.query.filter_by(teacher_id=teacher_id)
+        # A teacher's grades are those given on the evaluations they created
+        query = Grade.query.join(Evaluation, Grade.evaluation_id == Evaluation.id).filter(
+            Evaluation.created_by == teacher_id
+        )
         
         if period_id:
-            query = query.filter_by(evaluation_period_id=period_id)
+            query = query.filter(Evaluation.evaluation_period_id == period_id)
         
         if subject_id:
-            query = query.filter_by(subject_id=subject_id)
+            query = query.filter(Grade.subject_id == subject_id)
         
         if classroom_id:
             query = query.join(Student).filter(Student.classroom_id == classroom_id)
         
-        grades = query.all()
-        logger.info(f"Retrieved {len(grades)} grades for teacher {teacher_id}")
-        
-        response_data = [grade.to_dict() for grade in grades]
-        logger.debug(f"Teacher {teacher_id} grades count: {len(response_data)}")
-        
-        return jsonify(response_data)
+        return paginate(query, [Grade.id], serialize_grades)
     except Exception as e:
         logger.error(f"Error retrieving teacher grades: {str(e)}")
         return jsonify({'message': str(e)}), 400
\ No newline at end of file
@@ -1,19 +1,43 @@
 # app/routes/reports.py
 from flask import Blueprint, request, jsonify, send_file
 from flask_jwt_extended import jwt_required
-from app.models.ReportCard import ReportCard
+from app.models.ReportCard import ReportCard, ReportBatch
+from app.models.Classroom import Classroom
+from app.models.Teacher import Teacher
 from app.models.Student import Student
 from app.models.Grade import Grade
-from app.models.Classroom import Classroom
-from app.models.TeacherAssignment import TeacherAssignment
+from app.models.EvaluationPeriod import EvaluationPeriod
+from app.models.AttendanceRollup import AttendanceDailyRollup, StudentAttendanceTally
 from app.services.ReportService import ReportService
+from app.services.AccessService import AccessService
 from app.utils.decorators import role_required, log_action
+from app.utils.serializers import serialize_report_cards
+from app.utils.pagination import list_response
 from app import db
 import logging
 
 logger = logging.getLogger(__name__)
 reports_bp = Blueprint('reports', __name__)
 
+def _batch_options(data, teacher_id=None):
+    """(teacher_id, teacher_comments, None) from a batch request body, or (None, None, error response).
+    A teacher_id passed in replaces the one from the body."""
+    if not isinstance(data, dict):
+        return None, None, (jsonify({'message': 'Invalid request body'}), 400)
+    if teacher_id is None and data.get('teacher_id') is not None:
+        teacher_id = data['teacher_id']
+        try:
+            teacher_id = int(teacher_id)
+        except (TypeError, ValueError):
+            return None, None, (jsonify({'message': f'Invalid teacher id: {teacher_id}'}), 400)
+        if db.session.get(Teacher, teacher_id) is None:
+            return None, None, (jsonify({'message': 'Teacher not found'}), 404)
+    
+    comments = data.get('teacher_comments')
+    if comments is not None and not isinstance(comments, str):
+        return None, None, (jsonify({'message': 'teacher_comments must be a string'}), 400)
+    return teacher_id, comments, None
+
 @reports_bp.route('/generate/<int:student_id>/<int:period_id>', methods=['POST'])
 @jwt_required()
 @role_required(['teacher', 'admin'])
@@ -26,8 +50,7 @@ def generate_report(current_user, student_id, period_id):
         if not teacher:
             return jsonify({'message': 'Teacher profile not found'}), 403
         
-        if not (teacher.is_head_teacher and student.classroom and 
-                student.classroom.head_teacher_id == teacher.id):
+        if not AccessService.is_head_teacher_of(teacher.id, student.classroom_id):
             return jsonify({'message': 'Only head teacher can generate reports'}), 403
     
     try:
@@ -48,6 +71,82 @@ def generate_report(current_user, student_id, period_id):
     except Exception as e:
         return jsonify({'message': str(e)}), 400
 
+@reports_bp.route('/generate/classroom/<int:classroom_id>/<int:period_id>', methods=['POST'])
+@jwt_required()
+@role_required(['teacher', 'admin'])
+@log_action('GENERATE_CLASSROOM_REPORTS', 'report_cards')
+def generate_classroom_reports(current_user, classroom_id, period_id):
+    """Report cards of every enrolled student of a classroom, ranked, in one transaction"""
+    if db.session.get(Classroom, classroom_id) is None:
+        return jsonify({'message': 'Classroom not found'}), 404
+    if db.session.get(EvaluationPeriod, period_id) is None:
+        return jsonify({'message': 'Evaluation period not found'}), 404
+    
+    own_teacher_id = None
+    if current_user.role == 'teacher':
+        teacher = current_user.teacher_profile
+        if not teacher:
+            return jsonify({'message': 'Teacher profile not found'}), 403
+        
+        if not AccessService.is_head_teacher_of(teacher.id, classroom_id):
+            return jsonify({'message': 'Only head teacher can generate reports'}), 403
+        own_teacher_id = teacher.id
+    
+    teacher_id, comments, error = _batch_options(request.get_json(silent=True) or {}, own_teacher_id)
+    if error:
+        return error
+    
+    try:
+        batch = ReportService.generate_batch(period_id, teacher_id, classroom_id, current_user.id, comments)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error generating reports for classroom {classroom_id}: {str(e)}")
+        return jsonify({'message': str(e)}), 400
+    
+    return jsonify({
+        'message': f'{batch.written} report cards generated',
+        'batch': batch.to_dict()
+    }), 201
+
+@reports_bp.route('/generate/school/<int:period_id>', methods=['POST'])
+@jwt_required()
+@role_required('admin')
+@log_action('GENERATE_SCHOOL_REPORTS', 'report_cards')
+def generate_school_reports(current_user, period_id):
+    """Report cards of every enrolled student, signed by their head teacher unless teacher_id is given"""
+    if db.session.get(EvaluationPeriod, period_id) is None:
+        return jsonify({'message': 'Evaluation period not found'}), 404
+    
+    teacher_id, comments, error = _batch_options(request.get_json(silent=True) or {})
+    if error:
+        return error
+    
+    try:
+        batch = ReportService.generate_batch(period_id, teacher_id, requested_by=current_user.id, comments=comments)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error generating school reports: {str(e)}")
+        return jsonify({'message': str(e)}), 400
+    
+    return jsonify({
+        'message': f'{batch.written} report cards generated',
+        'batch': batch.to_dict()
+    }), 201
+
+@reports_bp.route('/batches', methods=['GET'])
+@jwt_required()
+@role_required('admin')
+def get_report_batches(current_user):
+    """Latest report generation runs with their timing, optionally for one period"""
+    query = ReportBatch.query
+    period_id = request.args.get('period_id', type=int)
+    if period_id is not None:
+        query = query.filter(ReportBatch.evaluation_period_id == period_id)
+    batches = query.order_by(ReportBatch.id.desc()).limit(request.args.get('limit', 100, type=int)).all()
+    return jsonify([batch.to_dict() for batch in batches])
+
 @reports_bp.route('/classroom/<int:classroom_id>/period/<int:period_id>', methods=['GET'])
 @jwt_required()
 @role_required(['teacher', 'admin'])
@@ -57,25 +156,51 @@ def get_classroom_reports(current_user, classroom_id, period_id):
         if not teacher:
             return jsonify({'message': 'Teacher profile not found'}), 403
         
-        is_head_teacher = teacher.is_head_teacher and \
-                         Classroom.query.filter_by(id=classroom_id, head_teacher_id=teacher.id).first()
-        
-        has_assignment = TeacherAssignment.query.filter_by(
-            teacher_id=teacher.id,
-            classroom_id=classroom_id,
-            is_active=True
-        ).first()
-        
-        if not (is_head_teacher or has_assignment):
+        if not AccessService.can_access_classroom(teacher.id, classroom_id):
             return jsonify({'message': 'No access to this classroom'}), 403
     
-    reports = ReportCard.query.join(Student).filter(
+    query = ReportCard.query.join(Student).filter(
         Student.classroom_id == classroom_id,
         Student.is_enrolled == True,
         ReportCard.evaluation_period_id == period_id
-    ).all()
+    ).order_by(ReportCard.id)
     
-    return jsonify([report.to_dict() for report in reports])
+    return list_response(query, serialize_report_cards)
+
+@reports_bp.route('/attendance/classroom/<int:classroom_id>/period/<int:period_id>', methods=['GET'])
+@jwt_required()
+@role_required(['teacher', 'admin'])
+def get_classroom_attendance_report(current_user, classroom_id, period_id):
+    """Per-student tallies and per-day counts for a period, read from the rollups"""
+    if current_user.role == 'teacher':
+        teacher = current_user.teacher_profile
+        if not teacher:
+            return jsonify({'message': 'Teacher profile not found'}), 403
+        
+        if not AccessService.can_access_classroom(teacher.id, classroom_id):
+            return jsonify({'message': 'No access to this classroom'}), 403
+    
+    period = EvaluationPeriod.query.get_or_404(period_id)
+    
+    tallies = StudentAttendanceTally.query.join(
+        Student, StudentAttendanceTally.student_id == Student.id
+    ).filter(
+        Student.classroom_id == classroom_id,
+        Student.is_enrolled == True,
+        StudentAttendanceTally.evaluation_period_id == period_id
+    ).order_by(StudentAttendanceTally.student_id).all()
+    
+    days = AttendanceDailyRollup.query.filter(
+        AttendanceDailyRollup.classroom_id == classroom_id,
+        AttendanceDailyRollup.date.between(period.start_date, period.end_date)
+    ).order_by(AttendanceDailyRollup.date).all()
+    
+    return jsonify({
+        'classroom_id': classroom_id,
+        'evaluation_period_id': period_id,
+        'students': [tally.to_dict() for tally in tallies],
+        'days': [day.to_dict() for day in days]
+    })
 
 @reports_bp.route('/teacher/<int:teacher_id>/period/<int:period_id>', methods=['GET'])
 @jwt_required()
@@ -92,34 +217,19 @@ def get_teacher_reports(current_user, teacher_id, period_id):
         logger.info(f"Retrieving reports for teacher {teacher_id}, period {period_id}")
         
         # Get reports for students in teacher's classrooms
-        teacher_classrooms = Classroom.query.filter_by(head_teacher_id=teacher_id).all()
-        assigned_classrooms = db.session.query(Classroom).join(
-            TeacherAssignment,
-            Classroom.id == TeacherAssignment.classroom_id
-        ).filter(
-            TeacherAssignment.teacher_id == teacher_id,
-            TeacherAssignment.is_active == True
-        ).distinct().all()
-        
-        all_classroom_ids = list(set([c.id for c in teacher_classrooms + assigned_classrooms]))
+        all_classroom_ids = list(AccessService.classroom_ids(teacher_id))
         logger.info(f"Teacher {teacher_id} has access to {len(all_classroom_ids)} classrooms")
         
         if not all_classroom_ids:
             logger.info(f"Teacher {teacher_id} has no assigned classrooms")
-            return jsonify([])
         
-        reports = ReportCard.query.join(Student).filter(
+        query = ReportCard.query.join(Student).filter(
             Student.classroom_id.in_(all_classroom_ids),
             Student.is_enrolled == True,
             ReportCard.evaluation_period_id == period_id
-        ).all()
-        
-        logger.info(f"Retrieved {len(reports)} reports for teacher {teacher_id}, period {period_id}")
-        
-        response_data = [report.to_dict() for report in reports]
-        logger.debug(f"Teacher reports count: {len(response_data)}")
+        ).order_by(ReportCard.id)
         
-        return jsonify(response_data)
+        return list_response(query, serialize_report_cards)
     except Exception as e:
         logger.error(f"Error retrieving teacher reports: {str(e)}")
         return jsonify({'message': str(e)}), 400
@@ -141,26 +251,8 @@ def download_report(current_user, report_id):
                 logger.error(f"Teacher profile not found for user {current_user.id}")
                 return jsonify({'message': 'Teacher profile not found'}), 403
             
-            # Check if teacher has access to this student
-            has_access = False
-            
-            # Head teacher access
-            if teacher.is_head_teacher and student.classroom and student.classroom.head_teacher_id == teacher.id:
-                has_access = True
-                logger.debug(f"Head teacher {teacher.id} has access to report {report_id}")
-            
-            # Assignment access
-            if not has_access and student.classroom_id:
-                assignment = TeacherAssignment.query.filter_by(
-                    teacher_id=teacher.id,
-                    classroom_id=student.classroom_id,
-                    is_active=True
-                ).first()
-                has_access = bool(assignment)
-                if has_access:
-                    logger.debug(f"Teacher {teacher.id} has assignment access to report {report_id}")
-            
-            if not has_access:
+            # Head teacher or assignment access to the student's classroom
+            if not AccessService.can_access_student(teacher.id, student):
                 logger.warning(f"Teacher {teacher.id} denied access to report {report_id}")
                 return jsonify({'message': 'No access to this report'}), 403
         
@@ -7,7 +7,12 @@ from app.models.Teacher import Teacher
 from app.models.Classroom import Classroom
 from app.models.TeacherAssignment import TeacherAssignment
 from app.services.AuthService import AuthService
-from app.utils.decorators import role_required, log_action
+from app.services.AccessService import AccessService
+from app.services.PrincipalService import PrincipalService
+from app.services.RevocationService import RevocationService
+from app.utils.decorators import role_required, log_action, etag
+from app.utils.serializers import serialize_students
+from app.utils.pagination import paginate, list_response, as_bool
 from app import db
 from datetime import datetime
 import secrets
@@ -65,34 +70,21 @@ def register_student():
 @students_bp.route('/', methods=['GET'])
 @jwt_required()
 @role_required(['admin', 'teacher'])
+@etag(Student, User, Classroom, Teacher, TeacherAssignment)
 def get_students(current_user):
-    if current_user.role == 'admin':  # Fixed: String comparison
-        students = Student.query.filter_by(is_enrolled=True).all()
-    else:
+    query = Student.query.filter(Student.is_enrolled == request.args.get('enrolled', True, type=as_bool))
+    
+    classroom_id = request.args.get('classroom_id', type=int)
+    if classroom_id:
+        query = query.filter(Student.classroom_id == classroom_id)
+    
+    if current_user.role != 'admin':  # Fixed: String comparison
         teacher = current_user.teacher_profile
-        if not teacher:
-            return jsonify([])
-            
-        head_classrooms = Classroom.query.filter_by(head_teacher_id=teacher.id).all()
-        head_classroom_ids = [c.id for c in head_classrooms]
-        
-        assigned_classrooms = db.session.query(Classroom.id).join(
-            TeacherAssignment,
-            Classroom.id == TeacherAssignment.classroom_id
-        ).filter(
-            TeacherAssignment.teacher_id == teacher.id,
-            TeacherAssignment.is_active == True
-        ).distinct().all()
-        assigned_classroom_ids = [c.id for c in assigned_classrooms]
-        
-        all_classroom_ids = list(set(head_classroom_ids + assigned_classroom_ids))
-        
-        students = Student.query.filter(
-            Student.classroom_id.in_(all_classroom_ids),
-            Student.is_enrolled == True
-        ).all() if all_classroom_ids else []
+        all_classroom_ids = list(AccessService.classroom_ids(teacher.id)) if teacher else []
+        # An empty IN matches nothing but still honours ?limit/?after and ?fields
+        query = query.filter(Student.classroom_id.in_(all_classroom_ids))
     
-    return jsonify([student.to_dict() for student in students])
+    return paginate(query, [Student.id], serialize_students)
 
 @students_bp.route('/<int:student_id>', methods=['GET'])
 @jwt_required()
@@ -109,26 +101,8 @@ def get_student_details(current_user, student_id):
                 logger.error(f"Teacher profile not found for user {current_user.id}")
                 return jsonify({'message': 'Teacher profile not found'}), 403
                 
-            # Check if teacher has access to this student
-            has_access = False
-            
-            # Head teacher access
-            if teacher.is_head_teacher and student.classroom and student.classroom.head_teacher_id == teacher.id:
-                has_access = True
-                logger.debug(f"Head teacher {teacher.id} has access to student {student_id}")
-            
-            # Assignment access
-            if not has_access and student.classroom_id:
-                assignment = TeacherAssignment.query.filter_by(
-                    teacher_id=teacher.id,
-                    classroom_id=student.classroom_id,
-                    is_active=True
-                ).first()
-                has_access = bool(assignment)
-                if has_access:
-                    logger.debug(f"Teacher {teacher.id} has assignment access to student {student_id}")
-            
-            if not has_access:
+            # Head teacher or assignment access to the student's classroom
+            if not AccessService.can_access_student(teacher.id, student):
                 logger.warning(f"Teacher {teacher.id} denied access to student {student_id}")
                 return jsonify({'message': 'No access to this student'}), 403
         
@@ -144,30 +118,22 @@ def get_student_details(current_user, student_id):
 @students_bp.route('/classroom/<int:classroom_id>', methods=['GET'])
 @jwt_required()
 @role_required(['admin', 'teacher'])
+@etag(Student, User, Classroom, Teacher, TeacherAssignment)
 def get_classroom_students(current_user, classroom_id):
     if current_user.role == 'teacher':  # Fixed: String comparison
         teacher = current_user.teacher_profile
         if not teacher:
             return jsonify({'message': 'Teacher profile not found'}), 403
         
-        is_head_teacher = teacher.is_head_teacher and \
-                         Classroom.query.filter_by(id=classroom_id, head_teacher_id=teacher.id).first()
-        
-        has_assignment = TeacherAssignment.query.filter_by(
-            teacher_id=teacher.id,
-            classroom_id=classroom_id,
-            is_active=True
-        ).first()
-        
-        if not (is_head_teacher or has_assignment):
+        if not AccessService.can_access_classroom(teacher.id, classroom_id):
             return jsonify({'message': 'No access to this classroom'}), 403
     
-    students = Student.query.filter_by(
+    query = Student.query.filter_by(
         classroom_id=classroom_id,
         is_enrolled=True
-    ).all()
+    ).order_by(Student.id)
     
-    return jsonify([student.to_dict() for student in students])
+    return list_response(query, serialize_students)
 
 @students_bp.route('/<int:student_id>', methods=['PUT'])
 @jwt_required()
@@ -189,8 +155,7 @@ def update_student(current_user, student_id):
                 return jsonify({'message': 'Teacher profile not found'}), 403
                 
             # Only head teacher of the student's classroom can update
-            if not (teacher.is_head_teacher and student.classroom and 
-                    student.classroom.head_teacher_id == teacher.id):
+            if not AccessService.is_head_teacher_of(teacher.id, student.classroom_id):
                 logger.warning(f"Teacher {teacher.id} denied permission to update student {student_id}")
                 return jsonify({'message': 'Only the head teacher can update student information'}), 403
         
@@ -213,6 +178,7 @@ def update_student(current_user, student_id):
                 setattr(user, field, data[field])
         
         db.session.commit()
+        PrincipalService.invalidate(user.id)
         
         new_student_data = student.to_dict()
         new_user_data = student.user.to_dict()
@@ -248,7 +214,9 @@ def delete_student(current_user, student_id):
         # Deactivate instead of delete to preserve data integrity
         user.is_active = False
         student.is_enrolled = False
+        RevocationService.revoke_user(user.id, 'DELETE_STUDENT')
         db.session.commit()
+        PrincipalService.invalidate(user.id)
         
         logger.info(f"Student {student_id} deactivated successfully")
         return jsonify({'message': 'Student deactivated successfully'})
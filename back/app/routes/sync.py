@@ -0,0 +1,61 @@
+# app/routes/sync.py
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
+from app.services.AccessService import AccessService
+from app.services.SyncService import SyncService
+from app.utils.decorators import role_required, log_action
+from app.utils.pagination import InvalidCursor
+from app import db
+import logging
+
+logger = logging.getLogger(__name__)
+sync_bp = Blueprint('sync', __name__)
+
+@sync_bp.route('/', methods=['GET'])
+@jwt_required()
+@role_required(['teacher', 'admin'])
+def get_changes(current_user):
+    """Rows changed since ?since=<watermark> (everything without it)"""
+    classroom_ids = None
+    if current_user.role == 'teacher':
+        teacher = current_user.teacher_profile
+        if not teacher:
+            return jsonify({'message': 'Teacher profile not found'}), 403
+        classroom_ids = list(AccessService.classroom_ids(teacher.id))
+
+    try:
+        return jsonify(SyncService.changes(classroom_ids, request.args.get('since')))
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
+
+
+@sync_bp.route('/push', methods=['POST'])
+@jwt_required()
+@role_required(['teacher', 'admin'])
+@log_action('SYNC_PUSH', 'sync')
+def push_changes(current_user):
+    """Apply queued offline writes; operations already pushed are not applied again"""
+    data = request.get_json() or {}
+    try:
+        operations = SyncService.parse_operations(data)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    try:
+        results = SyncService.push(current_user, operations)
+        db.session.commit()
+    except IntegrityError:
+        # The same operations are being pushed concurrently; retrying replays their results
+        db.session.rollback()
+        return jsonify({'message': 'Operations are already being applied, retry'}), 409
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error applying sync operations: {str(e)}")
+        return jsonify({'message': str(e)}), 400
+
+    return jsonify({
+        'results': results,
+        'applied': sum(1 for result in results if result['status'] == 'applied' and not result['replayed']),
+        'rejected': sum(1 for result in results if result['status'] == 'rejected')
+    })
@@ -6,7 +6,12 @@ from app.models.Teacher import Teacher
 from app.models.Classroom import Classroom
 from app.models.TeacherAssignment import TeacherAssignment
 from app.models.Student import Student
-from app.utils.decorators import role_required
+from app.models.Subject import Subject
+from app.services.AccessService import AccessService
+from app.services.PrincipalService import PrincipalService
+from app.utils.decorators import role_required, etag
+from app.utils.serializers import serialize_assignments, serialize_classrooms, serialize_students
+from app.utils.pagination import list_response
 from app import db
 import logging
 
@@ -56,6 +61,7 @@ def update_teacher_profile(current_user):
                 logger.debug(f"Teacher profile updated - Old: {old_teacher_data}, New: {teacher.to_dict()}")
         
         db.session.commit()
+        PrincipalService.invalidate(current_user.id)
         
         new_user_data = current_user.to_dict()
         logger.info(f"Profile updated for user {current_user.id} - Old: {old_user_data}, New: {new_user_data}")
@@ -74,24 +80,22 @@ def update_teacher_profile(current_user):
 @teachers_bp.route('/my-assignments', methods=['GET'])
 @jwt_required()
 @role_required(['teacher', 'admin'])
+@etag(TeacherAssignment, Teacher, User, Subject, Classroom)
 def get_my_assignments(current_user):
-    if current_user.role == 'admin':  # Fixed: String comparison
-        assignments = TeacherAssignment.query.filter_by(is_active=True).all()
-    else:
+    query = TeacherAssignment.query.filter_by(is_active=True).order_by(TeacherAssignment.id)
+    if current_user.role != 'admin':  # Fixed: String comparison
         teacher = current_user.teacher_profile
         if not teacher:
             return jsonify({'message': 'Teacher profile not found'}), 404
         
-        assignments = TeacherAssignment.query.filter_by(
-            teacher_id=teacher.id,
-            is_active=True
-        ).all()
+        query = query.filter_by(teacher_id=teacher.id)
     
-    return jsonify([assignment.to_dict() for assignment in assignments])
+    return list_response(query, serialize_assignments)
 
 @teachers_bp.route('/my-classrooms', methods=['GET'])
 @jwt_required()
 @role_required(['teacher', 'admin'])
+@etag(Classroom, Student, Teacher, User, TeacherAssignment)
 def get_my_classrooms(current_user):
     if current_user.role == 'admin':  # Fixed: String comparison
         head_classrooms = Classroom.query.all()
@@ -101,51 +105,32 @@ def get_my_classrooms(current_user):
         if not teacher:
             return jsonify({'message': 'Teacher profile not found'}), 404
         
-        head_classrooms = []
-        if teacher.is_head_teacher:
-            head_classrooms = Classroom.query.filter_by(head_teacher_id=teacher.id).all()
+        head_ids = AccessService.head_classroom_ids(teacher.id) if teacher.is_head_teacher else frozenset()
+        assigned_ids = AccessService.assigned_classroom_ids(teacher.id)
+        all_ids = head_ids | assigned_ids
+        classrooms = Classroom.query.filter(Classroom.id.in_(all_ids)).all() if all_ids else []
         
-        assigned_classrooms = db.session.query(Classroom).join(
-            TeacherAssignment,
-            Classroom.id == TeacherAssignment.classroom_id
-        ).filter(
-            TeacherAssignment.teacher_id == teacher.id,
-            TeacherAssignment.is_active == True
-        ).distinct().all()
+        head_classrooms = [c for c in classrooms if c.id in head_ids]
+        assigned_classrooms = [c for c in classrooms if c.id in assigned_ids]
     
     return jsonify({
-        'head_of_classrooms': [c.to_dict() for c in head_classrooms],
-        'assigned_classrooms': [c.to_dict() for c in assigned_classrooms]
+        'head_of_classrooms': serialize_classrooms(head_classrooms),
+        'assigned_classrooms': serialize_classrooms(assigned_classrooms)
     })
 
 @teachers_bp.route('/my-students', methods=['GET'])
 @jwt_required()
 @role_required(['teacher', 'admin'])
+@etag(Student, User, Classroom, Teacher, TeacherAssignment)
 def get_my_students(current_user):
-    if current_user.role == 'admin':  # Fixed: String comparison
-        students = Student.query.filter_by(is_enrolled=True).all()
-    else:
+    query = Student.query.filter_by(is_enrolled=True).order_by(Student.id)
+    if current_user.role != 'admin':  # Fixed: String comparison
         teacher = current_user.teacher_profile
         if not teacher:
             return jsonify({'message': 'Teacher profile not found'}), 404
         
-        head_classrooms = Classroom.query.filter_by(head_teacher_id=teacher.id).all()
-        head_classroom_ids = [c.id for c in head_classrooms]
-        
-        assigned_classrooms = db.session.query(Classroom.id).join(
-            TeacherAssignment,
-            Classroom.id == TeacherAssignment.classroom_id
-        ).filter(
-            TeacherAssignment.teacher_id == teacher.id,
-            TeacherAssignment.is_active == True
-        ).distinct().all()
-        assigned_classroom_ids = [c.id for c in assigned_classrooms]
-        
-        all_classroom_ids = list(set(head_classroom_ids + assigned_classroom_ids))
-        
-        students = Student.query.filter(
-            Student.classroom_id.in_(all_classroom_ids),
-            Student.is_enrolled == True
-        ).all() if all_classroom_ids else []
+        all_classroom_ids = list(AccessService.classroom_ids(teacher.id))
+        # An empty IN matches nothing but keeps ?fields and the list shape
+        query = query.filter(Student.classroom_id.in_(all_classroom_ids))
     
-    return jsonify([student.to_dict() for student in students])
+    return list_response(query, serialize_students)
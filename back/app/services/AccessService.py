@@ -0,0 +1,137 @@
+# app/services/AccessService.py
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.models.Classroom import Classroom
+from app.models.TeacherAssignment import TeacherAssignment
+from app import db
+import threading
+import time
+
+
+class _AccessIndex:
+    def __init__(self, head, assigned, teaching, built_at):
+        self.head = head            # teacher_id -> frozenset(classroom_id)
+        self.assigned = assigned    # teacher_id -> frozenset(classroom_id)
+        self.teaching = teaching    # teacher_id -> frozenset((classroom_id, subject_id))
+        self.built_at = built_at
+        self.classrooms = {
+            teacher_id: head.get(teacher_id, frozenset()) | assigned.get(teacher_id, frozenset())
+            for teacher_id in set(head) | set(assigned)
+        }
+
+
+class AccessService:
+    """Process-wide index of which classrooms each teacher can see.
+
+    A teacher sees the classrooms they head and the classrooms of their active
+    assignments. The whole index is built with one query and answers membership
+    checks from frozensets. It is dropped after any commit that creates or
+    deactivates a TeacherAssignment or changes Classroom.head_teacher_id, and
+    rebuilt after ACCESS_INDEX_TTL seconds so other workers' writes show up.
+    """
+
+    _index = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def classroom_ids(teacher_id):
+        """All classroom IDs a teacher can see"""
+        return AccessService._get_index().classrooms.get(teacher_id, frozenset())
+
+    @staticmethod
+    def head_classroom_ids(teacher_id):
+        return AccessService._get_index().head.get(teacher_id, frozenset())
+
+    @staticmethod
+    def assigned_classroom_ids(teacher_id):
+        return AccessService._get_index().assigned.get(teacher_id, frozenset())
+
+    @staticmethod
+    def can_access_classroom(teacher_id, classroom_id):
+        return classroom_id in AccessService.classroom_ids(teacher_id)
+
+    @staticmethod
+    def can_access_student(teacher_id, student):
+        return student.classroom_id is not None and \
+            student.classroom_id in AccessService.classroom_ids(teacher_id)
+
+    @staticmethod
+    def is_head_teacher_of(teacher_id, classroom_id):
+        return classroom_id in AccessService.head_classroom_ids(teacher_id)
+
+    @staticmethod
+    def can_teach(teacher_id, classroom_id, subject_id):
+        """Whether the teacher has an active assignment for this subject in this classroom"""
+        return (classroom_id, subject_id) in AccessService._get_index().teaching.get(teacher_id, frozenset())
+
+    @staticmethod
+    def invalidate():
+        with AccessService._lock:
+            AccessService._index = None
+
+    @staticmethod
+    def _get_index():
+        index = AccessService._index
+        ttl = current_app.config.get('ACCESS_INDEX_TTL', 300)
+        if index is not None and time.monotonic() - index.built_at < ttl:
+            return index
+
+        with AccessService._lock:
+            index = AccessService._index
+            if index is None or time.monotonic() - index.built_at >= ttl:
+                index = AccessService._build()
+                AccessService._index = index
+        return index
+
+    @staticmethod
+    def _build():
+        heads = db.session.query(
+            Classroom.head_teacher_id, Classroom.id, db.cast(db.null(), db.Integer)
+        ).filter(Classroom.head_teacher_id.isnot(None))
+        assignments = db.session.query(
+            TeacherAssignment.teacher_id, TeacherAssignment.classroom_id, TeacherAssignment.subject_id
+        ).filter(TeacherAssignment.is_active == True)
+
+        head, assigned, teaching = {}, {}, {}
+        for teacher_id, classroom_id, subject_id in heads.union_all(assignments):
+            if subject_id is None:
+                head.setdefault(teacher_id, set()).add(classroom_id)
+            else:
+                assigned.setdefault(teacher_id, set()).add(classroom_id)
+                teaching.setdefault(teacher_id, set()).add((classroom_id, subject_id))
+
+        freeze = lambda mapping: {key: frozenset(values) for key, values in mapping.items()}
+        return _AccessIndex(freeze(head), freeze(assigned), freeze(teaching), time.monotonic())
+
+
+def _touches_access(obj, deleted):
+    if isinstance(obj, TeacherAssignment):
+        state = inspect(obj)
+        if deleted or state.pending:
+            return True
+        return any(state.attrs[name].history.has_changes()
+                   for name in ('is_active', 'teacher_id', 'classroom_id', 'subject_id'))
+    if isinstance(obj, Classroom):
+        state = inspect(obj)
+        return deleted or state.attrs.head_teacher_id.history.has_changes()
+    return False
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_access_changes(session, flush_context, instances):
+    changed = [(obj, False) for obj in list(session.new) + list(session.dirty)]
+    changed += [(obj, True) for obj in session.deleted]
+    if any(_touches_access(obj, deleted) for obj, deleted in changed):
+        session.info['access_index_stale'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('access_index_stale', False):
+        AccessService.invalidate()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop('access_index_stale', None)
@@ -0,0 +1,164 @@
+# app/services/AttendanceBitmapService.py
+from app.models.Attendance import Attendance
+from app.models.AttendanceRollup import StudentAttendanceBitmap
+from app.models.EvaluationPeriod import EvaluationPeriod
+from app.models.Student import Student
+from app.utils.upsert import upsert
+from app import db
+from itertools import groupby
+import numpy as np
+
+STATUSES = Attendance.STATUSES
+
+
+class AttendanceBitmapService:
+    """Per-student attendance over an evaluation period as one bitset per status.
+
+    Bit i of a plane is the day start_date + i, so a whole term fits in a few
+    dozen bytes per student and counting days in any date range of the period
+    is a popcount over a slice of bytes. ``classroom_summary`` lines the
+    planes of a classroom up in a NumPy matrix and counts every student at
+    once, without touching attendances. The bitsets are maintained from the
+    same +1/-1 changes as the rollups (AttendanceRollupService.apply) and
+    recomputed by ``flask attendance rebuild-rollups``.
+    """
+
+    @staticmethod
+    def apply(changes, periods):
+        """changes: (student_id, classroom_id, date, status, delta) tuples in
+        the order they happen; periods: (id, start_date, end_date) rows
+        covering their dates. The caller commits."""
+        edits = []
+        for student_id, _, day, status, delta in changes:
+            status = (status or '').lower()
+            if status not in STATUSES or not delta:
+                continue
+            for period_id, start, end in periods:
+                if start <= day <= end:
+                    edits.append(((student_id, period_id), status, (day - start).days, delta > 0))
+        if not edits:
+            return
+
+        table = StudentAttendanceBitmap.__table__
+        keys = [table.c.student_id, table.c.evaluation_period_id]
+        touched = {key for key, _, _, _ in edits}
+
+        # Create missing rows first so every row can be locked before it is rewritten
+        upsert(db.session, table, [
+            {'student_id': student_id, 'evaluation_period_id': period_id, **dict.fromkeys(STATUSES, b'')}
+            for student_id, period_id in touched
+        ], keys=keys)
+        locked = db.session.query(table).filter(
+            table.c.student_id.in_({student_id for student_id, _ in touched}),
+            table.c.evaluation_period_id.in_({period_id for _, period_id in touched})
+        ).with_for_update()
+        planes = {
+            (row.student_id, row.evaluation_period_id): {
+                status: bytearray(getattr(row, status) or b'') for status in STATUSES
+            }
+            for row in locked if (row.student_id, row.evaluation_period_id) in touched
+        }
+
+        for key, status, offset, mark in edits:
+            plane = planes[key][status]
+            byte, bit = divmod(offset, 8)
+            if mark:
+                if len(plane) <= byte:
+                    plane.extend(bytes(byte + 1 - len(plane)))
+                plane[byte] |= 1 << bit
+            elif byte < len(plane):
+                plane[byte] &= ~(1 << bit) & 0xFF
+
+        upsert(db.session, table, [
+            {'student_id': student_id, 'evaluation_period_id': period_id,
+             **{status: bytes(plane.rstrip(b'\0')) for status, plane in by_status.items()}}
+            for (student_id, period_id), by_status in planes.items()
+        ], keys=keys, update=STATUSES)
+
+    @staticmethod
+    def rebuild():
+        """Recompute every bitset from attendances; the caller commits. Returns the row count."""
+        db.session.execute(db.delete(StudentAttendanceBitmap))
+
+        marks = db.session.query(
+            Attendance.student_id, EvaluationPeriod.id, EvaluationPeriod.start_date,
+            Attendance.date, db.func.lower(Attendance.status)
+        ).join(
+            EvaluationPeriod, Attendance.date.between(EvaluationPeriod.start_date, EvaluationPeriod.end_date)
+        ).order_by(Attendance.student_id, EvaluationPeriod.id).yield_per(5000)
+
+        # Bitsets are small, so all of them are built before anything is written
+        bitmaps = []
+        for (student_id, period_id), rows in groupby(marks, key=lambda row: (row[0], row[1])):
+            offsets = {status: [] for status in STATUSES}
+            for _, _, start, day, status in rows:
+                if status in offsets:
+                    offsets[status].append((day - start).days)
+            bitmaps.append({'student_id': student_id, 'evaluation_period_id': period_id,
+                            **{status: AttendanceBitmapService.pack(days) for status, days in offsets.items()}})
+
+        for i in range(0, len(bitmaps), 1000):
+            db.session.execute(db.insert(StudentAttendanceBitmap), bitmaps[i:i + 1000])
+        return len(bitmaps)
+
+    @staticmethod
+    def pack(offsets):
+        """Day offsets -> plane bytes"""
+        if not offsets:
+            return b''
+        bits = np.zeros(max(offsets) + 1, dtype=bool)
+        bits[offsets] = True
+        return np.packbits(bits, bitorder='little').tobytes()
+
+    @staticmethod
+    def count_range(planes, first, last):
+        """Number of set bits between day offsets first and last (inclusive)
+        in each plane, as an array in the order of planes. Offsets outside
+        the planes are clamped to them; an empty range counts 0"""
+        first = max(first, 0)
+        last = min(last, max((len(plane or b'') for plane in planes), default=0) * 8 - 1)
+        if first > last:
+            return np.zeros(len(planes), dtype=np.int64)
+        low, high = first // 8, last // 8
+        width = high - low + 1
+        # Only the bytes of the range are copied, padded where a plane ends early
+        window = np.frombuffer(
+            b''.join((plane or b'')[low:high + 1].ljust(width, b'\0') for plane in planes),
+            dtype=np.uint8
+        ).reshape(len(planes), width).copy()
+        window[:, 0] &= (0xFF << (first % 8)) & 0xFF
+        window[:, -1] &= 0xFF >> (7 - last % 8)
+        return np.bitwise_count(window).sum(axis=1, dtype=np.int64)
+
+    @staticmethod
+    def classroom_summary(classroom_id, period, start_date, end_date):
+        """Per-student status counts between two dates of a period, for the
+        enrolled students of a classroom"""
+        rows = db.session.query(
+            Student.id, *[getattr(StudentAttendanceBitmap, status) for status in STATUSES]
+        ).outerjoin(StudentAttendanceBitmap, db.and_(
+            StudentAttendanceBitmap.student_id == Student.id,
+            StudentAttendanceBitmap.evaluation_period_id == period.id
+        )).filter(
+            Student.classroom_id == classroom_id,
+            Student.is_enrolled == True
+        ).order_by(Student.id).all()
+        if not rows:
+            return []
+
+        first = (start_date - period.start_date).days
+        last = (end_date - period.start_date).days
+        counts = {
+            status: AttendanceBitmapService.count_range([row[i + 1] for row in rows], first, last)
+            for i, status in enumerate(STATUSES)
+        }
+        totals = sum(counts.values())
+        # Late still counts as attended
+        attended = counts['present'] + counts['late']
+
+        return [{
+            'student_id': row[0],
+            **{status: int(counts[status][i]) for status in STATUSES},
+            'total': int(totals[i]),
+            'attendance_rate': round(int(attended[i]) * 100.0 / int(totals[i]), 2) if totals[i] else None
+        } for i, row in enumerate(rows)]
@@ -0,0 +1,89 @@
+# app/services/AttendanceMatrixService.py
+from app.models.Attendance import Attendance
+from app.models.Student import Student
+from app.models.User import User
+from app import db
+from datetime import timedelta
+import numpy as np
+
+STATUSES = Attendance.STATUSES
+
+
+class AttendanceMatrixService:
+    """Students x dates attendance grid of a classroom.
+
+    The enrolled students and their attendance in the range come from one
+    outer-joined query, with each status already turned into a small code in
+    SQL (0 not recorded, then 1.. in the order of Attendance.STATUSES). The
+    rows are scattered into a uint8 matrix with NumPy, which also gives the
+    per-student and per-day totals. In JSON each student's row is a string of
+    one digit per day, so a month for a classroom is a few kilobytes instead
+    of a dict per cell.
+    """
+
+    @staticmethod
+    def build(classroom_id, start_date, end_date):
+        """Returns (students, codes, student_totals, date_totals); students
+        are (id, first_name, last_name, student_number) rows in id order"""
+        status = db.func.lower(Attendance.status)
+        code = db.case(*[(status == name, i + 1) for i, name in enumerate(STATUSES)], else_=0)
+        rows = db.session.query(
+            Student.id, User.first_name, User.last_name, Student.student_number, Attendance.date, code
+        ).join(User, Student.user_id == User.id).outerjoin(Attendance, db.and_(
+            Attendance.student_id == Student.id,
+            Attendance.classroom_id == classroom_id,
+            Attendance.date.between(start_date, end_date)
+        )).filter(
+            Student.classroom_id == classroom_id,
+            Student.is_enrolled == True
+        ).order_by(Student.id).all()
+
+        days = (end_date - start_date).days + 1
+        student_ids, first_row, row_of = np.unique(
+            np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+            return_index=True, return_inverse=True
+        )
+        students = [tuple(rows[i][:4]) for i in first_row]
+
+        recorded = np.fromiter((row[4] is not None for row in rows), dtype=bool, count=len(rows))
+        dates = np.array([row[4] for row in rows if row[4] is not None], dtype='datetime64[D]')
+        codes = np.zeros((len(student_ids), days), dtype=np.uint8)
+        codes[row_of[recorded], (dates - np.datetime64(start_date, 'D')).astype(np.int64)] = np.fromiter(
+            (row[5] for row in rows if row[4] is not None), dtype=np.uint8, count=len(dates)
+        )
+
+        # One boolean plane per status: (students, days, statuses)
+        planes = codes[:, :, None] == np.arange(1, len(STATUSES) + 1, dtype=np.uint8)
+        return students, codes, planes.sum(axis=1), planes.sum(axis=0)
+
+    @staticmethod
+    def iter_json(classroom_id, start_date, end_date, matrix, dumps, batch_size=1000):
+        """The JSON document in chunks, students batch_size at a time"""
+        students, codes, student_totals, date_totals = matrix
+        # '0' + code per day, one string per student
+        cells = (codes + ord('0')).view(f'S{codes.shape[1]}').ravel()
+
+        yield dumps({
+            'classroom_id': classroom_id,
+            'start': start_date.isoformat(),
+            'end': end_date.isoformat(),
+            'statuses': list(STATUSES),
+            'dates': [(start_date + timedelta(days=i)).isoformat() for i in range(codes.shape[1])],
+        }, separators=(',', ':'))[:-1] + ',"students":['
+
+        def student_json(i):
+            student_id, first_name, last_name, student_number = students[i]
+            return dumps({
+                'id': student_id,
+                'first_name': first_name,
+                'last_name': last_name,
+                'student_number': student_number,
+                'cells': cells[i].decode('ascii'),
+                'totals': student_totals[i].tolist()
+            }, separators=(',', ':'))
+
+        for offset in range(0, len(students), batch_size):
+            chunk = ','.join(student_json(i) for i in range(offset, min(offset + batch_size, len(students))))
+            yield chunk if offset == 0 else ',' + chunk
+
+        yield '],"date_totals":' + dumps(date_totals.tolist(), separators=(',', ':')) + '}\n'
@@ -0,0 +1,99 @@
+# app/services/AttendanceRollupService.py
+from app.models.Attendance import Attendance
+from app.models.AttendanceRollup import AttendanceDailyRollup, StudentAttendanceTally
+from app.models.EvaluationPeriod import EvaluationPeriod
+from app.services.AttendanceBitmapService import AttendanceBitmapService
+from app.utils.upsert import upsert
+from app import db
+
+STATUSES = Attendance.STATUSES
+
+
+class AttendanceRollupService:
+    """Pre-aggregated attendance counts, so dashboards and reports never scan
+    attendances.
+
+    attendance_daily_rollup holds one row per classroom and day, and
+    student_attendance_tallies one row per student and evaluation period, each
+    with a counter per status. Every write to attendances goes through
+    AttendanceService, which passes the changes here as +1/-1 deltas in the
+    same transaction; they are added with ON CONFLICT DO UPDATE so concurrent
+    roll calls do not overwrite each other's counts. The per-period bitsets of
+    AttendanceBitmapService are updated from the same changes. ``rebuild``
+    recomputes all of them from attendances (``flask attendance
+    rebuild-rollups``), which is also needed after an evaluation period's
+    dates change.
+    """
+
+    @staticmethod
+    def apply(changes):
+        """changes: (student_id, classroom_id, date, status, delta) tuples"""
+        daily, by_student_day = {}, {}
+        for student_id, classroom_id, day, status, delta in changes:
+            status = (status or '').lower()
+            if status not in STATUSES or not delta:
+                continue
+            daily.setdefault((classroom_id, day), dict.fromkeys(STATUSES, 0))[status] += delta
+            by_student_day.setdefault((student_id, day), dict.fromkeys(STATUSES, 0))[status] += delta
+
+        tallies = {}
+        periods = AttendanceRollupService._periods_covering({day for _, day in by_student_day})
+        for (student_id, day), counts in by_student_day.items():
+            for period_id, start, end in periods:
+                if start <= day <= end:
+                    total = tallies.setdefault((student_id, period_id), dict.fromkeys(STATUSES, 0))
+                    for status, delta in counts.items():
+                        total[status] += delta
+
+        daily_table = AttendanceDailyRollup.__table__
+        upsert(db.session, daily_table, [
+            {'classroom_id': classroom_id, 'date': day, **counts}
+            for (classroom_id, day), counts in daily.items() if any(counts.values())
+        ], keys=[daily_table.c.classroom_id, daily_table.c.date], increment=STATUSES)
+
+        tally_table = StudentAttendanceTally.__table__
+        upsert(db.session, tally_table, [
+            {'student_id': student_id, 'evaluation_period_id': period_id, **counts}
+            for (student_id, period_id), counts in tallies.items() if any(counts.values())
+        ], keys=[tally_table.c.student_id, tally_table.c.evaluation_period_id], increment=STATUSES)
+
+        AttendanceBitmapService.apply(changes, periods)
+
+    @staticmethod
+    def rebuild():
+        """Recompute the rollups and bitsets from attendances; the caller
+        commits. Returns (daily rows, tally rows, bitset rows)."""
+        status = db.func.lower(Attendance.status)
+        counts = [db.func.sum(db.case((status == name, 1), else_=0)).label(name) for name in STATUSES]
+
+        db.session.execute(db.delete(AttendanceDailyRollup))
+        db.session.execute(db.delete(StudentAttendanceTally))
+
+        daily = db.select(Attendance.classroom_id, Attendance.date, *counts).group_by(
+            Attendance.classroom_id, Attendance.date
+        )
+        db.session.execute(db.insert(AttendanceDailyRollup).from_select(
+            ['classroom_id', 'date', *STATUSES], daily
+        ))
+
+        tallies = db.select(Attendance.student_id, EvaluationPeriod.id, *counts).join(
+            EvaluationPeriod, Attendance.date.between(EvaluationPeriod.start_date, EvaluationPeriod.end_date)
+        ).group_by(Attendance.student_id, EvaluationPeriod.id)
+        db.session.execute(db.insert(StudentAttendanceTally).from_select(
+            ['student_id', 'evaluation_period_id', *STATUSES], tallies
+        ))
+
+        return (db.session.query(AttendanceDailyRollup).count(),
+                db.session.query(StudentAttendanceTally).count(),
+                AttendanceBitmapService.rebuild())
+
+    @staticmethod
+    def _periods_covering(days):
+        if not days:
+            return []
+        return db.session.query(
+            EvaluationPeriod.id, EvaluationPeriod.start_date, EvaluationPeriod.end_date
+        ).filter(
+            EvaluationPeriod.start_date <= max(days),
+            EvaluationPeriod.end_date >= min(days)
+        ).all()
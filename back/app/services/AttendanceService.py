@@ -0,0 +1,139 @@
+# app/services/AttendanceService.py
+from app.models.Attendance import Attendance
+from app.models.Student import Student
+from app.services.AttendanceRollupService import AttendanceRollupService
+from app.utils.upsert import upsert, upsert_statement
+from app import db
+from datetime import datetime
+
+
+class AttendanceService:
+    """Roll calls written as one set-based upsert.
+
+    A roll call is (classroom_id, date, records). Every student in a request
+    is checked with a single IN query, then all records are written with
+    INSERT ... ON CONFLICT (student_id, date) DO UPDATE, so the cost does not
+    grow with the number of queries per student and existing rows are updated
+    in place instead of being deleted and re-inserted. Students left out of a
+    roll call keep the status they already had that day. The previous status
+    of every replaced row is read under a row lock after the insert, so
+    concurrent roll calls for the same students keep the rollups exact.
+
+    All writes to attendances go through here so the rollups maintained by
+    AttendanceRollupService change in the same transaction.
+    """
+
+    @staticmethod
+    def parse_roll_calls(data):
+        """Request body -> [(classroom_id, date, records)].
+
+        Accepts a single roll call ``{classroom_id, date, attendance_records}``
+        or a batch ``{roll_calls: [...]}`` of them.
+        """
+        entries = data.get('roll_calls') if 'roll_calls' in data else [data]
+        if not isinstance(entries, list) or not entries:
+            raise ValueError('Missing required fields')
+
+        roll_calls = []
+        for entry in entries:
+            classroom_id = entry.get('classroom_id')
+            date_str = entry.get('date')
+            records = entry.get('attendance_records')
+            if not all([classroom_id, date_str, records]) or not isinstance(records, list):
+                raise ValueError('Missing required fields')
+            try:
+                attendance_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+            except (TypeError, ValueError):
+                raise ValueError('Invalid date format. Use YYYY-MM-DD')
+            roll_calls.append((int(classroom_id), attendance_date, records))
+        return roll_calls
+
+    @staticmethod
+    def record(roll_calls, recorded_by):
+        """Validate and upsert every record; the caller commits. Returns the number of rows written."""
+        rows = {}
+        now = datetime.utcnow()
+        for classroom_id, attendance_date, records in roll_calls:
+            for record in records:
+                try:
+                    student_id = int(record.get('student_id'))
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid student id: {record.get('student_id')}")
+                status = str(record.get('status') or '').lower()
+                if status not in Attendance.STATUSES:
+                    raise ValueError(f"Invalid status '{record.get('status')}' for student {student_id}")
+                # A student listed twice for the same day: the last entry wins
+                rows[(student_id, attendance_date)] = {
+                    'student_id': student_id,
+                    'classroom_id': classroom_id,
+                    'date': attendance_date,
+                    'status': status,
+                    'recorded_by': recorded_by,
+                    'created_at': now,
+                    'updated_at': now
+                }
+
+        student_ids = {student_id for student_id, _ in rows}
+        classroom_of = dict(db.session.query(Student.id, Student.classroom_id).filter(
+            Student.id.in_(student_ids)
+        )) if student_ids else {}
+        for row in rows.values():
+            if classroom_of.get(row['student_id']) != row['classroom_id']:
+                raise ValueError(f"Student with id {row['student_id']} not found in this classroom")
+
+        # Insert the new rows first: a row another roll call is inserting at the
+        # same time is waited for, so every row not inserted here exists and
+        # can be locked before its previous status is read
+        table = Attendance.__table__
+        keys = [table.c.student_id, table.c.date]
+        inserted = set()
+        if rows:
+            statement = upsert_statement(db.session.get_bind().dialect.name, table, keys).returning(
+                table.c.student_id, table.c.date
+            )
+            inserted = {tuple(row) for row in db.session.execute(statement, list(rows.values()))}
+        changes = [(row['student_id'], row['classroom_id'], row['date'], row['status'], 1)
+                   for row in rows.values()]
+
+        existing = [key for key in rows if key not in inserted]
+        if existing:
+            previous = db.session.query(
+                Attendance.student_id, Attendance.classroom_id, Attendance.date, Attendance.status
+            ).filter(
+                Attendance.student_id.in_({student_id for student_id, _ in existing}),
+                Attendance.date.in_({day for _, day in existing})
+            ).with_for_update().all()
+            changes += [(old.student_id, old.classroom_id, old.date, old.status, -1)
+                        for old in previous if (old.student_id, old.date) in rows
+                        and (old.student_id, old.date) not in inserted]
+            upsert(
+                db.session, table, [rows[key] for key in existing], keys=keys,
+                update=['classroom_id', 'status', 'recorded_by', 'updated_at']
+            )
+
+        AttendanceRollupService.apply(changes)
+        return len(rows)
+
+    @staticmethod
+    def update_status(attendance, status):
+        """Change one record's status; the caller commits"""
+        status = str(status or '').lower()
+        if status not in Attendance.STATUSES:
+            raise ValueError(f"Invalid status '{status}'")
+        # Reload the status under a row lock so a concurrent change is not counted twice
+        db.session.refresh(attendance, with_for_update=True)
+        AttendanceRollupService.apply([
+            (attendance.student_id, attendance.classroom_id, attendance.date, attendance.status, -1),
+            (attendance.student_id, attendance.classroom_id, attendance.date, status, 1)
+        ])
+        attendance.status = status
+        attendance.updated_at = datetime.utcnow()
+
+    @staticmethod
+    def delete(attendance):
+        """Delete one record; the caller commits"""
+        db.session.refresh(attendance, with_for_update=True)
+        AttendanceRollupService.apply([
+            (attendance.student_id, attendance.classroom_id, attendance.date, attendance.status, -1)
+        ])
+        db.session.delete(attendance)
@@ -0,0 +1,138 @@
+# app/services/AuditService.py
+from flask import current_app
+from app.models.AuditLog import AuditLog
+from app import db
+from datetime import datetime
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+# Every record carries all columns so batches stay valid for executemany
+_COLUMNS = ('user_id', 'action', 'table_name', 'record_id', 'old_values', 'new_values',
+            'ip_address', 'user_agent', 'status_code', 'created_at')
+
+
+class AuditWriter:
+    """Background thread that drains a bounded queue of audit records and
+    writes them with one multi-row INSERT per batch."""
+
+    def __init__(self, app, max_queue, batch_size, flush_interval):
+        self.app = app
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pid = os.getpid()
+        self.thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, record):
+        """Queue a record; returns False when the queue is full"""
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            return False
+
+    def stop(self, timeout=10):
+        """Flush everything still queued and stop the thread"""
+        if not self.thread.is_alive():
+            return
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._write(batch)
+                return
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            with self.app.app_context():
+                AuditService.write(batch)
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} audit records: {str(e)}")
+
+
+class AuditService:
+    """Entry point for audit logging.
+
+    With AUDIT_ASYNC enabled, records go through an in-process AuditWriter and
+    never touch the request's session or transaction. When the queue is full,
+    or AUDIT_ASYNC is off, the record is written synchronously on a separate
+    connection. Queued records are flushed at interpreter exit.
+    """
+
+    _writer = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def record(**values):
+        values = {column: values.get(column) for column in _COLUMNS}
+        values['created_at'] = values['created_at'] or datetime.utcnow()
+        try:
+            if current_app.config.get('AUDIT_ASYNC', True):
+                writer = AuditService._get_writer()
+                if writer.submit(values):
+                    return
+                logger.warning("Audit queue full, writing audit record synchronously")
+            AuditService.write([values])
+        except Exception as e:
+            logger.error(f"Failed to record audit action {values.get('action')}: {str(e)}")
+
+    @staticmethod
+    def write(records):
+        """Insert audit records in a single executemany on its own connection"""
+        with db.engine.begin() as connection:
+            connection.execute(AuditLog.__table__.insert(), records)
+
+    @staticmethod
+    def flush():
+        """Write everything still queued; the writer restarts on the next record"""
+        with AuditService._lock:
+            writer, AuditService._writer = AuditService._writer, None
+        if writer is not None:
+            writer.stop()
+
+    @staticmethod
+    def _get_writer():
+        writer = AuditService._writer
+        # A writer inherited through fork() has no thread behind it
+        if writer is not None and writer.pid == os.getpid():
+            return writer
+        with AuditService._lock:
+            if AuditService._writer is None or AuditService._writer.pid != os.getpid():
+                config = current_app.config
+                AuditService._writer = AuditWriter(
+                    current_app._get_current_object(),
+                    max_queue=config.get('AUDIT_QUEUE_SIZE', 10000),
+                    batch_size=config.get('AUDIT_BATCH_SIZE', 200),
+                    flush_interval=config.get('AUDIT_FLUSH_INTERVAL', 1.0),
+                )
+            return AuditService._writer
+
+
+atexit.register(AuditService.flush)
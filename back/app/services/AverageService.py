@@ -0,0 +1,101 @@
+# app/services/AverageService.py
+from app.models.Evaluation import Evaluation, EvaluationType
+from app.models.Grade import Grade
+from app.models.Subject import Subject
+from app import db
+
+# Averages are reported out of this many points
+SCALE = 20
+
+
+class AverageService:
+    """Weighted averages out of 20 per student and subject, and overall, for a period.
+
+    Every grade is scaled to 20 through its evaluation's max_points and
+    weighted by the evaluation's weight times its type's default_weight;
+    excused grades are left out. A subject average is sum(scaled * weight) /
+    sum(weight), computed by the database in one query grouped by student and
+    subject, whatever the number of students. The overall average weights
+    those subject averages by Subject.coefficient. Report cards, the gradebook
+    and the averages endpoints all read their numbers from here.
+    """
+
+    @staticmethod
+    def weight():
+        """SQL expression of a grade's weight; needs Evaluation and EvaluationType joined"""
+        return db.func.coalesce(Evaluation.weight, 1.0) * db.func.coalesce(EvaluationType.default_weight, 1.0)
+
+    @staticmethod
+    def subject_rows(period_id, classroom_id=None, student_ids=None):
+        """[(student_id, subject_id, subject name, coefficient, average, grades counted)]
+        for a whole school, one classroom's evaluations, or some students
+        (a list of ids or a SELECT of them).
+        average is None when every counted grade has a weight of 0."""
+        weight = AverageService.weight()
+        scaled = db.cast(Grade.points_earned, db.Float) * SCALE / db.func.coalesce(
+            db.func.nullif(db.cast(Evaluation.max_points, db.Float), 0), SCALE
+        )
+        query = db.session.query(
+            Grade.student_id, Subject.id, Subject.name, db.func.coalesce(Subject.coefficient, 1),
+            db.func.sum(scaled * weight) / db.func.nullif(db.func.sum(weight), 0),
+            db.func.count(Grade.id)
+        ).join(Evaluation, Grade.evaluation_id == Evaluation.id).join(
+            Subject, Evaluation.subject_id == Subject.id
+        ).outerjoin(EvaluationType, Evaluation.evaluation_type_id == EvaluationType.id).filter(
+            Evaluation.evaluation_period_id == period_id,
+            db.func.coalesce(Grade.is_excused, False) == False
+        )
+        if classroom_id is not None:
+            query = query.filter(Evaluation.classroom_id == classroom_id)
+        if student_ids is not None:
+            query = query.filter(Grade.student_id.in_(student_ids))
+        return query.group_by(Grade.student_id, Subject.id, Subject.name, Subject.coefficient).all()
+
+    @staticmethod
+    def averages(period_id, classroom_id=None, student_ids=None):
+        """student_id -> {'overall': average or None,
+        'subjects': {subject_id: {'name', 'coefficient', 'average', 'grades'}}}"""
+        result = {}
+        for student_id, subject_id, name, coefficient, average, count in AverageService.subject_rows(
+                period_id, classroom_id, student_ids):
+            student = result.setdefault(student_id, {'overall': None, 'subjects': {}, 'total': 0.0, 'weight': 0})
+            student['subjects'][subject_id] = {
+                'name': name, 'coefficient': coefficient, 'average': average, 'grades': count
+            }
+            if average is not None and coefficient:
+                student['total'] += average * coefficient
+                student['weight'] += coefficient
+
+        for student in result.values():
+            total, weight = student.pop('total'), student.pop('weight')
+            if weight > 0:
+                student['overall'] = total / weight
+        return result
+
+    @staticmethod
+    def to_json(period_id, averages, classroom_id=None):
+        """Columnar form: averages[i][k] is student i in subject k, overall[i] across subjects"""
+        subjects = {}
+        for student in averages.values():
+            for subject_id, subject in student['subjects'].items():
+                subjects.setdefault(subject_id, subject)
+        subject_ids = sorted(subjects, key=lambda subject_id: (subjects[subject_id]['name'], subject_id))
+        student_ids = sorted(averages)
+
+        def rounded(value):
+            return round(value, 2) if value is not None else None
+
+        return {
+            'classroom_id': classroom_id,
+            'evaluation_period_id': period_id,
+            'scale': SCALE,
+            'subjects': {
+                'id': subject_ids,
+                'name': [subjects[subject_id]['name'] for subject_id in subject_ids],
+                'coefficient': [subjects[subject_id]['coefficient'] for subject_id in subject_ids]
+            },
+            'students': {'id': student_ids},
+            'averages': [[rounded(averages[student_id]['subjects'].get(subject_id, {}).get('average'))
+                          for subject_id in subject_ids] for student_id in student_ids],
+            'overall': [rounded(averages[student_id]['overall']) for student_id in student_ids]
+        }
@@ -0,0 +1,139 @@
+# app/services/GradeService.py
+import numpy as np
+from app.models.Grade import Grade
+from app.models.Evaluation import Evaluation
+from app.models.Student import Student
+from app.services.GradeStatsService import GradeStatsService
+from app.services.GradingScaleService import GradingScaleService
+from app.utils.upsert import upsert
+from app import db
+from datetime import datetime
+
+
+class GradeService:
+    """Grade entry keyed by (student, evaluation), written as one set-based upsert.
+
+    Every student of a batch is checked with a single IN query, percentages
+    and letters are computed for the whole batch at once by
+    GradingScaleService, and all grades are written with
+    INSERT ... ON CONFLICT (student_id, evaluation_id) DO UPDATE, so a whole
+    evaluation costs the same handful of queries as a single grade. Recording
+    a grade a student already has updates it, so sending the same entries
+    twice leaves one grade per student and evaluation.
+    """
+
+    @staticmethod
+    def parse_entries(data, evaluation_id=None):
+        """Request body -> [{student_id, evaluation_id, points_earned, ...}].
+
+        Accepts a single entry or ``{grades: [...]}``; ``points`` and
+        ``grade`` are accepted for ``points_earned``. With evaluation_id,
+        every entry is for that evaluation.
+        """
+        items = data.get('grades') if 'grades' in data else [data]
+        if not isinstance(items, list) or not items:
+            raise ValueError('Missing required fields')
+
+        entries = []
+        for item in items:
+            if not isinstance(item, dict):
+                raise ValueError('Each grade must be an object')
+            points = item.get('points_earned', item.get('points', item.get('grade')))
+            try:
+                entry = {
+                    'student_id': int(item['student_id']),
+                    'evaluation_id': int(evaluation_id if evaluation_id is not None else item['evaluation_id']),
+                    'points_earned': float(points)
+                }
+            except (KeyError, TypeError, ValueError):
+                raise ValueError('student_id, evaluation_id and points_earned are required and must be numbers')
+            entry['comments'] = item.get('comments')
+            entry['is_excused'] = bool(item.get('is_excused', False))
+            entries.append(entry)
+        return entries
+
+    @staticmethod
+    def evaluations(entries):
+        """evaluation_id -> Evaluation for the entries; raises ValueError for unknown ones"""
+        evaluation_ids = {entry['evaluation_id'] for entry in entries}
+        evaluations = {e.id: e for e in Evaluation.query.filter(Evaluation.id.in_(evaluation_ids))}
+        missing = evaluation_ids - set(evaluations)
+        if missing:
+            raise ValueError(f'Evaluation not found: {", ".join(map(str, sorted(missing)))}')
+        return evaluations
+
+    @staticmethod
+    def validate(entries, evaluations):
+        """[{index, student_id, message}] for the entries that cannot be written"""
+        classroom_of = dict(db.session.query(Student.id, Student.classroom_id).filter(
+            Student.id.in_({entry['student_id'] for entry in entries}),
+            Student.is_enrolled == True
+        ))
+
+        errors = []
+        for index, entry in enumerate(entries):
+            evaluation = evaluations[entry['evaluation_id']]
+            max_points = float(evaluation.max_points or 20)
+            if classroom_of.get(entry['student_id']) != evaluation.classroom_id:
+                message = f"Student {entry['student_id']} is not enrolled in the classroom of evaluation {evaluation.id}"
+            elif not 0 <= entry['points_earned'] <= max_points:
+                message = f"Points for student {entry['student_id']} must be between 0 and {max_points:g}"
+            else:
+                continue
+            errors.append({'index': index, 'student_id': entry['student_id'], 'message': message})
+        return errors
+
+    @staticmethod
+    def write(entries, recorded_by, evaluations):
+        """Upsert validated entries; the caller commits. Returns the number of grades written.
+
+        A comment left out keeps the one the grade already has.
+        """
+        # A student listed twice for the same evaluation: the last entry wins
+        entries = list({(entry['student_id'], entry['evaluation_id']): entry for entry in entries}.values())
+        if not entries:
+            return 0
+
+        possible = np.array([float(evaluations[entry['evaluation_id']].max_points or 20) for entry in entries],
+                            dtype=np.float64)
+        percentages, letters = GradingScaleService.grade(
+            [evaluations[entry['evaluation_id']].classroom_id for entry in entries],
+            [entry['points_earned'] for entry in entries],
+            possible
+        )
+
+        now = datetime.utcnow()
+        rows = [{
+            'student_id': entry['student_id'],
+            'evaluation_id': entry['evaluation_id'],
+            'subject_id': evaluations[entry['evaluation_id']].subject_id,
+            'points_earned': entry['points_earned'],
+            'points_possible': float(possible[i]),
+            'percentage': float(percentages[i]),
+            'letter_grade': letters[i],
+            'comments': entry['comments'],
+            'is_excused': entry['is_excused'],
+            'created_by': recorded_by,
+            'created_at': now,
+            'updated_at': now
+        } for i, entry in enumerate(entries)]
+
+        GradeStatsService.mark_stale(db.session, {evaluations[entry['evaluation_id']] for entry in entries})
+        table = Grade.__table__
+        return upsert(
+            db.session, table, rows,
+            keys=[table.c.student_id, table.c.evaluation_id],
+            update=['subject_id', 'points_earned', 'points_possible', 'percentage', 'letter_grade',
+                    'is_excused', 'updated_at'],
+            coalesce=['comments']
+        )
+
+    @staticmethod
+    def record(entries, recorded_by, evaluations=None):
+        """Validate every entry, then write them all; the caller commits.
+        Raises ValueError for the first invalid entry, writing nothing."""
+        evaluations = evaluations or GradeService.evaluations(entries)
+        errors = GradeService.validate(entries, evaluations)
+        if errors:
+            raise ValueError(errors[0]['message'])
+        return GradeService.write(entries, recorded_by, evaluations)
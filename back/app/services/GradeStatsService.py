@@ -0,0 +1,190 @@
+# app/services/GradeStatsService.py
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.models.Evaluation import Evaluation
+from app.models.Grade import Grade
+from app import db
+import numpy as np
+import threading
+import time
+
+# Subject statistics are computed on grades scaled to this many points
+SCALE = 20
+
+
+class GradeStatsService:
+    """Grade statistics per evaluation and per (subject, classroom, period).
+
+    Each is computed from a single fetch of one column of points (excused
+    grades left out) and summarized with NumPy: count, mean, median, standard
+    deviation, min, max and a histogram over 0..max_points (0..20 for a
+    subject, whose grades are scaled to 20 first).
+
+    Results are kept in a per-process cache. Commits that write grades drop
+    exactly the entries they affect: the evaluation and its subject, classroom
+    and period. ORM writes are picked up from the flush, and GradeService
+    reports its bulk upserts through ``mark_stale``. Other workers see a
+    change once GRADE_STATS_CACHE_TTL expires.
+    """
+
+    _cache = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def evaluation_stats(evaluation_id):
+        """Stats of an evaluation's points, or None if it does not exist"""
+        key = ('evaluation', evaluation_id)
+        stats = GradeStatsService._get_cached(key)
+        if stats is None:
+            evaluation = db.session.get(Evaluation, evaluation_id)
+            if evaluation is None:
+                return None
+            points = [row[0] for row in db.session.query(db.cast(Grade.points_earned, db.Float)).filter(
+                Grade.evaluation_id == evaluation_id,
+                db.func.coalesce(Grade.is_excused, False) == False
+            )]
+            max_points = float(evaluation.max_points or SCALE)
+            stats = {
+                'evaluation_id': evaluation.id,
+                'classroom_id': evaluation.classroom_id,
+                'subject_id': evaluation.subject_id,
+                'evaluation_period_id': evaluation.evaluation_period_id,
+                'max_points': max_points,
+                **GradeStatsService.summarize(points, max_points)
+            }
+            GradeStatsService._store(key, stats)
+        return stats
+
+    @staticmethod
+    def subject_stats(subject_id, classroom_id, period_id):
+        """Stats of every grade of a subject in a classroom and period, scaled to 20"""
+        key = ('subject', subject_id, classroom_id, period_id)
+        stats = GradeStatsService._get_cached(key)
+        if stats is None:
+            scaled = db.cast(Grade.points_earned, db.Float) * SCALE / db.func.coalesce(
+                db.func.nullif(db.cast(Evaluation.max_points, db.Float), 0), SCALE
+            )
+            points = [row[0] for row in db.session.query(scaled).join(
+                Evaluation, Grade.evaluation_id == Evaluation.id
+            ).filter(
+                Evaluation.subject_id == subject_id,
+                Evaluation.classroom_id == classroom_id,
+                Evaluation.evaluation_period_id == period_id,
+                db.func.coalesce(Grade.is_excused, False) == False
+            )]
+            stats = {
+                'subject_id': subject_id,
+                'classroom_id': classroom_id,
+                'evaluation_period_id': period_id,
+                'scale': SCALE,
+                **GradeStatsService.summarize(points, SCALE)
+            }
+            GradeStatsService._store(key, stats)
+        return stats
+
+    @staticmethod
+    def summarize(values, upper, bins=None):
+        bins = bins or current_app.config.get('GRADE_STATS_BINS', 10)
+        values = np.asarray(values, dtype=np.float64)
+        counts, edges = np.histogram(np.clip(values, 0, upper), bins=bins, range=(0, upper or 1))
+        histogram = {'edges': np.round(edges, 2).tolist(), 'counts': counts.tolist()}
+        if not len(values):
+            return {'count': 0, 'mean': None, 'median': None, 'std': None,
+                    'min': None, 'max': None, 'histogram': histogram}
+        return {
+            'count': int(len(values)),
+            'mean': round(float(values.mean()), 2),
+            'median': round(float(np.median(values)), 2),
+            'std': round(float(values.std()), 2),
+            'min': round(float(values.min()), 2),
+            'max': round(float(values.max()), 2),
+            'histogram': histogram
+        }
+
+    @staticmethod
+    def mark_stale(session, evaluations):
+        """Drop the stats of these evaluations (and their subjects) when the
+        session commits; for writes that bypass the ORM flush"""
+        keys = session.info.setdefault('grade_stats_stale', set())
+        for evaluation in evaluations:
+            keys.update(_keys_of(evaluation))
+
+    @staticmethod
+    def invalidate(keys):
+        with GradeStatsService._lock:
+            for key in keys:
+                GradeStatsService._cache.pop(key, None)
+
+    @staticmethod
+    def clear():
+        with GradeStatsService._lock:
+            GradeStatsService._cache.clear()
+
+    @staticmethod
+    def _get_cached(key):
+        if current_app.config.get('GRADE_STATS_CACHE_TTL', 0) <= 0:
+            return None
+        with GradeStatsService._lock:
+            entry = GradeStatsService._cache.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del GradeStatsService._cache[key]
+                entry = None
+        return entry[1] if entry is not None else None
+
+    @staticmethod
+    def _store(key, stats):
+        ttl = current_app.config.get('GRADE_STATS_CACHE_TTL', 0)
+        if ttl <= 0:
+            return
+        max_size = current_app.config.get('GRADE_STATS_CACHE_SIZE', 4096)
+        with GradeStatsService._lock:
+            if len(GradeStatsService._cache) >= max_size:
+                # Evict the entry closest to expiry
+                oldest = min(GradeStatsService._cache, key=lambda k: GradeStatsService._cache[k][0])
+                del GradeStatsService._cache[oldest]
+            GradeStatsService._cache[key] = (time.monotonic() + ttl, stats)
+
+
+def _keys_of(evaluation):
+    return (('evaluation', evaluation.id),
+            ('subject', evaluation.subject_id, evaluation.classroom_id, evaluation.evaluation_period_id))
+
+
+def _previous_keys_of(evaluation):
+    # The subject an evaluation belonged to before a pending change of scope
+    state = inspect(evaluation)
+    previous = [(state.attrs[name].history.deleted or [getattr(evaluation, name)])[0]
+                for name in ('subject_id', 'classroom_id', 'evaluation_period_id')]
+    return (('subject', *previous),)
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_grade_changes(session, flush_context, instances):
+    keys = set()
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, Grade):
+                evaluation = obj.evaluation or (
+                    session.get(Evaluation, obj.evaluation_id) if obj.evaluation_id else None
+                )
+                if evaluation is not None:
+                    keys.update(_keys_of(evaluation))
+            elif isinstance(obj, Evaluation) and obj.id is not None:
+                # max_points, subject or classroom changed, or the evaluation is deleted
+                keys.update(_keys_of(obj))
+                keys.update(_previous_keys_of(obj))
+    if keys:
+        session.info.setdefault('grade_stats_stale', set()).update(keys)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    keys = session.info.pop('grade_stats_stale', None)
+    if keys:
+        GradeStatsService.invalidate(keys)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop('grade_stats_stale', None)
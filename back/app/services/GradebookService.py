@@ -0,0 +1,125 @@
+# app/services/GradebookService.py
+from app.models.Evaluation import Evaluation, EvaluationType
+from app.models.Grade import Grade
+from app.models.Student import Student
+from app.models.Subject import Subject
+from app.models.User import User
+from app.services.AverageService import AverageService, SCALE
+from app import db
+import numpy as np
+
+
+class GradebookService:
+    """Students x evaluations gradebook of a classroom for one period.
+
+    The period's evaluations are read once as the column axis. The enrolled
+    students and their grades come from one query that outer-joins grades
+    through Evaluation, so students without any grade still get a row. The
+    rows are scattered into a points matrix (NaN where nothing was entered)
+    with NumPy. Subject and overall averages out of 20 come from
+    AverageService's grouped query, so they match the report cards. The JSON
+    is columnar: lists of ids and a list of rows, not an object per cell.
+    """
+
+    @staticmethod
+    def build(classroom_id, period_id):
+        evaluations = db.session.query(
+            Evaluation.id, Evaluation.name, Evaluation.subject_id, Evaluation.evaluation_date,
+            AverageService.weight(), Evaluation.max_points, Subject.name, Subject.coefficient
+        ).join(Subject, Evaluation.subject_id == Subject.id).outerjoin(
+            EvaluationType, Evaluation.evaluation_type_id == EvaluationType.id
+        ).filter(
+            Evaluation.classroom_id == classroom_id,
+            Evaluation.evaluation_period_id == period_id
+        ).order_by(Subject.name, Evaluation.subject_id, Evaluation.evaluation_date, Evaluation.id).all()
+
+        rows = db.session.query(
+            Student.id, User.first_name, User.last_name, Student.student_number,
+            Grade.evaluation_id, db.cast(Grade.points_earned, db.Float), Grade.is_excused
+        ).join(User, Student.user_id == User.id).outerjoin(
+            db.join(Grade, Evaluation, Grade.evaluation_id == Evaluation.id),
+            db.and_(
+                Grade.student_id == Student.id,
+                Evaluation.classroom_id == classroom_id,
+                Evaluation.evaluation_period_id == period_id
+            )
+        ).filter(
+            Student.classroom_id == classroom_id,
+            Student.is_enrolled == True
+        ).order_by(Student.id).all()
+
+        student_ids, first_row, row_of = np.unique(
+            np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+            return_index=True, return_inverse=True
+        )
+        students = [tuple(rows[i][:4]) for i in first_row]
+
+        evaluation_ids = np.array([e[0] for e in evaluations], dtype=np.int64)
+        points = np.full((len(student_ids), len(evaluations)), np.nan)
+        excused = np.zeros(points.shape, dtype=bool)
+        graded = np.fromiter((row[4] is not None for row in rows), dtype=bool, count=len(rows))
+        if graded.any():
+            # Column of each grade's evaluation in the evaluation axis
+            order = np.argsort(evaluation_ids)
+            graded_ids = np.fromiter((row[4] for row in rows if row[4] is not None), dtype=np.int64)
+            columns = order[np.searchsorted(evaluation_ids[order], graded_ids)]
+            points[row_of[graded], columns] = [row[5] for row in rows if row[4] is not None]
+            excused[row_of[graded], columns] = [bool(row[6]) for row in rows if row[4] is not None]
+
+        subjects = {e[2]: (e[2], e[6], e[7]) for e in evaluations}
+        subjects = [subjects[subject_id] for subject_id in sorted(subjects)]
+
+        # (students, subjects) averages and overall averages; NaN where nothing counts
+        by_student = AverageService.averages(period_id, classroom_id=classroom_id)
+        averages = np.full((len(students), len(subjects)), np.nan)
+        overall = np.full(len(students), np.nan)
+        for i, student in enumerate(students):
+            student_averages = by_student.get(student[0])
+            if student_averages is None:
+                continue
+            for k, subject in enumerate(subjects):
+                average = student_averages['subjects'].get(subject[0], {}).get('average')
+                if average is not None:
+                    averages[i, k] = average
+            if student_averages['overall'] is not None:
+                overall[i] = student_averages['overall']
+        return students, evaluations, subjects, points, excused, averages, overall
+
+    @staticmethod
+    def to_json(classroom_id, period_id, gradebook):
+        students, evaluations, subjects, points, excused, averages, overall = gradebook
+
+        def with_nulls(matrix):
+            return np.where(np.isnan(matrix), None, np.round(matrix, 2)).tolist()
+
+        return {
+            'classroom_id': classroom_id,
+            'evaluation_period_id': period_id,
+            'scale': SCALE,
+            'students': {
+                'id': [s[0] for s in students],
+                'first_name': [s[1] for s in students],
+                'last_name': [s[2] for s in students],
+                'student_number': [s[3] for s in students]
+            },
+            'evaluations': {
+                'id': [e[0] for e in evaluations],
+                'name': [e[1] for e in evaluations],
+                'subject_id': [e[2] for e in evaluations],
+                'date': [e[3].isoformat() for e in evaluations],
+                'weight': [e[4] for e in evaluations],
+                'max_points': [float(e[5] or SCALE) for e in evaluations]
+            },
+            'subjects': {
+                'id': [s[0] for s in subjects],
+                'name': [s[1] for s in subjects],
+                'coefficient': [s[2] if s[2] is not None else 1 for s in subjects]
+            },
+            # points[i][j]: student i, evaluation j; null when not graded
+            'points': with_nulls(points),
+            'excused': np.argwhere(excused).tolist(),
+            # averages[i][k]: student i, subject k, out of scale
+            'averages': with_nulls(averages),
+            # overall[i]: student i across subjects, weighted by coefficient
+            'overall': with_nulls(overall)
+        }
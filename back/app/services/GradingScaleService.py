@@ -0,0 +1,217 @@
+# app/services/GradingScaleService.py
+import numpy as np
+from sqlalchemy import bindparam
+from sqlalchemy.orm import selectinload
+from app.models.Classroom import Classroom
+from app.models.Evaluation import Evaluation
+from app.models.Grade import Grade
+from app.models.GradingScale import GradingScale, GradingScaleBand
+from app import db
+from datetime import datetime
+
+# Rows per UPDATE executemany when writing recomputed grades
+_WRITE_BATCH = 10000
+
+
+class GradingScaleService:
+    """Percentages and letter grades computed for whole arrays of grades.
+
+    A scale is compiled to two arrays, band minimums in ascending order and
+    their letters, so grading n grades is one vectorized division and one
+    ``np.searchsorted``. ``recompute`` reads the grades of an evaluation,
+    classrooms or period as columns, grades them all at once and writes back
+    only the rows whose points_possible, percentage or letter changed, with
+    a single executemany UPDATE; it is run when a scale changes or an
+    evaluation's max_points is edited.
+    """
+
+    # Used for classrooms no GradingScale matches
+    DEFAULT_BANDS = (('A', 90), ('B', 80), ('C', 70), ('D', 60), ('F', 0))
+
+    @staticmethod
+    def parse_bands(items):
+        """Request body bands -> [(letter, min_percentage)]; raises ValueError"""
+        if not isinstance(items, list) or not items:
+            raise ValueError('bands must be a non-empty list')
+        bands = []
+        for item in items:
+            if not isinstance(item, dict):
+                raise ValueError('Each band needs a letter and a min_percentage')
+            letter = str(item.get('letter') or '').strip()
+            try:
+                minimum = round(float(item.get('min_percentage')), 2)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid min_percentage for letter '{letter}'")
+            if not 0 < len(letter) <= 5:
+                raise ValueError('Letters must be 1 to 5 characters')
+            if not 0 <= minimum <= 100:
+                raise ValueError(f"min_percentage for '{letter}' must be between 0 and 100")
+            bands.append((letter, minimum))
+        if len({letter for letter, _ in bands}) != len(bands) or len({m for _, m in bands}) != len(bands):
+            raise ValueError('Letters and min_percentage values must be unique')
+        if min(minimum for _, minimum in bands) != 0:
+            raise ValueError('The lowest band must start at 0')
+        return sorted(bands, key=lambda band: -band[1])
+
+    @staticmethod
+    def compile(bands):
+        """(letter, min_percentage) pairs -> (ascending minimums, letters)"""
+        ordered = sorted(bands, key=lambda band: float(band[1]))
+        return (np.array([float(minimum) for _, minimum in ordered], dtype=np.float64),
+                np.array([letter for letter, _ in ordered], dtype=object))
+
+    @staticmethod
+    def percentages(points, possible):
+        points = np.asarray(points, dtype=np.float64)
+        possible = np.asarray(possible, dtype=np.float64)
+        return np.round(np.divide(points * 100, possible, out=np.zeros_like(points), where=possible > 0), 2)
+
+    @staticmethod
+    def letters(percentages, scale):
+        minimums, letters = scale
+        # Index of the highest band whose minimum is reached; below them all is the lowest band
+        index = np.searchsorted(minimums, percentages, side='right') - 1
+        return letters[np.clip(index, 0, None)]
+
+    @staticmethod
+    def scales_for(classroom_ids):
+        """classroom_id -> compiled scale, the most specific match for each classroom"""
+        scales = [scale for scale in GradingScale.query.options(selectinload(GradingScale.bands)) if scale.bands]
+        default = GradingScaleService.compile(GradingScaleService.DEFAULT_BANDS)
+        compiled, result = {}, {}
+        classrooms = db.session.query(Classroom.id, Classroom.level, Classroom.academic_year).filter(
+            Classroom.id.in_(classroom_ids)
+        ) if classroom_ids else []
+        for classroom_id, level, academic_year in classrooms:
+            matching = [scale for scale in scales if scale.matches(level, academic_year)]
+            if not matching:
+                result[classroom_id] = default
+                continue
+            scale = max(matching, key=lambda s: (s.specificity, -s.id))
+            if scale.id not in compiled:
+                compiled[scale.id] = GradingScaleService.compile(
+                    (band.letter, band.min_percentage) for band in scale.bands
+                )
+            result[classroom_id] = compiled[scale.id]
+        return result
+
+    @staticmethod
+    def grade(classroom_ids, points, possible):
+        """(percentages, letters) for arrays of grades, each on its classroom's scale"""
+        classroom_ids = np.asarray(classroom_ids)
+        percentages = GradingScaleService.percentages(points, possible)
+        letters = np.empty(len(percentages), dtype=object)
+        scales = GradingScaleService.scales_for(set(classroom_ids.tolist()))
+        default = GradingScaleService.compile(GradingScaleService.DEFAULT_BANDS)
+        for classroom_id in np.unique(classroom_ids):
+            mask = classroom_ids == classroom_id
+            letters[mask] = GradingScaleService.letters(percentages[mask], scales.get(int(classroom_id), default))
+        return percentages, letters
+
+    @staticmethod
+    def recompute(evaluation_id=None, classroom_ids=None, period_id=None):
+        """Regrade the matching grades (all of them without filters); the caller
+        commits. Returns the number of grades changed."""
+        query = db.select(
+            Grade.id,
+            db.cast(Grade.points_earned, db.Float),
+            db.cast(Grade.points_possible, db.Float),
+            db.cast(Grade.percentage, db.Float),
+            Grade.letter_grade,
+            db.cast(db.func.coalesce(Evaluation.max_points, 20), db.Float),
+            Evaluation.classroom_id
+        ).join(Evaluation, Grade.evaluation_id == Evaluation.id)
+        if evaluation_id is not None:
+            query = query.where(Grade.evaluation_id == evaluation_id)
+        if classroom_ids is not None:
+            query = query.where(Evaluation.classroom_id.in_(classroom_ids))
+        if period_id is not None:
+            query = query.where(Evaluation.evaluation_period_id == period_id)
+        rows = db.session.execute(query).all()
+        if not rows:
+            return 0
+
+        ids, points, stored_possible, stored_percentages, stored_letters, possible, classrooms = zip(*rows)
+        possible = np.array(possible, dtype=np.float64)
+        percentages, letters = GradingScaleService.grade(
+            np.array(classrooms), np.array(points, dtype=np.float64), possible
+        )
+        stored_percentages = np.array(stored_percentages, dtype=np.float64)
+        changed = (
+            np.isnan(stored_percentages)
+            | (np.abs(percentages - stored_percentages) >= 0.005)
+            | (possible != np.array(stored_possible, dtype=np.float64))
+            | (letters != np.array(stored_letters, dtype=object))
+        )
+        indices = np.flatnonzero(changed)
+        if not len(indices):
+            return 0
+
+        table = Grade.__table__
+        statement = table.update().where(table.c.id == bindparam('grade_id')).values(
+            points_possible=bindparam('new_possible'),
+            percentage=bindparam('new_percentage'),
+            letter_grade=bindparam('new_letter'),
+            updated_at=datetime.utcnow()
+        )
+        params = [{
+            'grade_id': ids[i],
+            'new_possible': float(possible[i]),
+            'new_percentage': float(percentages[i]),
+            'new_letter': letters[i]
+        } for i in indices.tolist()]
+        for start in range(0, len(params), _WRITE_BATCH):
+            db.session.execute(statement, params[start:start + _WRITE_BATCH])
+        return len(params)
+
+    @staticmethod
+    def classrooms_using(scale):
+        """Ids of the classrooms a scale's level/year could apply to"""
+        query = db.session.query(Classroom.id)
+        if scale.level is not None:
+            query = query.filter(Classroom.level == scale.level)
+        if scale.academic_year is not None:
+            query = query.filter(Classroom.academic_year == scale.academic_year)
+        return [row.id for row in query]
+
+    @staticmethod
+    def save(scale, data):
+        """Apply {name, level, academic_year, bands} to a new or existing scale and
+        regrade the classrooms it applied to before or applies to now; the caller
+        commits. Returns the number of grades changed; raises ValueError."""
+        affected = set(GradingScaleService.classrooms_using(scale)) if scale.id else set()
+
+        name = str(data.get('name', scale.name) or '').strip()
+        if not name:
+            raise ValueError('name is required')
+        level = data.get('level', scale.level) or None
+        academic_year = data.get('academic_year', scale.academic_year) or None
+        duplicate = GradingScale.query.filter(
+            GradingScale.level == level if level else GradingScale.level.is_(None),
+            GradingScale.academic_year == academic_year if academic_year else GradingScale.academic_year.is_(None),
+            GradingScale.id != scale.id if scale.id else True
+        ).first()
+        if duplicate:
+            raise ValueError(f"Scale '{duplicate.name}' already covers this level and academic year")
+        bands = GradingScaleService.parse_bands(data['bands']) if 'bands' in data or not scale.id else None
+
+        scale.name, scale.level, scale.academic_year = name, level, academic_year
+        if bands is not None:
+            if scale.bands:
+                # Old bands go first so that letters kept by the new ones stay unique
+                scale.bands.clear()
+                db.session.flush()
+            scale.bands = [GradingScaleBand(letter=letter, min_percentage=minimum) for letter, minimum in bands]
+        db.session.add(scale)
+        db.session.flush()
+
+        affected.update(GradingScaleService.classrooms_using(scale))
+        return GradingScaleService.recompute(classroom_ids=affected) if affected else 0
+
+    @staticmethod
+    def delete(scale):
+        """Delete a scale and regrade the classrooms it applied to; the caller commits"""
+        affected = GradingScaleService.classrooms_using(scale)
+        db.session.delete(scale)
+        db.session.flush()
+        return GradingScaleService.recompute(classroom_ids=affected) if affected else 0
@@ -0,0 +1,84 @@
+# app/services/PasswordService.py
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+import os
+import threading
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when too many hash/verify jobs are already waiting"""
+
+    def __init__(self, retry_after):
+        super().__init__('Password service busy, retry later')
+        self.retry_after = retry_after
+
+
+class PasswordService:
+    """Runs password hashing and verification on a dedicated thread pool.
+
+    scrypt in hashlib releases the GIL, so a handful of threads use all cores
+    while request threads only wait on a future. At most
+    PASSWORD_POOL_MAX_PENDING jobs may be queued or running; beyond that
+    PasswordPoolBusy is raised so callers can answer 503 instead of piling up
+    behind a login storm.
+    """
+
+    _executor = None
+    _slots = None
+    _pid = None
+    _lock = threading.Lock()
+    _methods = {}
+
+    @staticmethod
+    def hash_password(password):
+        method = current_app.config.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+        return PasswordService._run(generate_password_hash, password, method=method)
+
+    @staticmethod
+    def verify_password(password_hash, password):
+        return PasswordService._run(check_password_hash, password_hash, password)
+
+    @staticmethod
+    def needs_rehash(password_hash):
+        """Whether the stored hash was made with other parameters than the configured ones"""
+        method = current_app.config.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+        return password_hash.split('$', 1)[0] != PasswordService._full_method(method)
+
+    @staticmethod
+    def _full_method(method):
+        # werkzeug stores the method with every parameter filled in ('scrypt' ->
+        # 'scrypt:32768:8:1'), so take the prefix of a hash made once with it
+        full = PasswordService._methods.get(method)
+        if full is None:
+            full = generate_password_hash('', method=method).split('$', 1)[0]
+            PasswordService._methods[method] = full
+        return full
+
+    @staticmethod
+    def _run(fn, *args, **kwargs):
+        executor, slots = PasswordService._get_pool()
+        if not slots.acquire(blocking=False):
+            raise PasswordPoolBusy(current_app.config.get('PASSWORD_RETRY_AFTER', 1))
+        try:
+            future = executor.submit(fn, *args, **kwargs)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future.result()
+
+    @staticmethod
+    def _get_pool():
+        if PasswordService._executor is not None and PasswordService._pid == os.getpid():
+            return PasswordService._executor, PasswordService._slots
+        with PasswordService._lock:
+            if PasswordService._executor is None or PasswordService._pid != os.getpid():
+                config = current_app.config
+                PasswordService._executor = ThreadPoolExecutor(
+                    max_workers=config.get('PASSWORD_POOL_WORKERS', os.cpu_count() or 2),
+                    thread_name_prefix='password'
+                )
+                PasswordService._slots = threading.BoundedSemaphore(config.get('PASSWORD_POOL_MAX_PENDING', 64))
+                PasswordService._pid = os.getpid()
+            return PasswordService._executor, PasswordService._slots
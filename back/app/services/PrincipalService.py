@@ -0,0 +1,148 @@
+# app/services/PrincipalService.py
+from flask import g, current_app
+from sqlalchemy.orm import joinedload
+from app.models.User import User
+from app import db
+import threading
+import time
+
+
+class Principal:
+    """Authenticated user for the current request, with its profiles loaded.
+    Classroom access is answered by AccessService."""
+
+    def __init__(self, user):
+        self.user = user
+
+
+class ClaimsUser:
+    """Stand-in for the current User built from verified JWT claims.
+
+    ``id``, ``email`` and ``role`` come straight from the token, so role checks
+    and routes that only need those cost no query. Any other attribute loads
+    the real user through PrincipalService on first access; assignments are
+    forwarded to it as well.
+    """
+
+    _claim_fields = ('id', 'email', 'role')
+
+    def __init__(self, user_id, email, role):
+        object.__setattr__(self, 'id', user_id)
+        object.__setattr__(self, 'email', email)
+        object.__setattr__(self, 'role', role)
+        # Tokens of deactivated users are revoked, so a valid token means active
+        object.__setattr__(self, 'is_active', True)
+        object.__setattr__(self, '_user', None)
+
+    def _load(self):
+        user = object.__getattribute__(self, '_user')
+        if user is None:
+            principal = PrincipalService.load(self.id)
+            if principal is None:
+                raise LookupError(f"User {self.id} no longer exists")
+            user = principal.user
+            object.__setattr__(self, '_user', user)
+        return user
+
+    def __getattr__(self, name):
+        # Only reached for attributes not set in __init__
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+        if name in ClaimsUser._claim_fields:
+            object.__setattr__(self, name, value)
+
+
+class _CacheEntry:
+    def __init__(self, user, expires_at):
+        self.user = user  # detached user with its profiles loaded
+        self.expires_at = expires_at
+
+
+class PrincipalService:
+    """Loads the user and its profiles in a single query.
+
+    The result is kept in ``flask.g`` for the request and in a small per-process
+    TTL cache keyed by user id. Cached entries hold a detached object graph that
+    is merged into the request session with ``load=False``, so a cache hit costs
+    no round trip. Routes that change a user's role, status or profile must
+    call ``invalidate``; other workers see the change once the TTL expires.
+    A teacher's classrooms are not cached here: AccessService holds them.
+    """
+
+    _cache = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def load(user_id):
+        """Return the Principal for user_id, or None if the user does not exist"""
+        principal = g.get('principal')
+        if principal is not None and principal.user.id == user_id:
+            return principal
+
+        entry = PrincipalService._get_cached(user_id)
+        if entry is None:
+            entry = PrincipalService._load_entry(user_id)
+            if entry is None:
+                return None
+            PrincipalService._store(user_id, entry)
+
+        user = db.session.merge(entry.user, load=False)
+        principal = Principal(user)
+        g.principal = principal
+        return principal
+
+    @staticmethod
+    def invalidate(*user_ids):
+        """Drop cached principals for the given user ids"""
+        with PrincipalService._lock:
+            for user_id in user_ids:
+                PrincipalService._cache.pop(user_id, None)
+
+    @staticmethod
+    def clear():
+        with PrincipalService._lock:
+            PrincipalService._cache.clear()
+
+    @staticmethod
+    def _get_cached(user_id):
+        if current_app.config.get('PRINCIPAL_CACHE_TTL', 0) <= 0:
+            return None
+        with PrincipalService._lock:
+            entry = PrincipalService._cache.get(user_id)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                del PrincipalService._cache[user_id]
+                entry = None
+        return entry
+
+    @staticmethod
+    def _store(user_id, entry):
+        ttl = current_app.config.get('PRINCIPAL_CACHE_TTL', 0)
+        if ttl <= 0:
+            return
+        max_size = current_app.config.get('PRINCIPAL_CACHE_SIZE', 1024)
+        entry.expires_at = time.monotonic() + ttl
+        with PrincipalService._lock:
+            if len(PrincipalService._cache) >= max_size:
+                # Evict the entry closest to expiry
+                oldest = min(PrincipalService._cache, key=lambda k: PrincipalService._cache[k].expires_at)
+                del PrincipalService._cache[oldest]
+            PrincipalService._cache[user_id] = entry
+
+    @staticmethod
+    def _load_entry(user_id):
+        user = db.session.get(User, user_id, options=[
+            joinedload(User.student_profile),
+            joinedload(User.teacher_profile),
+        ])
+        if user is None:
+            return None
+
+        # Detach the loaded graph so it can be shared between requests; each
+        # request works on its own merged copy.
+        for obj in (user, user.student_profile, user.teacher_profile):
+            if obj is not None and obj in db.session:
+                db.session.expunge(obj)
+
+        return _CacheEntry(user, expires_at=0)
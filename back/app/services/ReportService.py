@@ -1,79 +1,334 @@
-
 # app/services/report_service.py
-from app.models.ReportCard import ReportCard
-from app.models.Grade import Grade
+from flask import current_app
+from app.models.Classroom import Classroom
+from app.models.EvaluationPeriod import EvaluationPeriod
+from app.models.ReportCard import ReportCard, ReportBatch
 from app.models.Student import Student
-from app.models.Subject import Subject
+from app.models.User import User
+from app.services.AverageService import AverageService, SCALE
+from app.utils.upsert import upsert
 from app import db
-from sqlalchemy import func
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+import multiprocessing
+import numpy as np
+import logging
 import os
+import signal
+import time
+import uuid
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
 
 class ReportService:
     @staticmethod
     def generate_report_card(student_id, period_id, teacher_id, comments=None):
-        # Calculate overall average
-        grades = Grade.query.join(Subject).filter(
-            Grade.student_id == student_id,
-            Grade.evaluation_period_id == period_id
-        ).all()
-        
-        if not grades:
-            raise ValueError("No grades found for this period")
-        
-        # Calculate weighted average
-        total_points = 0
-        total_coefficients = 0
-        
-        subjects_grades = {}
-        for grade in grades:
-            subject_id = grade.subject_id
-            if subject_id not in subjects_grades:
-                subjects_grades[subject_id] = {
-                    'grades': [],
-                    'coefficient': grade.subject.coefficient
-                }
-            subjects_grades[subject_id]['grades'].append(float(grade.grade))
-        
-        # Calculate average per subject
-        for subject_id, data in subjects_grades.items():
-            avg = sum(data['grades']) / len(data['grades'])
-            total_points += avg * data['coefficient']
-            total_coefficients += data['coefficient']
-        
-        overall_average = total_points / total_coefficients if total_coefficients > 0 else 0
-        
-        # Calculate class rank (simplified)
-        student = Student.query.get(student_id)
-        class_students = Student.query.filter_by(
-            classroom_id=student.classroom_id,
-            is_enrolled=True
-        ).count()
-        
-        # Check if report already exists
-        existing_report = ReportCard.query.filter_by(
-            student_id=student_id,
-            evaluation_period_id=period_id
-        ).first()
-        
-        if existing_report:
-            existing_report.overall_average = overall_average
-            existing_report.teacher_comments = comments
-            existing_report.generated_by = teacher_id
+        student = db.session.get(Student, student_id)
+        if student is None or not student.is_enrolled:
+            raise ValueError("Student not found or not enrolled")
+
+        # Ranked against the whole classroom, but only this student's report card is written
+        written, _ = ReportService.write_report_cards(
+            period_id, teacher_id, classroom_id=student.classroom_id, student_ids=[student_id], comments=comments
+        )
+        if not written:
+            raise ValueError("No grades found for this period, or no teacher to sign the report card")
+        db.session.commit()
+
+        return ReportCard.query.filter_by(student_id=student_id, evaluation_period_id=period_id).one()
+
+    @staticmethod
+    def generate_batch(period_id, teacher_id=None, classroom_id=None, requested_by=None, comments=None,
+                       run_id=None, render_pdfs=False):
+        """Report cards of every enrolled student of a classroom, or of the whole
+        school without classroom_id, in the caller's transaction. Returns the
+        ReportBatch recording how many were written and how long it took.
+
+        With render_pdfs the report cards are committed before their PDFs are
+        rendered, so the write lock is not held while rendering; the batch and
+        the PDFs' file paths are left for the caller to commit.
+        """
+        started_at, start = datetime.utcnow(), time.perf_counter()
+        written, skipped = ReportService.write_report_cards(period_id, teacher_id, classroom_id, comments=comments)
+        pdfs = 0
+        if render_pdfs:
             db.session.commit()
-            return existing_report
-        
-        # Create new report card
-        report_card = ReportCard(
-            student_id=student_id,
+            pending = ReportCard.query.join(Student, ReportCard.student_id == Student.id).filter(
+                ReportCard.evaluation_period_id == period_id,
+                ReportCard.file_path == None,
+                Student.is_enrolled == True
+            )
+            if classroom_id is not None:
+                pending = pending.filter(Student.classroom_id == classroom_id)
+            pdfs = ReportService.render_pdfs(pending.all())
+        batch = ReportBatch(
             evaluation_period_id=period_id,
-            generated_by=teacher_id,
-            overall_average=overall_average,
-            class_rank=1,  # Simplified - should calculate actual rank
-            total_students=class_students,
-            teacher_comments=comments
+            classroom_id=classroom_id,
+            requested_by=requested_by,
+            run_id=run_id,
+            written=written,
+            skipped=skipped,
+            pdfs=pdfs,
+            started_at=started_at,
+            duration_ms=int((time.perf_counter() - start) * 1000)
         )
-        
-        db.session.add(report_card)
+        db.session.add(batch)
+        db.session.flush()
+        logger.info(f"Report batch {batch.id}: {written} report cards, {skipped} skipped, {pdfs} PDFs, "
+                    f"period {period_id}, classroom {classroom_id or 'all'}, {batch.duration_ms} ms")
+        return batch
+
+    @staticmethod
+    def generate_all(period_id, workers=None, resume=False, render_pdfs=True, progress=None):
+        """Report cards (and PDFs) of every classroom with enrolled students,
+        spread over a pool of worker processes.
+
+        Classrooms are independent (ranks are per classroom), so each one is a
+        task run and committed on its own by a worker with its own app and
+        engine, and recorded as a ReportBatch carrying the run's id. With
+        resume, classrooms already recorded by the latest run for the period
+        are skipped. progress(done, total, classroom_id, batch dict or
+        exception) is called in this process as each classroom finishes.
+        Returns a summary dict.
+        """
+        workers = workers or current_app.config.get('REPORTS_WORKERS', 1)
+        classroom_ids = [row[0] for row in db.session.query(Student.classroom_id).filter(
+            Student.is_enrolled == True, Student.classroom_id != None
+        ).distinct().order_by(Student.classroom_id)]
+
+        run_id, done = None, set()
+        if resume:
+            run_id = db.session.query(ReportBatch.run_id).filter(
+                ReportBatch.evaluation_period_id == period_id,
+                ReportBatch.run_id != None
+            ).order_by(ReportBatch.id.desc()).limit(1).scalar()
+            if run_id:
+                done = {row[0] for row in db.session.query(ReportBatch.classroom_id).filter(ReportBatch.run_id == run_id)}
+        run_id = run_id or uuid.uuid4().hex
+        pending = [classroom_id for classroom_id in classroom_ids if classroom_id not in done]
+        # Workers write through their own connections; do not hold this one open meanwhile
+        db.session.close()
+
+        summary = {'run_id': run_id, 'classrooms': len(classroom_ids), 'resumed': len(done),
+                   'failed': [], 'written': 0, 'skipped': 0, 'pdfs': 0}
+        start, finished = time.perf_counter(), []
+
+        def collect(classroom_id, result):
+            if isinstance(result, Exception):
+                logger.error(f"Report generation failed for classroom {classroom_id}: {result}")
+                summary['failed'].append(classroom_id)
+            else:
+                for key in ('written', 'skipped', 'pdfs'):
+                    summary[key] += result[key]
+            if progress:
+                finished.append(classroom_id)
+                progress(len(finished), len(pending), classroom_id, result)
+
+        if workers <= 1:
+            for classroom_id in pending:
+                try:
+                    result = _generate_classroom(period_id, classroom_id, run_id, render_pdfs)
+                except Exception as e:
+                    result = e
+                collect(classroom_id, result)
+        else:
+            # spawn: workers start clean instead of inheriting this process's connections and threads
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=_init_worker)
+            try:
+                futures = {pool.submit(_generate_classroom, period_id, classroom_id, run_id, render_pdfs): classroom_id
+                           for classroom_id in pending}
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = e
+                    collect(futures[future], result)
+            finally:
+                # When interrupted, classrooms in progress finish and the queued ones are dropped
+                pool.shutdown(cancel_futures=True)
+
+        summary['seconds'] = round(time.perf_counter() - start, 2)
+        return summary
+
+    @staticmethod
+    def generate_report_pdf(report_id):
+        """Path of a report card's PDF, rendered first if there is none yet"""
+        report = db.session.get(ReportCard, report_id)
+        if report is None:
+            raise ValueError("Report card not found")
+        if not report.file_path or not os.path.exists(report.file_path):
+            ReportService.render_pdfs([report])
+            db.session.commit()
+        return report.file_path
+
+    @staticmethod
+    def render_pdfs(report_cards):
+        """Render report cards to PDF files under REPORTS_DIR and set their
+        file_path; the caller commits. Names and subject averages are read for
+        all of them at once. Returns the number of PDFs written."""
+        if not report_cards:
+            return 0
+        student_ids = [report.student_id for report in report_cards]
+        students = {row[0]: row[1:] for row in db.session.query(
+            Student.id, User.first_name, User.last_name, Student.student_number, Classroom.name
+        ).join(User, Student.user_id == User.id).outerjoin(
+            Classroom, Student.classroom_id == Classroom.id
+        ).filter(Student.id.in_(student_ids))}
+        period_ids = {report.evaluation_period_id for report in report_cards}
+        periods = {period.id: period for period in
+                   EvaluationPeriod.query.filter(EvaluationPeriod.id.in_(period_ids))}
+        averages = {period_id: AverageService.averages(period_id, student_ids=student_ids)
+                    for period_id in period_ids}
+
+        styles = getSampleStyleSheet()
+        for report in report_cards:
+            first_name, last_name, student_number, classroom_name = students[report.student_id]
+            period = periods[report.evaluation_period_id]
+            subjects = averages[report.evaluation_period_id].get(report.student_id, {'subjects': {}})['subjects']
+
+            directory = os.path.join(current_app.config['REPORTS_DIR'], str(period.id))
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f'report_card_{student_number}_{period.id}.pdf')
+
+            rows = [['Subject', 'Coefficient', f'Average /{SCALE}']] + [
+                [Paragraph(escape(subject['name']), styles['Normal']), subject['coefficient'],
+                 f"{subject['average']:.2f}" if subject['average'] is not None else '-']
+                for subject in sorted(subjects.values(), key=lambda subject: subject['name'])
+            ]
+            table = Table(rows, colWidths=[260, 90, 110])
+            table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+            ]))
+            overall = f'{float(report.overall_average):.2f}' if report.overall_average is not None else '-'
+            story = [
+                Paragraph('Report Card', styles['Title']),
+                Paragraph(escape(f'{first_name} {last_name} ({student_number}) - {classroom_name or ""}'), styles['Heading2']),
+                Paragraph(escape(f'{period.name}, {period.academic_year}'), styles['Normal']),
+                Spacer(1, 12),
+                table,
+                Spacer(1, 12),
+                Paragraph(f'Overall average: <b>{overall} / {SCALE}</b>', styles['Normal']),
+                Paragraph(f'Class rank: <b>{report.class_rank or "-"} / {report.total_students or "-"}</b>',
+                          styles['Normal']),
+            ]
+            if report.teacher_comments:
+                story += [Spacer(1, 12), Paragraph('Comments', styles['Heading3']),
+                          Paragraph(escape(report.teacher_comments), styles['Normal'])]
+            SimpleDocTemplate(path, pagesize=A4, title=f'Report card {student_number}').build(story)
+            report.file_path = path
+        return len(report_cards)
+
+    @staticmethod
+    def write_report_cards(period_id, teacher_id=None, classroom_id=None, student_ids=None, comments=None):
+        """Upsert the report cards of a classroom's (or the school's) enrolled
+        students in one statement; the caller commits. Returns (written, skipped).
+
+        Averages come from AverageService in one query. Ranks are dense within
+        each classroom on the averages as stored (to the cent): tied students
+        share a rank and the next one follows without a gap. total_students is
+        the classroom's enrollment. Without teacher_id each report card is
+        signed by its classroom's head teacher. With student_ids only their
+        report cards are written, still ranked against their whole classroom.
+        Students without grades, or without anyone to sign, are skipped.
+        Comments left out keep the ones already on the report card.
+        """
+        enrolled = db.session.query(Student.id, Student.classroom_id, Classroom.head_teacher_id).join(
+            Classroom, Student.classroom_id == Classroom.id
+        ).filter(Student.is_enrolled == True)
+        scope = db.select(Student.id).filter(Student.is_enrolled == True)
+        if classroom_id is not None:
+            enrolled = enrolled.filter(Student.classroom_id == classroom_id)
+            scope = scope.filter(Student.classroom_id == classroom_id)
+        students = enrolled.order_by(Student.id).all()
+        if not students:
+            return 0, 0
+        averages = AverageService.averages(period_id, student_ids=scope)
+
+        overall = np.array([averages[s[0]]['overall'] if s[0] in averages else None for s in students],
+                           dtype=np.float64).round(2)
+        classrooms = np.array([s[1] for s in students], dtype=np.int64)
+        ranks = ReportService.dense_ranks(classrooms, overall)
+        _, classroom_of, enrollment = np.unique(classrooms, return_inverse=True, return_counts=True)
+
+        wanted = set(student_ids) if student_ids is not None else None
+        now = datetime.utcnow()
+        rows, skipped = [], 0
+        for i, (student_id, _, head_teacher_id) in enumerate(students):
+            if wanted is not None and student_id not in wanted:
+                continue
+            generated_by = teacher_id if teacher_id is not None else head_teacher_id
+            if np.isnan(overall[i]) or generated_by is None:
+                skipped += 1
+                continue
+            rows.append({
+                'student_id': student_id,
+                'evaluation_period_id': period_id,
+                'generated_by': generated_by,
+                'generation_date': now,
+                'overall_average': float(overall[i]),
+                'class_rank': int(ranks[i]),
+                'total_students': int(enrollment[classroom_of[i]]),
+                'teacher_comments': comments,
+                # A PDF rendered from the previous numbers is out of date
+                'file_path': None
+            })
+
+        table = ReportCard.__table__
+        written = upsert(
+            db.session, table, rows,
+            keys=[table.c.student_id, table.c.evaluation_period_id],
+            update=['generated_by', 'generation_date', 'overall_average', 'class_rank', 'total_students',
+                    'file_path'],
+            coalesce=['teacher_comments']
+        )
+        return written, skipped
+
+    @staticmethod
+    def dense_ranks(groups, values):
+        """Rank of each value within its group, 1 for the highest; equal values
+        share a rank, with no gap after them. 0 where the value is NaN."""
+        ranks = np.zeros(len(values), dtype=np.int64)
+        counted = np.flatnonzero(~np.isnan(values))
+        if not len(counted):
+            return ranks
+        order = counted[np.lexsort((-values[counted], groups[counted]))]
+        group, value = groups[order], values[order]
+        new_group = np.r_[True, group[1:] != group[:-1]]
+        steps = np.cumsum(new_group | np.r_[True, value[1:] != value[:-1]])
+        ranks[order] = steps - np.maximum.accumulate(np.where(new_group, steps, 0)) + 1
+        return ranks
+
+
+# Worker processes of ReportService.generate_all
+
+def _init_worker():
+    # Ctrl-C reaches the whole process group: the parent cancels the queued
+    # classrooms and the workers finish the ones they are writing
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Each worker builds its own app, so it gets its own engine and connections
+    from app import create_app
+    global _worker_app
+    _worker_app = create_app()
+    _worker_app.app_context().push()
+    # Progress is reported by the parent process
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+def _generate_classroom(period_id, classroom_id, run_id, render_pdfs):
+    """One classroom's report cards and PDFs, committed together with its batch record"""
+    try:
+        batch = ReportService.generate_batch(period_id, classroom_id=classroom_id, run_id=run_id,
+                                             render_pdfs=render_pdfs)
         db.session.commit()
-        
-        return report_card
\ No newline at end of file
+        return batch.to_dict()
+    except Exception:
+        db.session.rollback()
+        raise
@@ -0,0 +1,126 @@
+# app/services/RevocationService.py
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from app.models.TokenRevocation import TokenRevocation
+from app import db, jwt
+import threading
+import time
+
+
+def _epoch(dt):
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+class RevocationService:
+    """Compact in-memory view of the token_revocations table.
+
+    Keeps one entry per revoked user: tokens for that user issued before it are
+    rejected, down to the second (a token issued in the same second as the
+    revocation is accepted). The map is refreshed incrementally at most every
+    REVOCATION_SYNC_INTERVAL seconds, so checking a token does not hit the
+    database and revocations made by other workers are picked up within that
+    interval. Each refresh re-reads the rows revoked up to
+    REVOCATION_SYNC_OVERLAP seconds before the newest one seen, since a row
+    stamped earlier can commit later; merging is idempotent, so reading a row
+    twice is harmless. Revocations made through this service are applied
+    locally once the caller's transaction commits. Entries are dropped once
+    every token they cover has expired.
+    """
+
+    _revoked = None  # user_id -> (revoked_before, expires_at), epoch seconds
+    _last_revoked_at = None
+    _synced_at = 0.0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def revoke_user(user_id, reason=None):
+        """Reject every token issued to the user so far (persisted with the caller's commit)"""
+        # JWT iat has whole seconds: a token issued in the revocation's own
+        # second is kept, so logging in again right away is never rejected
+        now = datetime.utcnow().replace(microsecond=0)
+        expires_at = now + current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+        db.session.add(TokenRevocation(
+            user_id=user_id,
+            reason=reason,
+            revoked_at=now,
+            expires_at=expires_at
+        ))
+        db.session.info.setdefault('pending_revocations', []).append((user_id, _epoch(now), _epoch(expires_at)))
+
+    @staticmethod
+    def _apply(revocations):
+        with RevocationService._lock:
+            if RevocationService._revoked is None:
+                return  # the first sync reads them from the table
+            revoked = dict(RevocationService._revoked)
+            for user_id, revoked_before, expires_at in revocations:
+                RevocationService._merge(revoked, user_id, revoked_before, expires_at)
+            RevocationService._revoked = revoked
+
+    @staticmethod
+    def is_revoked(jwt_payload):
+        entry = RevocationService._get().get(int(jwt_payload['sub']))
+        return entry is not None and jwt_payload['iat'] < entry[0]
+
+    @staticmethod
+    def _get():
+        interval = current_app.config.get('REVOCATION_SYNC_INTERVAL', 5)
+        if RevocationService._revoked is not None and time.monotonic() - RevocationService._synced_at < interval:
+            return RevocationService._revoked
+        with RevocationService._lock:
+            if RevocationService._revoked is None or time.monotonic() - RevocationService._synced_at >= interval:
+                RevocationService._sync()
+            return RevocationService._revoked
+
+    @staticmethod
+    def _sync():
+        query = db.session.query(
+            TokenRevocation.user_id, TokenRevocation.revoked_at, TokenRevocation.expires_at
+        )
+        if RevocationService._revoked is None or RevocationService._last_revoked_at is None:
+            query = query.filter(TokenRevocation.expires_at > datetime.utcnow())
+        else:
+            overlap = timedelta(seconds=current_app.config.get('REVOCATION_SYNC_OVERLAP', 60))
+            query = query.filter(TokenRevocation.revoked_at >= RevocationService._last_revoked_at - overlap)
+        rows = query.all()
+
+        now = time.time()
+        # Copy on write: readers never see a dict being modified
+        revoked = {user_id: entry for user_id, entry in (RevocationService._revoked or {}).items() if entry[1] > now}
+        for user_id, revoked_at, expires_at in rows:
+            if _epoch(expires_at) > now:
+                RevocationService._merge(revoked, user_id, _epoch(revoked_at), _epoch(expires_at))
+            if RevocationService._last_revoked_at is None or revoked_at > RevocationService._last_revoked_at:
+                RevocationService._last_revoked_at = revoked_at
+
+        RevocationService._revoked = revoked
+        RevocationService._synced_at = time.monotonic()
+
+    @staticmethod
+    def _merge(revoked, user_id, revoked_before, expires_at):
+        # Rows written elsewhere may carry fractions of a second
+        revoked_before = int(revoked_before)
+        current = revoked.get(user_id)
+        if current is None:
+            revoked[user_id] = (revoked_before, expires_at)
+        else:
+            revoked[user_id] = (max(current[0], revoked_before), max(current[1], expires_at))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_after_commit(session):
+    revocations = session.info.pop('pending_revocations', None)
+    if revocations:
+        RevocationService._apply(revocations)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop('pending_revocations', None)
+
+
+@jwt.token_in_blocklist_loader
+def _token_revoked(jwt_header, jwt_payload):
+    return RevocationService.is_revoked(jwt_payload)
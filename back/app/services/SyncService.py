@@ -0,0 +1,198 @@
+# app/services/SyncService.py
+from sqlalchemy import event, tuple_
+from sqlalchemy.orm import Session
+from flask import current_app
+from app.models.Attendance import Attendance
+from app.models.Classroom import Classroom
+from app.models.Evaluation import Evaluation
+from app.models.Grade import Grade
+from app.models.Student import Student
+from app.models.Sync import SyncTombstone, SyncOperation
+from app.services.AccessService import AccessService
+from app.services.AttendanceService import AttendanceService
+from app.services.GradeService import GradeService
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.serializers import serialize_classrooms, serialize_students, serialize_attendances, serialize_grades
+from app import db
+from datetime import datetime, timedelta
+
+# Synced tables in the order a client should apply them, with what scopes
+# them to a set of classrooms and how their rows are serialized
+_SOURCES = (
+    (Classroom, lambda ids: Classroom.id.in_(ids),
+     lambda rows: serialize_classrooms(rows, include_relationships=False)),
+    (Student, lambda ids: Student.classroom_id.in_(ids),
+     lambda rows: serialize_students(rows, include_relationships=False)),
+    (Attendance, lambda ids: Attendance.classroom_id.in_(ids),
+     serialize_attendances),
+    (Grade, lambda ids: Grade.evaluation_id.in_(db.select(Evaluation.id).where(Evaluation.classroom_id.in_(ids))),
+     lambda rows: serialize_grades(rows, include_relationships=False)),
+)
+
+# Classroom a deleted row belonged to, read before the delete is flushed
+_CLASSROOM_OF = {
+    Classroom: lambda classroom: classroom.id,
+    Student: lambda student: student.classroom_id,
+    Attendance: lambda attendance: attendance.classroom_id,
+    Grade: lambda grade: grade.evaluation.classroom_id if grade.evaluation else None,
+}
+
+OPERATION_TYPES = ('attendance', 'grade')
+
+
+class SyncService:
+    """Delta sync for offline clients.
+
+    ``changes`` returns the classroom, student, attendance and grade rows
+    changed since a watermark, read in (updated_at, id) order from the
+    indexes on those columns, plus tombstones for rows deleted since. The
+    watermark is an opaque cursor holding the position reached in each table,
+    so a response costs what changed, not the size of the tables; when a
+    table has more than SYNC_BATCH_SIZE changes, ``has_more`` is set and the
+    client asks again with the new watermark. Rows written in the last
+    SYNC_LAG_SECONDS are held back until the next sync so that transactions
+    still committing cannot slip behind the watermark.
+
+    Teachers get the classrooms they can access. Rows that leave a teacher's
+    scope (a student moved elsewhere, an assignment ended) are not reported;
+    clients resync without a watermark when access changes.
+
+    ``push`` applies queued offline writes. Each operation carries a client
+    id; its result is stored, and pushing the same id again returns the
+    stored result without applying it twice.
+    """
+
+    @staticmethod
+    def changes(classroom_ids, since=None, batch_size=None):
+        """classroom_ids limits the scope (None for everything); raises
+        InvalidCursor for a bad watermark"""
+        batch_size = batch_size or current_app.config.get('SYNC_BATCH_SIZE', 1000)
+        horizon = datetime.utcnow() - timedelta(seconds=current_app.config.get('SYNC_LAG_SECONDS', 5))
+        key_columns = [column for model, _, _ in _SOURCES for column in (model.updated_at, model.id)]
+        key_columns.append(SyncTombstone.id)
+        positions = decode_cursor(since, key_columns) if since else [None] * len(key_columns)
+
+        changes, watermark, has_more = {}, [], False
+        for i, (model, scope, serialize) in enumerate(_SOURCES):
+            updated_at, row_id = positions[2 * i], positions[2 * i + 1]
+            query = model.query.filter(model.updated_at <= horizon)
+            if classroom_ids is not None:
+                query = query.filter(scope(classroom_ids))
+            if updated_at is not None:
+                query = query.filter(tuple_(model.updated_at, model.id) > tuple_(updated_at, row_id))
+            rows = query.order_by(model.updated_at, model.id).limit(batch_size + 1).all()
+            if len(rows) > batch_size:
+                rows, has_more = rows[:batch_size], True
+            if rows:
+                updated_at, row_id = rows[-1].updated_at, rows[-1].id
+            watermark += [updated_at, row_id]
+            changes[model.__tablename__] = serialize(rows)
+
+        last_tombstone = positions[-1]
+        deleted = {model.__tablename__: [] for model, _, _ in _SOURCES}
+        if since:
+            # A first sync has nothing to delete
+            query = SyncTombstone.query.filter(SyncTombstone.deleted_at <= horizon)
+            if classroom_ids is not None:
+                query = query.filter(SyncTombstone.classroom_id.in_(classroom_ids))
+            if last_tombstone is not None:
+                query = query.filter(SyncTombstone.id > last_tombstone)
+            tombstones = query.order_by(SyncTombstone.id).limit(batch_size + 1).all()
+            if len(tombstones) > batch_size:
+                tombstones, has_more = tombstones[:batch_size], True
+            for tombstone in tombstones:
+                deleted.setdefault(tombstone.table_name, []).append(tombstone.row_id)
+            if tombstones:
+                last_tombstone = tombstones[-1].id
+        else:
+            last_tombstone = db.session.query(db.func.max(SyncTombstone.id)).filter(
+                SyncTombstone.deleted_at <= horizon
+            ).scalar()
+        watermark.append(last_tombstone)
+
+        return {
+            'watermark': encode_cursor(watermark),
+            'has_more': has_more,
+            'changes': changes,
+            'deleted': deleted
+        }
+
+    @staticmethod
+    def parse_operations(data):
+        operations = data.get('operations')
+        if not isinstance(operations, list) or not operations:
+            raise ValueError('operations must be a non-empty list')
+        max_operations = current_app.config.get('SYNC_PUSH_MAX_OPERATIONS', 500)
+        if len(operations) > max_operations:
+            raise ValueError(f'At most {max_operations} operations per push')
+        for operation in operations:
+            if not isinstance(operation, dict) or not isinstance(operation.get('data'), dict):
+                raise ValueError('Each operation needs an id, a type and a data object')
+            op_id = operation.get('id')
+            if not isinstance(op_id, str) or not 0 < len(op_id) <= 64:
+                raise ValueError('Operation ids must be strings of 1 to 64 characters')
+            if operation.get('type') not in OPERATION_TYPES:
+                raise ValueError(f"Unknown operation type '{operation.get('type')}'")
+        return operations
+
+    @staticmethod
+    def push(user, operations):
+        """Apply operations in order, skipping ids already pushed; the caller
+        commits. Returns one result per operation."""
+        done = {
+            op.client_op_id: op for op in SyncOperation.query.filter(
+                SyncOperation.user_id == user.id,
+                SyncOperation.client_op_id.in_({operation['id'] for operation in operations})
+            )
+        }
+
+        results = []
+        for operation in operations:
+            previous = done.get(operation['id'])
+            if previous is not None:
+                results.append({**previous.to_dict(), 'replayed': True})
+                continue
+
+            try:
+                SyncService._apply(user, operation['type'], operation['data'])
+                status, message = 'applied', None
+            except (ValueError, PermissionError) as e:
+                # Validation happens before any write, so nothing of this operation is kept
+                status, message = 'rejected', str(e)
+
+            record = SyncOperation(user_id=user.id, client_op_id=operation['id'],
+                                   op_type=operation['type'], status=status, message=message)
+            db.session.add(record)
+            done[operation['id']] = record
+            results.append({**record.to_dict(), 'replayed': False})
+        return results
+
+    @staticmethod
+    def _apply(user, op_type, data):
+        teacher = user.teacher_profile if user.role == 'teacher' else None
+        if user.role == 'teacher' and not teacher:
+            raise PermissionError('Teacher profile not found')
+
+        if op_type == 'attendance':
+            roll_calls = AttendanceService.parse_roll_calls(data)
+            if teacher:
+                for classroom_id, _, _ in roll_calls:
+                    if not AccessService.can_access_classroom(teacher.id, classroom_id):
+                        raise PermissionError('You do not have access to this classroom')
+            AttendanceService.record(roll_calls, user.id)
+        else:
+            entries = GradeService.parse_entries(data)
+            evaluations = GradeService.evaluations(entries)
+            if teacher:
+                for evaluation in evaluations.values():
+                    if not AccessService.can_teach(teacher.id, evaluation.classroom_id, evaluation.subject_id):
+                        raise PermissionError('No assignment found for this subject/classroom')
+            GradeService.record(entries, user.id, evaluations)
+
+
+@event.listens_for(Session, 'before_flush')
+def _record_tombstones(session, flush_context, instances):
+    for obj in list(session.deleted):
+        classroom_of = _CLASSROOM_OF.get(type(obj))
+        if classroom_of is not None and obj.id is not None:
+            session.add(SyncTombstone(table_name=obj.__tablename__, row_id=obj.id, classroom_id=classroom_of(obj)))
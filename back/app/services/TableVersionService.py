@@ -0,0 +1,111 @@
+# app/services/TableVersionService.py
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.models.TableVersion import TableVersion
+from app.utils.upsert import supports_upsert, upsert_statement
+from app import db
+import hashlib
+
+
+class TableVersionService:
+    """Change counters per table, used to build ETags without reading rows.
+
+    Only tables some @etag endpoint depends on are counted (see track). A
+    transaction that inserts, updates or deletes rows of such a table
+    increments its counter once, right before it commits, so a version
+    changes exactly when the data it covers is committed, whichever worker
+    wrote it, and the counter rows stay locked only for the commit itself.
+    Rows are bumped in table name order, so concurrent writers lock them in
+    the same order. Bulk insert/update/delete statements run through the
+    session are counted too. Writes that bypass the session (AuditService)
+    are not.
+    """
+
+    tracked = set()  # table names read by @etag endpoints
+
+    @staticmethod
+    def track(tables):
+        TableVersionService.tracked.update(tables)
+
+    @staticmethod
+    def versions(tables):
+        """{table_name: version}; tables never written to are at 0"""
+        rows = db.session.query(TableVersion.table_name, TableVersion.version).filter(
+            TableVersion.table_name.in_(tables)
+        )
+        versions = dict.fromkeys(tables, 0)
+        versions.update(rows)
+        return versions
+
+    @staticmethod
+    def etag(tables, *scope):
+        """Opaque tag that changes whenever one of the tables or the scope does"""
+        versions = TableVersionService.versions(tables)
+        raw = repr((sorted(versions.items()), scope))
+        return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+    @staticmethod
+    def bump(connection, tables):
+        names = sorted(set(tables) & TableVersionService.tracked)
+        if not names:
+            return
+        table = TableVersion.__table__
+
+        if supports_upsert(connection.dialect.name):
+            statement = upsert_statement(connection.dialect.name, table,
+                                         keys=[table.c.table_name], update={'version': table.c.version + 1})
+            connection.execute(statement, [{'table_name': name, 'version': 1} for name in names])
+            return
+
+        connection.execute(
+            table.update().where(table.c.table_name.in_(names)).values(version=table.c.version + 1)
+        )
+        existing = {row.table_name for row in connection.execute(
+            db.select(table.c.table_name).where(table.c.table_name.in_(names))
+        )}
+        missing = [{'table_name': name, 'version': 1} for name in names if name not in existing]
+        if missing:
+            connection.execute(table.insert(), missing)
+
+
+def _written_tables(session):
+    tables = set()
+    for obj in list(session.new) + list(session.deleted):
+        tables.update(table.name for table in inspect(obj).mapper.tables)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            tables.update(table.name for table in inspect(obj).mapper.tables)
+    return tables
+
+
+def _mark_written(session, tables):
+    tables = set(tables) & TableVersionService.tracked
+    if tables:
+        session.info.setdefault('written_tables', set()).update(tables)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_flush(session, flush_context):
+    _mark_written(session, _written_tables(session))
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None:
+            _mark_written(orm_execute_state.session, [table.name])
+
+
+@event.listens_for(Session, 'before_commit')
+def _bump_before_commit(session):
+    # commit() only flushes after this hook; flush now so every write is seen
+    session.flush()
+    tables = session.info.pop('written_tables', None)
+    if tables:
+        TableVersionService.bump(session.connection(), tables)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop('written_tables', None)
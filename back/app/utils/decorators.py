@@ -1,8 +1,9 @@
 from functools import wraps
-from flask import jsonify, request
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-from app.models.User import User
-from app.models.AuditLog import AuditLog
+from flask import jsonify, request, current_app, Response
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
+from app.services.AuditService import AuditService
+from app.services.PrincipalService import PrincipalService, ClaimsUser
+from app.services.TableVersionService import TableVersionService
 from app import db
 
 def role_required(*allowed_roles):
@@ -12,8 +13,15 @@ def role_required(*allowed_roles):
             try:
                 verify_jwt_in_request()
                 current_user_id = get_jwt_identity()
-                # user = User.query.get(current_user_id)
-                user = User.query.get(int(current_user_id))
+                claims = get_jwt()
+                
+                if current_app.config.get('AUTH_TRUST_CLAIMS') and 'role' in claims:
+                    # Revoked and deactivated users were already rejected by the
+                    # blocklist check; the user row is only loaded if the route needs it
+                    user = ClaimsUser(int(current_user_id), claims.get('email'), claims['role'])
+                else:
+                    principal = PrincipalService.load(int(current_user_id))
+                    user = principal.user if principal else None
 
                 if not user or not user.is_active:
                     return jsonify({'message': 'Invalid or inactive user'}), 401
@@ -38,33 +46,77 @@ def role_required(*allowed_roles):
         return decorated_function
     return decorator
 
+def etag(*models):
+    """Conditional GET for read endpoints whose output only depends on the
+    given models, the caller and the query string. Goes under role_required.
+
+    The weak ETag is built from the models' table versions, so a matching
+    If-None-Match is answered with 304 before the view runs. Declaring the
+    models here is what makes writes to their tables counted.
+    """
+    tables = tuple(model.__tablename__ for model in models)
+    TableVersionService.track(tables)
+    
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(current_user, *args, **kwargs):
+            tag = TableVersionService.etag(tables, current_user.id, current_user.role, request.full_path)
+            if request.if_none_match.contains_weak(tag):
+                response = Response(status=304)
+            else:
+                response = current_app.make_response(f(current_user, *args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(tag, weak=True)
+            # Shared caches must not reuse it and browsers must revalidate
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
+
 def log_action(action, table_name=None):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             try:
-                result = f(*args, **kwargs)
-                
-                current_user_id = None
-                try:
-                    verify_jwt_in_request()
-                    current_user_id = get_jwt_identity()
-                except:
-                    pass
-                
-                audit_log = AuditLog(
-                    user_id=current_user_id,
-                    action=action,
-                    table_name=table_name,
-                    ip_address=request.remote_addr,
-                    user_agent=request.headers.get('User-Agent')
-                )
-                db.session.add(audit_log)
-                db.session.commit()
-                
-                return result
+                response = current_app.make_response(f(*args, **kwargs))
             except Exception as e:
                 db.session.rollback()
                 raise e
+            
+            current_user_id = None
+            try:
+                verify_jwt_in_request(optional=True)
+                current_user_id = get_jwt_identity()
+            except:
+                pass
+            
+            AuditService.record(
+                user_id=int(current_user_id) if current_user_id is not None else None,
+                action=action,
+                table_name=table_name,
+                record_id=_audit_record_id(kwargs, response),
+                status_code=response.status_code,
+                ip_address=request.remote_addr,
+                user_agent=request.headers.get('User-Agent')
+            )
+            
+            return response
         return decorated_function
-    return decorator
\ No newline at end of file
+    return decorator
+
+def _audit_record_id(view_args, response):
+    """Id of the affected row: the route's first *_id argument, otherwise the
+    id of the object returned in the JSON body (e.g. on creation)"""
+    for name, value in view_args.items():
+        if name.endswith('_id') and isinstance(value, int):
+            return value
+    
+    payload = response.get_json(silent=True) if response.is_json else None
+    if isinstance(payload, dict):
+        if isinstance(payload.get('id'), int):
+            return payload['id']
+        for value in payload.values():
+            if isinstance(value, dict) and isinstance(value.get('id'), int):
+                return value['id']
+    return None
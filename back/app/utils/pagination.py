@@ -0,0 +1,129 @@
+# app/utils/pagination.py
+"""Keyset pagination for list endpoints.
+
+A list endpoint passes its filtered query, the columns it is ordered by and
+its serializer to ``paginate``. Without ``limit`` or ``after`` in the query
+string the whole list is returned as before, streamed unless STREAM_LISTS
+is off. With them the response becomes ``{"items": [...], "limit": n,
+"next_after": cursor}``; ``next_after`` is an opaque cursor for the
+following page, or null on the last one. Pages are
+fetched with ``WHERE (keys) > (cursor) ORDER BY keys LIMIT n + 1``, so the
+cost of a page does not depend on how deep it is and no total count is run.
+
+Both helpers also honour ``?fields=`` and ``?include=`` (see
+app/utils/serializers.py).
+"""
+from flask import request, jsonify, current_app
+from sqlalchemy import tuple_
+from app.utils.streaming import stream_list
+from app.utils.serializers import sparse, InvalidFieldset
+from datetime import date, datetime
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def as_bool(value):
+    """Query string converter for request.args.get(..., type=as_bool)"""
+    lowered = value.strip().lower()
+    if lowered in ('1', 'true', 'yes'):
+        return True
+    if lowered in ('0', 'false', 'no'):
+        return False
+    raise ValueError(f'Not a boolean: {value}')
+
+
+def as_date(value):
+    """Query string converter for YYYY-MM-DD dates"""
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """Cursor string -> key values typed like the given columns"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError('wrong number of keys')
+        return [_from_json(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f'Invalid cursor: {e}')
+
+
+def _from_json(column, value):
+    python_type = column.type.python_type
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def list_response(query, serialize):
+    """Whole-list JSON response, streamed when STREAM_LISTS is on"""
+    try:
+        query, serialize = sparse(query, serialize)
+    except InvalidFieldset as e:
+        return jsonify({'message': str(e)}), 400
+    return _whole_list(query, serialize)
+
+
+def _whole_list(query, serialize):
+    if current_app.config.get('STREAM_LISTS', True):
+        return stream_list(query, serialize)
+    return jsonify(serialize(query.all()))
+
+
+def paginate(query, keys, serialize, descending=False):
+    """Return the JSON response for a list endpoint.
+
+    keys are the columns that order the list; the last one must be unique
+    (usually the primary key) so the order is stable. All keys are sorted in
+    the same direction.
+    """
+    try:
+        query, serialize = sparse(query, serialize, keys)
+    except InvalidFieldset as e:
+        return jsonify({'message': str(e)}), 400
+
+    limit = request.args.get('limit', type=int)
+    after = request.args.get('after')
+    ordering = [key.desc() for key in keys] if descending else list(keys)
+
+    if limit is None and after is None:
+        return _whole_list(query.order_by(*ordering), serialize)
+
+    default_limit = current_app.config.get('PAGE_SIZE_DEFAULT', 50)
+    max_limit = current_app.config.get('PAGE_SIZE_MAX', 500)
+    limit = min(max(limit or default_limit, 1), max_limit)
+
+    if after:
+        try:
+            values = decode_cursor(after, keys)
+        except InvalidCursor as e:
+            return jsonify({'message': str(e)}), 400
+        position = tuple_(*keys)
+        cursor = tuple_(*values)
+        query = query.filter(position < cursor if descending else position > cursor)
+
+    rows = query.order_by(*ordering).limit(limit + 1).all()
+    next_after = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_after = encode_cursor([getattr(rows[-1], key.key) for key in keys])
+
+    return jsonify({
+        'items': serialize(rows),
+        'limit': limit,
+        'next_after': next_after
+    })
@@ -0,0 +1,522 @@
+# app/utils/serializers.py
+"""Bulk serializers for list endpoints.
+
+Each ``serialize_*`` function takes the rows an endpoint already loaded and
+returns exactly what calling ``to_dict()`` on every row would, but resolves
+related objects with one column-projected query per relation (ids are sent in
+IN lists of at most _CHUNK values) instead of lazy loads per row. The number
+of queries therefore depends on the relations involved, not on the row count.
+
+Every serializer also takes ``fields`` (scalar keys to keep) and ``include``
+(related objects to embed). ``sparse`` reads them from ``?fields=`` and
+``?include=``, rejects unknown names before any query runs and restricts the
+loaded columns to what the requested keys need.
+"""
+from flask import request
+from functools import partial
+from operator import attrgetter
+from sqlalchemy import func
+from sqlalchemy.orm import load_only
+from app.models.User import User
+from app.models.Student import Student
+from app.models.Teacher import Teacher
+from app.models.Classroom import Classroom
+from app.models.Subject import Subject
+from app.models.TeacherAssignment import TeacherAssignment
+from app.models.Evaluation import Evaluation
+from app.models.EvaluationPeriod import EvaluationPeriod
+from app.models.Grade import Grade
+from app.models.ReportCard import ReportCard
+from app.models.Attendance import Attendance
+from app import db
+
+_CHUNK = 500
+
+
+class InvalidFieldset(ValueError):
+    pass
+
+
+def _iso(name):
+    return lambda row: getattr(row, name).isoformat()
+
+
+def _iso_or_none(name):
+    return lambda row: getattr(row, name).isoformat() if getattr(row, name) else None
+
+
+def _float(name):
+    return lambda row: float(getattr(row, name))
+
+
+def _float_or_none(name):
+    return lambda row: float(getattr(row, name)) if getattr(row, name) else None
+
+
+def _plain(*names):
+    return {name: attrgetter(name) for name in names}
+
+
+class _Schema:
+    """What one serializer can output.
+
+    fields maps scalar keys to getters on a row, computed are keys that are
+    not columns (counts), includes maps related objects to the row attributes
+    they are resolved from, and default_includes are embedded even when
+    include_relationships is False (as the model's to_dict does).
+    """
+
+    def __init__(self, model, fields, computed=(), includes=None, default_includes=()):
+        self.model = model
+        self.fields = fields
+        self.computed = tuple(computed)
+        self.includes = includes or {}
+        self.default_includes = frozenset(default_includes)
+
+    def getters(self, fields):
+        return [(name, get) for name, get in self.fields.items() if fields is None or name in fields]
+
+    def wants(self, fields, name):
+        return fields is None or name in fields
+
+    def included(self, include, include_relationships):
+        if include is not None:
+            return frozenset(include)
+        return frozenset(self.includes) if include_relationships else self.default_includes
+
+    def validate(self, fields, include):
+        unknown = []
+        if fields is not None:
+            unknown += [f for f in fields if f not in self.fields and f not in self.computed]
+        if include is not None:
+            unknown += [i for i in include if i not in self.includes]
+        if unknown:
+            raise InvalidFieldset(f"Unknown field(s): {', '.join(sorted(unknown))}")
+
+    def columns(self, fields, included, keys=()):
+        """Model columns needed to output the given fields and relations"""
+        names = {'id'} | {key.key for key in keys} | set(fields)
+        for relation in included:
+            names.update(self.includes[relation])
+        return [getattr(self.model, name) for name in sorted(names) if name in self.model.__table__.c]
+
+
+def _scalars(row, getters):
+    return {name: get(row) for name, get in getters}
+
+
+# Schemas -------------------------------------------------------------------
+
+_USERS = _Schema(User, {
+    **_plain('id', 'email', 'first_name', 'last_name', 'role', 'is_active'),
+    'created_at': _iso('created_at'),
+    'updated_at': _iso('updated_at'),
+}, includes={'teacher': ()}, default_includes=('teacher',))
+
+_STUDENTS = _Schema(Student, {
+    **_plain('id', 'user_id', 'student_number', 'classroom_id'),
+    'date_of_birth': _iso_or_none('date_of_birth'),
+    **_plain('address', 'phone', 'parent_name', 'parent_email', 'parent_phone'),
+    'enrollment_date': _iso('enrollment_date'),
+    'is_enrolled': attrgetter('is_enrolled'),
+    'updated_at': _iso_or_none('updated_at'),
+}, includes={'user': ('user_id',), 'classroom': ('classroom_id',)}, default_includes=('user',))
+
+_TEACHERS = _Schema(Teacher, {
+    **_plain('id', 'user_id', 'employee_number', 'specialization'),
+    'hire_date': _iso('hire_date'),
+    **_plain('is_head_teacher', 'created_by'),
+}, includes={
+    # The embedded user repeats the teacher's own profile fields
+    'user': ('user_id', 'employee_number', 'specialization', 'is_head_teacher'),
+    'head_of_classrooms': (),
+    'assignments': (),
+}, default_includes=('user',))
+
+_CLASSROOMS = _Schema(Classroom, {
+    **_plain('id', 'name', 'level', 'academic_year', 'head_teacher_id', 'max_students'),
+    'created_at': _iso('created_at'),
+    'updated_at': _iso_or_none('updated_at'),
+    'assigned_by': attrgetter('assigned_by'),
+}, computed=('students_count',), includes={'head_teacher': ('head_teacher_id',)})
+
+_SUBJECTS = _Schema(Subject, {
+    **_plain('id', 'name', 'code', 'coefficient'),
+    'created_at': _iso('created_at'),
+})
+
+_ASSIGNMENTS = _Schema(TeacherAssignment, {
+    **_plain('id', 'teacher_id', 'subject_id', 'classroom_id', 'academic_year', 'assigned_by'),
+    'assigned_date': _iso('assigned_date'),
+    'is_active': attrgetter('is_active'),
+}, includes={'teacher': ('teacher_id',), 'subject': ('subject_id',), 'classroom': ('classroom_id',)})
+
+_PERIODS = _Schema(EvaluationPeriod, {
+    **_plain('id', 'name', 'academic_year'),
+    'start_date': _iso('start_date'),
+    'end_date': _iso('end_date'),
+    'is_active': attrgetter('is_active'),
+    'created_at': _iso('created_at'),
+}, computed=('evaluations_count', 'report_cards_count'))
+
+_GRADES = _Schema(Grade, {
+    **_plain('id', 'student_id', 'evaluation_id', 'subject_id'),
+    'points_earned': _float('points_earned'),
+    'points_possible': _float('points_possible'),
+    'percentage': _float_or_none('percentage'),
+    **_plain('letter_grade', 'comments', 'is_excused'),
+    'created_at': _iso('created_at'),
+    'updated_at': _iso_or_none('updated_at'),
+    'created_by': attrgetter('created_by'),
+}, includes={'student': ('student_id',), 'evaluation': ('evaluation_id',), 'subject': ('subject_id',)})
+
+_REPORT_CARDS = _Schema(ReportCard, {
+    **_plain('id', 'student_id', 'evaluation_period_id', 'generated_by'),
+    'generation_date': _iso('generation_date'),
+    'overall_average': _float_or_none('overall_average'),
+    **_plain('class_rank', 'total_students', 'teacher_comments', 'file_path'),
+}, includes={'student': ('student_id',), 'evaluation_period': ('evaluation_period_id',)})
+
+_ATTENDANCES = _Schema(Attendance, {
+    **_plain('id', 'student_id', 'classroom_id'),
+    'date': _iso('date'),
+    **_plain('status', 'recorded_by'),
+    'created_at': _iso('created_at'),
+    'updated_at': _iso('updated_at'),
+})
+
+_USER_COLUMNS = tuple(getattr(User, name) for name in _USERS.fields)
+_TEACHER_COLUMNS = tuple(getattr(Teacher, name) for name in _TEACHERS.fields)
+_STUDENT_COLUMNS = tuple(getattr(Student, name) for name in _STUDENTS.fields)
+_ASSIGNMENT_COLUMNS = tuple(getattr(TeacherAssignment, name) for name in _ASSIGNMENTS.fields)
+_SUBJECT_COLUMNS = tuple(getattr(Subject, name) for name in _SUBJECTS.fields)
+_PERIOD_COLUMNS = tuple(getattr(EvaluationPeriod, name) for name in _PERIODS.fields)
+
+
+# Bulk lookups --------------------------------------------------------------
+
+def _chunks(ids):
+    ids = sorted({i for i in ids if i is not None})
+    for start in range(0, len(ids), _CHUNK):
+        yield ids[start:start + _CHUNK]
+
+
+def _fetch(query, key, ids):
+    """Run query once per chunk of ids with ``key IN (...)``; no query for no ids"""
+    rows = []
+    for chunk in _chunks(ids):
+        rows.extend(query.filter(key.in_(chunk)).all())
+    return rows
+
+
+def _by_id(rows):
+    return {row.id: row for row in rows}
+
+
+def _group(rows, attr):
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(getattr(row, attr), []).append(row)
+    return grouped
+
+
+def _counts(key, ids):
+    """key value -> number of rows, for the given key values"""
+    counts = {}
+    for chunk in _chunks(ids):
+        counts.update(db.session.query(key, func.count()).filter(key.in_(chunk)).group_by(key).all())
+    return counts
+
+
+def _teacher_links(teacher_ids):
+    """(teacher_id -> assignment rows, teacher_id -> headed classroom rows), ordered by id"""
+    assignments = _fetch(
+        db.session.query(*_ASSIGNMENT_COLUMNS).order_by(TeacherAssignment.id),
+        TeacherAssignment.teacher_id, teacher_ids
+    )
+    heads = _fetch(
+        db.session.query(Classroom.id, Classroom.name, Classroom.level, Classroom.head_teacher_id).order_by(Classroom.id),
+        Classroom.head_teacher_id, teacher_ids
+    )
+    return _group(assignments, 'teacher_id'), _group(heads, 'head_teacher_id')
+
+
+def _user_dicts(user_ids):
+    """user_id -> User.to_dict()"""
+    users = _fetch(db.session.query(*_USER_COLUMNS), User.id, list(user_ids))
+    return {user.id: data for user, data in zip(users, serialize_users(users))}
+
+
+def _student_dicts(student_ids):
+    """student_id -> Student.to_dict(include_relationships=False)"""
+    students = _fetch(db.session.query(*_STUDENT_COLUMNS), Student.id, student_ids)
+    return {student.id: data for student, data in zip(students, serialize_students(students, include_relationships=False))}
+
+
+def _subject_dicts(subject_ids):
+    getters = _SUBJECTS.getters(None)
+    return {s.id: _scalars(s, getters) for s in _fetch(db.session.query(*_SUBJECT_COLUMNS), Subject.id, subject_ids)}
+
+
+def _classroom_refs(classroom_ids):
+    return _by_id(_fetch(db.session.query(Classroom.id, Classroom.name, Classroom.level), Classroom.id, classroom_ids))
+
+
+def _classroom_ref(classroom):
+    return {'id': classroom.id, 'name': classroom.name, 'level': classroom.level}
+
+
+def _user_dict(user, getters, teacher, links):
+    result = _scalars(user, getters)
+    if teacher is not None:
+        assignments, heads = links
+        result['teacher'] = {
+            'id': teacher.id,
+            'employee_number': teacher.employee_number,
+            'specialization': teacher.specialization,
+            'is_head_teacher': teacher.is_head_teacher,
+            'assigned_classrooms': [a.classroom_id for a in assignments.get(teacher.id, ())],
+            'head_of_classrooms': [c.id for c in heads.get(teacher.id, ())]
+        }
+    return result
+
+
+# Public serializers ----------------------------------------------------------
+
+def serialize_users(users, fields=None, include=None):
+    """Same as [user.to_dict() for user in users]"""
+    getters = _USERS.getters(fields)
+    teachers, links = {}, ({}, {})
+    if 'teacher' in _USERS.included(include, True):
+        teachers = {t.user_id: t for t in _fetch(db.session.query(*_TEACHER_COLUMNS), Teacher.user_id, [u.id for u in users])}
+        links = _teacher_links([t.id for t in teachers.values()])
+    return [_user_dict(user, getters, teachers.get(user.id), links) for user in users]
+
+
+def serialize_students(students, include_relationships=True, fields=None, include=None):
+    """Same as [student.to_dict(include_relationships) for student in students]"""
+    getters = _STUDENTS.getters(fields)
+    included = _STUDENTS.included(include, include_relationships)
+    users = _user_dicts(s.user_id for s in students) if 'user' in included else {}
+    classrooms = _classroom_refs(s.classroom_id for s in students) if 'classroom' in included else {}
+
+    result = []
+    for student in students:
+        data = _scalars(student, getters)
+        if 'user' in included:
+            data['user'] = users.get(student.user_id)
+        classroom = classrooms.get(student.classroom_id)
+        if classroom is not None:
+            data['classroom'] = _classroom_ref(classroom)
+        result.append(data)
+    return result
+
+
+def serialize_teachers(teachers, include_relationships=True, fields=None, include=None):
+    """Same as [teacher.to_dict(include_relationships) for teacher in teachers]"""
+    getters = _TEACHERS.getters(fields)
+    included = _TEACHERS.included(include, include_relationships)
+    links = _teacher_links([t.id for t in teachers]) if included else ({}, {})
+    users = {}
+    if 'user' in included:
+        users = _by_id(_fetch(db.session.query(*_USER_COLUMNS), User.id, [t.user_id for t in teachers]))
+    user_getters = _USERS.getters(None)
+    assignment_getters = _ASSIGNMENTS.getters(None)
+    assignments, heads = links
+
+    result = []
+    for teacher in teachers:
+        data = _scalars(teacher, getters)
+        if 'user' in included:
+            user = users.get(teacher.user_id)
+            data['user'] = _user_dict(user, user_getters, teacher, links) if user else None
+        if 'head_of_classrooms' in included:
+            data['head_of_classrooms'] = [_classroom_ref(c) for c in heads.get(teacher.id, ())]
+        if 'assignments' in included:
+            data['assignments'] = [_scalars(a, assignment_getters) for a in assignments.get(teacher.id, ())]
+        result.append(data)
+    return result
+
+
+def serialize_classrooms(classrooms, include_relationships=True, fields=None, include=None):
+    """Same as [classroom.to_dict(include_relationships) for classroom in classrooms]"""
+    getters = _CLASSROOMS.getters(fields)
+    included = _CLASSROOMS.included(include, include_relationships)
+    students_count = None
+    if _CLASSROOMS.wants(fields, 'students_count'):
+        students_count = _counts(Student.classroom_id, [c.id for c in classrooms])
+    heads = {}
+    if 'head_teacher' in included:
+        heads = _by_id(_fetch(
+            db.session.query(Teacher.id, Teacher.employee_number, User.id.label('user_id'), User.first_name, User.last_name)
+            .outerjoin(User, Teacher.user_id == User.id),
+            Teacher.id, [c.head_teacher_id for c in classrooms]
+        ))
+
+    result = []
+    for classroom in classrooms:
+        data = _scalars(classroom, getters)
+        if students_count is not None:
+            data['students_count'] = students_count.get(classroom.id, 0)
+        head = heads.get(classroom.head_teacher_id)
+        if head is not None:
+            data['head_teacher'] = {
+                'id': head.id,
+                'employee_number': head.employee_number,
+                'name': f"{head.first_name} {head.last_name}" if head.user_id is not None else None
+            }
+        result.append(data)
+    return result
+
+
+def serialize_assignments(assignments, include_relationships=True, fields=None, include=None):
+    """Same as [assignment.to_dict(include_relationships) for assignment in assignments]"""
+    getters = _ASSIGNMENTS.getters(fields)
+    included = _ASSIGNMENTS.included(include, include_relationships)
+    teachers, subjects, classrooms = {}, {}, {}
+    if 'teacher' in included:
+        teachers = _by_id(_fetch(
+            db.session.query(Teacher.id, User.first_name, User.last_name).join(User, Teacher.user_id == User.id),
+            Teacher.id, [a.teacher_id for a in assignments]
+        ))
+    if 'subject' in included:
+        subjects = _subject_dicts(a.subject_id for a in assignments)
+    if 'classroom' in included:
+        classrooms = _classroom_refs(a.classroom_id for a in assignments)
+
+    result = []
+    for assignment in assignments:
+        data = _scalars(assignment, getters)
+        if 'teacher' in included:
+            teacher = teachers.get(assignment.teacher_id)
+            data['teacher'] = {
+                'id': teacher.id,
+                'name': f"{teacher.first_name} {teacher.last_name}"
+            } if teacher else None
+        if 'subject' in included:
+            data['subject'] = subjects.get(assignment.subject_id)
+        if 'classroom' in included:
+            classroom = classrooms.get(assignment.classroom_id)
+            data['classroom'] = _classroom_ref(classroom) if classroom else None
+        result.append(data)
+    return result
+
+
+def serialize_grades(grades, include_relationships=True, fields=None, include=None):
+    """Same as [grade.to_dict(include_relationships) for grade in grades]"""
+    getters = _GRADES.getters(fields)
+    included = _GRADES.included(include, include_relationships)
+    students, evaluations, subjects = {}, {}, {}
+    if 'student' in included:
+        students = _student_dicts(g.student_id for g in grades)
+    if 'evaluation' in included:
+        evaluations = _by_id(_fetch(
+            db.session.query(Evaluation.id, Evaluation.name, Evaluation.max_points),
+            Evaluation.id, [g.evaluation_id for g in grades]
+        ))
+    if 'subject' in included:
+        subjects = _subject_dicts(g.subject_id for g in grades)
+
+    result = []
+    for grade in grades:
+        data = _scalars(grade, getters)
+        if 'student' in included:
+            data['student'] = students.get(grade.student_id)
+        if 'evaluation' in included:
+            evaluation = evaluations.get(grade.evaluation_id)
+            data['evaluation'] = {
+                'id': evaluation.id,
+                'name': evaluation.name,
+                'max_points': float(evaluation.max_points)
+            } if evaluation else None
+        if 'subject' in included:
+            data['subject'] = subjects.get(grade.subject_id)
+        result.append(data)
+    return result
+
+
+def serialize_report_cards(reports, fields=None, include=None):
+    """Same as [report.to_dict() for report in reports]"""
+    getters = _REPORT_CARDS.getters(fields)
+    included = _REPORT_CARDS.included(include, True)
+    students, periods = {}, {}
+    if 'student' in included:
+        students = _student_dicts(r.student_id for r in reports)
+    if 'evaluation_period' in included:
+        periods = _by_id(_fetch(db.session.query(*_PERIOD_COLUMNS), EvaluationPeriod.id,
+                                [r.evaluation_period_id for r in reports]))
+        periods = {period.id: data for period, data in zip(periods.values(), serialize_evaluation_periods(list(periods.values())))}
+
+    result = []
+    for report in reports:
+        data = _scalars(report, getters)
+        if 'student' in included:
+            data['student'] = students.get(report.student_id)
+        if 'evaluation_period' in included:
+            data['evaluation_period'] = periods.get(report.evaluation_period_id)
+        result.append(data)
+    return result
+
+
+def serialize_evaluation_periods(periods, fields=None, include=None):
+    """Same as [period.to_dict() for period in periods]"""
+    getters = _PERIODS.getters(fields)
+    period_ids = [p.id for p in periods]
+    counts = {}
+    if _PERIODS.wants(fields, 'evaluations_count'):
+        counts['evaluations_count'] = _counts(Evaluation.evaluation_period_id, period_ids)
+    if _PERIODS.wants(fields, 'report_cards_count'):
+        counts['report_cards_count'] = _counts(ReportCard.evaluation_period_id, period_ids)
+
+    result = []
+    for period in periods:
+        data = _scalars(period, getters)
+        for name, by_period in counts.items():
+            data[name] = by_period.get(period.id, 0)
+        result.append(data)
+    return result
+
+
+def serialize_attendances(attendances, fields=None, include=None):
+    """Same as [attendance.to_dict() for attendance in attendances]"""
+    getters = _ATTENDANCES.getters(fields)
+    return [_scalars(attendance, getters) for attendance in attendances]
+
+
+_SCHEMAS = {
+    serialize_users: _USERS,
+    serialize_students: _STUDENTS,
+    serialize_teachers: _TEACHERS,
+    serialize_classrooms: _CLASSROOMS,
+    serialize_assignments: _ASSIGNMENTS,
+    serialize_grades: _GRADES,
+    serialize_report_cards: _REPORT_CARDS,
+    serialize_evaluation_periods: _PERIODS,
+    serialize_attendances: _ATTENDANCES,
+}
+
+
+def _names(param):
+    if param not in request.args:
+        return None
+    return [name.strip() for name in request.args[param].split(',') if name.strip()]
+
+
+def sparse(query, serialize, keys=()):
+    """Apply ?fields= and ?include= to a list query and its serializer.
+
+    Returns (query, serialize) unchanged when neither parameter is given.
+    ``?include=`` with no value drops every related object. keys are columns
+    the caller reads from the rows besides what is serialized (pagination
+    keys). Raises InvalidFieldset for names the serializer does not know.
+    """
+    schema = _SCHEMAS.get(serialize)
+    fields, include = _names('fields'), _names('include')
+    if schema is None or (fields is None and include is None):
+        return query, serialize
+
+    schema.validate(fields, include)
+    if fields is not None:
+        included = schema.included(include, True)
+        query = query.options(load_only(*schema.columns(fields, included, keys)))
+    return query, partial(serialize, fields=fields, include=include)
@@ -0,0 +1,47 @@
+# app/utils/streaming.py
+"""Streaming JSON array responses for list endpoints.
+
+``stream_list(query, serialize)`` returns the same JSON array as
+``jsonify(serialize(query.all()))`` but never holds the whole result: rows
+come from a server-side cursor (``yield_per``) STREAM_BATCH_SIZE at a time,
+each batch is serialized and written out before the next one is fetched.
+Memory stays bounded by one batch and the first bytes leave as soon as the
+first batch is ready. Errors after the first byte can no longer change the
+status code; the client sees a truncated array and the error is logged.
+"""
+from flask import Response, current_app, stream_with_context
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def stream_list(query, serialize, batch_size=None):
+    batch_size = batch_size or current_app.config.get('STREAM_BATCH_SIZE', 1000)
+    dumps = current_app.json.dumps
+
+    def generate():
+        yield '['
+        first = True
+        try:
+            for batch in _batches(query.yield_per(batch_size), batch_size):
+                chunk = ','.join(dumps(item, separators=(',', ':')) for item in serialize(batch))
+                if chunk:
+                    yield chunk if first else ',' + chunk
+                    first = False
+        except Exception as e:
+            logger.error(f"Streaming response aborted: {str(e)}")
+            raise
+        yield ']\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
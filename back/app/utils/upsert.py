@@ -0,0 +1,47 @@
+# app/utils/upsert.py
+"""Set-based INSERT ... ON CONFLICT DO UPDATE.
+
+PostgreSQL and SQLite (3.24+) share the syntax; SQLAlchemy only exposes it
+through each dialect's own ``insert``, so ``upsert`` picks the right one for
+the connection. Rows are passed as executemany parameters rather than baked
+into a VALUES list: the statement compiles once and stays cached whatever the
+row count, and the driver (insertmanyvalues on PostgreSQL) batches the rows.
+The conflict target must be a primary key or unique constraint, and one call
+should not carry the same key twice, so callers deduplicate their rows first.
+"""
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+
+_DIALECTS = {'postgresql': postgresql, 'sqlite': sqlite}
+
+
+def supports_upsert(dialect_name):
+    return dialect_name in _DIALECTS
+
+
+def upsert_statement(dialect_name, table, keys, update=(), increment=(), coalesce=()):
+    """``update`` lists the columns overwritten from the incoming row, or maps
+    column names to expressions; ``increment`` lists counter columns the
+    incoming value is added to; ``coalesce`` lists columns overwritten only
+    when the incoming value is not null. With none of them, rows whose keys
+    already exist are left as they are (ON CONFLICT DO NOTHING)"""
+    if not supports_upsert(dialect_name):
+        raise NotImplementedError(f'Upsert is not supported on {dialect_name}')
+    statement = _DIALECTS[dialect_name].insert(table)
+    if not isinstance(update, dict):
+        update = {name: statement.excluded[name] for name in update}
+    for name in increment:
+        update[name] = table.c[name] + statement.excluded[name]
+    for name in coalesce:
+        update[name] = func.coalesce(statement.excluded[name], table.c[name])
+    if not update:
+        return statement.on_conflict_do_nothing(index_elements=keys)
+    return statement.on_conflict_do_update(index_elements=keys, set_=update)
+
+
+def upsert(session, table, rows, keys, update=(), increment=(), coalesce=()):
+    """Insert rows, updating the ones whose keys already exist; returns the row count"""
+    if rows:
+        statement = upsert_statement(session.get_bind().dialect.name, table, keys, update, increment, coalesce)
+        session.execute(statement, rows)
+    return len(rows)
@@ -0,0 +1,92 @@
+# benchmarks/bench_attendance_summary.py
+"""Per-student status counts over a date range: row scan vs. bitsets.
+
+Run from back/:  python benchmarks/bench_attendance_summary.py --sizes 40 400 2000 --days 90
+
+For each size one classroom is seeded with a full term of attendance. The
+same counts (days present/absent/late/excused per student between two dates
+of the period) are computed with a GROUP BY over attendances and with
+AttendanceBitmapService.classroom_summary, checked to be equal, and timed
+over a few ranges: the whole term, its last month and a single week. The
+month starts before the term when --days is under 30, and the last range
+lies past the recorded days, so both ends of the bitsets are exercised.
+"""
+import argparse
+import statistics
+import time
+from datetime import timedelta
+
+from common import make_app, reset_schema, seed, seed_activity
+
+
+def scan(classroom_id, start_date, end_date):
+    from app import db
+    from app.models import Attendance, Student
+
+    rows = db.session.query(
+        Attendance.student_id, db.func.lower(Attendance.status), db.func.count()
+    ).join(Student, Attendance.student_id == Student.id).filter(
+        Student.classroom_id == classroom_id,
+        Student.is_enrolled == True,
+        Attendance.date.between(start_date, end_date)
+    ).group_by(Attendance.student_id, db.func.lower(Attendance.status)).all()
+    counts = {}
+    for student_id, status, count in rows:
+        counts.setdefault(student_id, {})[status] = count
+    return counts
+
+
+def median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, result
+
+
+def run(size, days, repeat):
+    from app import db
+    from app.models import EvaluationPeriod
+    from app.services.AttendanceBitmapService import AttendanceBitmapService
+
+    app = make_app()
+    reset_schema(app)
+    ids = seed(app, classrooms=1, students_per_classroom=size, teachers=1)
+    period_id = seed_activity(app, ids, evaluations_per_classroom=1, attendance_days=days)
+    classroom_id = ids['classroom_ids'][0]
+
+    with app.app_context():
+        db.session.execute(db.text('ANALYZE'))
+        period = db.session.get(EvaluationPeriod, period_id)
+        last_day = period.start_date + timedelta(days=days - 1)
+        ranges = (('term', period.start_date, last_day),
+                  ('month', last_day - timedelta(days=29), last_day),
+                  ('week', last_day - timedelta(days=6), last_day),
+                  ('after', last_day + timedelta(days=1), last_day + timedelta(days=7)))
+        for label, start_date, end_date in ranges:
+            scan_ms, expected = median_ms(lambda: scan(classroom_id, start_date, end_date), repeat)
+            bitmap_ms, summary = median_ms(
+                lambda: AttendanceBitmapService.classroom_summary(classroom_id, period, start_date, end_date), repeat)
+            for row in summary:
+                counts = expected.get(row['student_id'], {})
+                assert all(row[status] == counts.get(status, 0) for status in ('present', 'absent', 'late', 'excused')), row
+            print(f'{size:>5} students, {label:<5}: scan {scan_ms:8.2f} ms  bitsets {bitmap_ms:7.2f} ms  '
+                  f'x{scan_ms / max(bitmap_ms, 1e-6):.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[40, 400, 2000])
+    parser.add_argument('--days', type=int, default=90, help='days of attendance (at most 91)')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    import logging
+    logging.getLogger('app').setLevel(logging.ERROR)
+    for size in args.sizes:
+        run(size, args.days, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_averages.py
+"""Period averages for a whole school: per-student queries vs. one grouped query.
+
+Run from back/:  python benchmarks/bench_averages.py --classrooms 500 --students 40 --evaluations 10
+
+Seeds classrooms x students (20k with the defaults) and their grades, then
+computes every student's subject and overall averages twice: once the way
+report cards used to, with one grades query per student and the arithmetic
+in Python, and once with AverageService.averages for the whole school. Both
+must agree to the cent. Reports wall time and SQL statements for each.
+"""
+import argparse
+import time
+
+from common import make_app, reset_schema, seed, seed_activity, QueryCounter
+
+
+def per_student(period_id, student_ids):
+    """The per-row baseline: one query per student, weighted averages in Python"""
+    from app import db
+    from app.models import Grade, Evaluation
+
+    result = {}
+    for student_id in student_ids:
+        subjects = {}
+        grades = Grade.query.join(Evaluation).options(
+            db.contains_eager(Grade.evaluation).joinedload(Evaluation.evaluation_type),
+            db.contains_eager(Grade.evaluation).joinedload(Evaluation.subject)
+        ).filter(Grade.student_id == student_id, Evaluation.evaluation_period_id == period_id)
+        for grade in grades:
+            evaluation = grade.evaluation
+            if grade.is_excused:
+                continue
+            weight = (evaluation.weight or 1.0) * (evaluation.evaluation_type.default_weight or 1.0)
+            totals = subjects.setdefault(evaluation.subject_id, [0.0, 0.0, evaluation.subject.coefficient or 1])
+            totals[0] += float(grade.points_earned) * 20 / float(evaluation.max_points or 20) * weight
+            totals[1] += weight
+        counted = [(total / weight, coefficient) for total, weight, coefficient in subjects.values() if weight]
+        if counted:
+            result[student_id] = sum(a * c for a, c in counted) / sum(c for _, c in counted)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--classrooms', type=int, default=500)
+    parser.add_argument('--students', type=int, default=40)
+    parser.add_argument('--evaluations', type=int, default=10)
+    args = parser.parse_args()
+
+    import logging
+    logging.getLogger('app').setLevel(logging.ERROR)
+    from app import db
+    from app.models import Grade, Student
+    from app.services.AverageService import AverageService
+
+    app = make_app()
+    reset_schema(app)
+    ids = seed(app, classrooms=args.classrooms, students_per_classroom=args.students, teachers=args.classrooms)
+    period_id = seed_activity(app, ids, evaluations_per_classroom=args.evaluations, attendance_days=1)
+
+    with app.app_context():
+        student_ids = [row[0] for row in db.session.query(Student.id)]
+        total = db.session.query(db.func.count(Grade.id)).scalar()
+        print(f'{len(student_ids)} students, {total} grades')
+
+        with QueryCounter(db.engine) as queries:
+            start = time.perf_counter()
+            expected = per_student(period_id, student_ids)
+            elapsed = time.perf_counter() - start
+        print(f'per student      : {elapsed:7.2f} s  {queries.count:6d} queries')
+        db.session.expunge_all()
+
+        with QueryCounter(db.engine) as queries:
+            start = time.perf_counter()
+            averages = AverageService.averages(period_id)
+            elapsed = time.perf_counter() - start
+        print(f'grouped query    : {elapsed:7.2f} s  {queries.count:6d} queries')
+
+        assert {s: round(a['overall'], 2) for s, a in averages.items() if a['overall'] is not None} == \
+            {s: round(a, 2) for s, a in expected.items()}, 'averages differ'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/bench_bulk_grades.py
+"""Grading a whole evaluation: one POST /api/grades per student vs. one bulk request.
+
+Run from back/:  python benchmarks/bench_bulk_grades.py --sizes 10 40 160 640 --repeat 5
+
+For each size one classroom with one evaluation is seeded. Its grades are
+entered with one POST /api/grades per student, then, after clearing them,
+with a single POST /api/grades/bulk, and once more with the bulk request to
+time updates of existing grades. Reports the wall time and SQL statements
+for the whole class; the bulk request's count should not grow with it.
+"""
+import argparse
+import statistics
+import time
+
+from common import make_app, reset_schema, seed, seed_activity, login, QueryCounter
+
+
+def clear_grades(app):
+    from app import db
+    from app.models import Grade
+
+    with app.app_context():
+        db.session.execute(db.delete(Grade))
+        db.session.commit()
+
+
+def run(size, repeat):
+    from app import db
+    from app.models import Evaluation, Student
+    from app.services.AccessService import AccessService
+    from app.services.PrincipalService import PrincipalService
+
+    app = make_app()
+    reset_schema(app)
+    PrincipalService.clear()
+    AccessService.invalidate()
+    ids = seed(app, classrooms=1, students_per_classroom=size, teachers=1)
+    seed_activity(app, ids, evaluations_per_classroom=1, attendance_days=1)
+    with app.app_context():
+        evaluation = db.session.query(Evaluation).one()
+        evaluation_id, subject_id, period_id = evaluation.id, evaluation.subject_id, evaluation.evaluation_period_id
+        student_ids = [row.id for row in db.session.query(Student.id).order_by(Student.id)]
+        engine = db.engine
+
+    client = app.test_client()
+    headers = login(client, 'admin@bench.local')
+    timings = {'per student': [], 'bulk insert': [], 'bulk update': []}
+    queries = {}
+
+    def timed(label, requests):
+        with QueryCounter(engine) as counter:
+            start = time.perf_counter()
+            for path, body in requests:
+                response = client.post(path, json=body, headers=headers)
+                assert response.status_code in (200, 201), response.get_data(as_text=True)
+            timings[label].append(time.perf_counter() - start)
+        queries[label] = counter.count
+
+    for run_index in range(repeat):
+        points = [(student_id + run_index) % 21 for student_id in student_ids]
+        clear_grades(app)
+        timed('per student', [('/api/grades/', {
+            'student_id': student_id, 'subject_id': subject_id, 'evaluation_period_id': period_id,
+            'evaluation_id': evaluation_id, 'grade': point, 'max_grade': 20,
+        }) for student_id, point in zip(student_ids, points)])
+
+        clear_grades(app)
+        bulk = {'evaluation_id': evaluation_id,
+                'grades': [{'student_id': student_id, 'points': point} for student_id, point in zip(student_ids, points)]}
+        timed('bulk insert', [('/api/grades/bulk', bulk)])
+        timed('bulk update', [('/api/grades/bulk', bulk)])
+
+    for label, values in timings.items():
+        print(f'{size:>5} students, {label:<11}: {statistics.median(values) * 1000:8.1f} ms  '
+              f'{queries[label]:>5} queries')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 40, 160, 640])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    import logging
+    logging.getLogger('app').setLevel(logging.ERROR)
+    for size in args.sizes:
+        run(size, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
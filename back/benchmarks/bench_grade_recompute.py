@@ -0,0 +1,86 @@
+# benchmarks/bench_grade_recompute.py
+"""Regrading every grade after a grading scale change: ORM loop vs. NumPy.
+
+Run from back/:  python benchmarks/bench_grade_recompute.py --classrooms 50 --students 40 --evaluations 100
+
+Seeds classrooms x students x evaluations grades (200k with the defaults),
+then changes the default scale and regrades everything twice: once by
+loading Grade objects and computing each row in Python, and once with
+GradingScaleService.recompute. Both must end with the same percentages and
+letters. A second recompute with nothing to change is timed as well.
+"""
+import argparse
+import time
+
+from common import make_app, reset_schema, seed, seed_activity
+
+
+def orm_loop(bands):
+    """The per-row baseline: every grade loaded, graded and flushed as an object"""
+    from app import db
+    from app.models import Grade
+
+    ordered = sorted(bands, key=lambda band: -band[1])
+    for grade in Grade.query.options(db.joinedload(Grade.evaluation)).yield_per(1000):
+        possible = float(grade.evaluation.max_points or 20)
+        percentage = round(float(grade.points_earned) * 100 / possible, 2) if possible else 0
+        letter = next((letter for letter, minimum in ordered if percentage >= minimum), ordered[-1][0])
+        grade.points_possible, grade.percentage, grade.letter_grade = possible, percentage, letter
+    db.session.flush()
+
+
+def snapshot():
+    from app import db
+    from app.models import Grade
+
+    return dict(db.session.query(Grade.id, db.func.coalesce(Grade.letter_grade, '')).all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--classrooms', type=int, default=50)
+    parser.add_argument('--students', type=int, default=40)
+    parser.add_argument('--evaluations', type=int, default=100)
+    parser.add_argument('--skip-orm', action='store_true', help='only time the NumPy path')
+    args = parser.parse_args()
+
+    import logging
+    logging.getLogger('app').setLevel(logging.ERROR)
+    from app import db
+    from app.models import Grade, GradingScale
+    from app.services.GradingScaleService import GradingScaleService
+
+    app = make_app()
+    reset_schema(app)
+    ids = seed(app, classrooms=args.classrooms, students_per_classroom=args.students, teachers=args.classrooms)
+    seed_activity(app, ids, evaluations_per_classroom=args.evaluations, attendance_days=1)
+    bands = [('A+', 95), ('A', 85), ('B', 70), ('C', 55), ('D', 40), ('E', 0)]
+
+    with app.app_context():
+        total = db.session.query(db.func.count(Grade.id)).scalar()
+        print(f'{total} grades')
+
+        expected = None
+        if not args.skip_orm:
+            start = time.perf_counter()
+            orm_loop(bands)
+            print(f'ORM loop         : {time.perf_counter() - start:7.2f} s')
+            expected = snapshot()
+            db.session.rollback()
+
+        scale = GradingScale()
+        start = time.perf_counter()
+        regraded = GradingScaleService.save(scale, {'name': 'Bench', 'bands': [
+            {'letter': letter, 'min_percentage': minimum} for letter, minimum in bands]})
+        print(f'NumPy recompute  : {time.perf_counter() - start:7.2f} s  ({regraded} changed)')
+        if expected is not None:
+            assert snapshot() == expected, 'NumPy and ORM results differ'
+
+        start = time.perf_counter()
+        regraded = GradingScaleService.recompute()
+        print(f'unchanged rerun  : {time.perf_counter() - start:7.2f} s  ({regraded} changed)')
+        db.session.rollback()
+
+
+if __name__ == '__main__':
+    main()
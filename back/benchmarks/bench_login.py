@@ -0,0 +1,64 @@
+# benchmarks/bench_login.py
+"""Login throughput under concurrent clients.
+
+Run from back/:  python benchmarks/bench_login.py --clients 1 4 16 --logins 20
+
+Each client is a thread with its own test client logging in repeatedly as a
+different teacher. Reports logins/sec, p50/p99 latency and how many attempts
+were shed with 503 by the password pool.
+"""
+import argparse
+import threading
+import time
+
+from common import make_app, reset_schema, seed, percentile
+
+
+def run(app, clients, logins):
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def client_loop(index):
+        client = app.test_client()
+        email = f'teacher{index}@bench.local'
+        for _ in range(logins):
+            start = time.perf_counter()
+            response = client.post('/api/auth/login', json={'email': email, 'password': 'secret'})
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    threads = [threading.Thread(target=client_loop, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    ok = statuses.get(200, 0)
+    print(f'{clients:>3} clients: {ok / wall:7.1f} logins/s  '
+          f'p50 {percentile(latencies, 50) * 1000:7.1f} ms  '
+          f'p99 {percentile(latencies, 99) * 1000:7.1f} ms  statuses {statuses}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--logins', type=int, default=10, help='logins per client')
+    args = parser.parse_args()
+
+    app = make_app(AUDIT_FLUSH_INTERVAL=0.5)
+    reset_schema(app)
+    seed(app, classrooms=2, students_per_classroom=1, teachers=max(args.clients))
+
+    import logging
+    logging.getLogger('app').setLevel(logging.ERROR)
+    for clients in args.clients:
+        run(app, clients, args.logins)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# benchmarks/bench_principal.py
+"""Per-request query count on /api/students/my-students.
+
+Run from back/:  python benchmarks/bench_principal.py
+
+Prints the number of SQL statements for a cold request (principal cache miss)
+and for warm requests (cache hit). Run it on an older checkout to get the
+"before" numbers; the script only relies on create_app and the models.
+"""
+import argparse
+
+from common import make_app, reset_schema, seed, login, QueryCounter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--classrooms', type=int, default=4)
+    parser.add_argument('--students', type=int, default=30, help='students per classroom')
+    parser.add_argument('--requests', type=int, default=5)
+    args = parser.parse_args()
+
+    app = make_app()
+    reset_schema(app)
+    seed(app, classrooms=args.classrooms, students_per_classroom=args.students, teachers=args.classrooms)
+
+    from app import db
+    client = app.test_client()
+    headers = login(client, 'teacher0@bench.local')
+
+    with app.app_context():
+        engine = db.engine
+
+    counts = []
+    for _ in range(args.requests):
+        # Lists are streamed: their queries run while the body is read
+        with QueryCounter(engine) as counter:
+            response = client.get('/api/students/my-students', headers=headers)
+            payload = response.get_json()
+        assert response.status_code == 200, response.get_data(as_text=True)
+        counts.append(counter.count)
+
+    rows = len(payload)
+    print(f'/api/students/my-students returned {rows} students')
+    print(f'queries on first request: {counts[0]}')
+    print(f'queries on later requests: {counts[1:]}')
+
+
+if __name__ == '__main__':
+    main()
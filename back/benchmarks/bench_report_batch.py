@@ -0,0 +1,82 @@
+# benchmarks/bench_report_batch.py
+"""End-of-term report cards: one request per student vs. per classroom vs. one for the school.
+
+Run from back/:  python benchmarks/bench_report_batch.py --classrooms 50 --students 40 --evaluations 10
+
+Seeds classrooms x students with graded evaluations, then generates every
+report card three ways as the admin: one POST /api/reports/generate per
+student, one POST /api/reports/generate/classroom per classroom, and a single
+POST /api/reports/generate/school. Reports wall time, SQL statements and
+report cards per second for each; the batches must agree on every rank.
+"""
+import argparse
+import time
+
+from common import make_app, reset_schema, seed, seed_activity, login, QueryCounter
+
+
+def snapshot(app):
+    from app import db
+    from app.models import ReportCard
+
+    with app.app_context():
+        return {row[0]: row[1:] for row in db.session.query(
+            ReportCard.student_id, ReportCard.overall_average, ReportCard.class_rank, ReportCard.total_students
+        )}
+
+
+def timed(app, label, count, calls):
+    from app import db
+
+    with app.app_context():
+        engine = db.engine
+    with QueryCounter(engine) as queries:
+        start = time.perf_counter()
+        for call in calls:
+            response = call()
+            assert response.status_code in (201, 400), response.get_data(as_text=True)
+        elapsed = time.perf_counter() - start
+    print(f'{label:<14}: {elapsed:7.2f} s  {queries.count:7d} queries  {count / elapsed:8.0f} report cards/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--classrooms', type=int, default=50)
+    parser.add_argument('--students', type=int, default=40)
+    parser.add_argument('--evaluations', type=int, default=10)
+    args = parser.parse_args()
+
+    import logging
+    logging.getLogger('app').setLevel(logging.ERROR)
+    from app import db
+    from app.models import Student
+
+    app = make_app()
+    reset_schema(app)
+    ids = seed(app, classrooms=args.classrooms, students_per_classroom=args.students, teachers=args.classrooms)
+    period_id = seed_activity(app, ids, evaluations_per_classroom=args.evaluations, attendance_days=1)
+    with app.app_context():
+        student_ids = [row[0] for row in db.session.query(Student.id).order_by(Student.id)]
+    client = app.test_client()
+    headers = login(client, 'admin@bench.local')
+    print(f'{len(student_ids)} students')
+
+    timed(app, 'per student', len(student_ids), [
+        lambda student_id=student_id: client.post(f'/api/reports/generate/{student_id}/{period_id}',
+                                                  headers=headers, json={})
+        for student_id in student_ids])
+    per_student = snapshot(app)
+
+    timed(app, 'per classroom', len(student_ids), [
+        lambda classroom_id=classroom_id: client.post(f'/api/reports/generate/classroom/{classroom_id}/{period_id}',
+                                                      headers=headers, json={})
+        for classroom_id in ids['classroom_ids']])
+    per_classroom = snapshot(app)
+
+    timed(app, 'school', len(student_ids), [
+        lambda: client.post(f'/api/reports/generate/school/{period_id}', headers=headers, json={})])
+    assert snapshot(app) == per_classroom == per_student, 'report cards differ'
+
+
+if __name__ == '__main__':
+    main()
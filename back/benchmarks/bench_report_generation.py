@@ -0,0 +1,61 @@
+# benchmarks/bench_report_generation.py
+"""School-wide report cards and PDFs with 1..N worker processes.
+
+Run from back/:  python benchmarks/bench_report_generation.py --classrooms 500 --students 40 --workers 1 2 4 8
+
+Seeds classrooms x students (20k with the defaults) with graded
+evaluations, then runs ReportService.generate_all (what `flask reports
+generate-all` does) once per worker count, each time as a fresh run that
+rewrites every report card and renders every PDF into a temporary
+directory. Reports wall time, report cards per second and the speedup over
+one worker. Speedup is bounded by the number of CPUs, and on SQLite by its
+single writer; use BENCH_DATABASE_URL with PostgreSQL for production-like
+numbers.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+from common import make_app, reset_schema, seed, seed_activity
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--classrooms', type=int, default=500)
+    parser.add_argument('--students', type=int, default=40)
+    parser.add_argument('--evaluations', type=int, default=10)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument('--no-pdf', action='store_true', help='only write the report cards')
+    args = parser.parse_args()
+
+    import logging
+    logging.getLogger('app').setLevel(logging.ERROR)
+    # Worker processes build their own app from the environment, so they see the same directory
+    reports_dir = tempfile.mkdtemp(prefix='school_bench_reports_')
+    os.environ['REPORTS_DIR'] = reports_dir
+    from app.services.ReportService import ReportService
+
+    app = make_app()
+    reset_schema(app)
+    ids = seed(app, classrooms=args.classrooms, students_per_classroom=args.students, teachers=args.classrooms)
+    period_id = seed_activity(app, ids, evaluations_per_classroom=args.evaluations, attendance_days=1)
+    print(f'{args.classrooms * args.students} students, {os.cpu_count()} CPUs')
+
+    baseline = None
+    try:
+        with app.app_context():
+            for workers in args.workers:
+                summary = ReportService.generate_all(period_id, workers, render_pdfs=not args.no_pdf)
+                assert not summary['failed'], f"failed classrooms: {summary['failed']}"
+                seconds = summary['seconds']
+                baseline = baseline or seconds
+                print(f"{workers:2d} worker(s): {seconds:7.2f} s  {summary['written'] / seconds:7.0f} report cards/s  "
+                      f"{summary['pdfs']:6d} PDFs  x{baseline / seconds:.2f}")
+    finally:
+        shutil.rmtree(reports_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_roll_call.py
+"""Roll-call latency and query count against class size.
+
+Run from back/:  python benchmarks/bench_roll_call.py --sizes 10 40 160 640 --calls 20
+
+For each size a single classroom is seeded and POST /api/attendance is
+called repeatedly for the same day with alternating statuses, so every call
+after the first updates existing rows. Reports p50/p99 latency and the SQL
+statements per call, which should not grow with the class.
+"""
+import argparse
+import time
+
+from common import make_app, reset_schema, seed, login, percentile, QueryCounter
+
+
+def run(size, calls):
+    from app import db
+    from app.models import Student
+    from app.services.AccessService import AccessService
+    from app.services.PrincipalService import PrincipalService
+
+    app = make_app()
+    reset_schema(app)
+    PrincipalService.clear()
+    AccessService.invalidate()
+    ids = seed(app, classrooms=1, students_per_classroom=size, teachers=1)
+    classroom_id = ids['classroom_ids'][0]
+    with app.app_context():
+        student_ids = [row.id for row in db.session.query(Student.id).filter_by(classroom_id=classroom_id)]
+        engine = db.engine
+
+    client = app.test_client()
+    headers = login(client, 'admin@bench.local')
+    latencies = []
+    queries = 0
+    for call in range(calls):
+        status = ('present', 'absent')[call % 2]
+        body = {
+            'classroom_id': classroom_id, 'date': '2024-10-01',
+            'attendance_records': [{'student_id': student_id, 'status': status} for student_id in student_ids],
+        }
+        with QueryCounter(engine) as counter:
+            start = time.perf_counter()
+            response = client.post('/api/attendance/', json=body, headers=headers)
+            latencies.append(time.perf_counter() - start)
+        assert response.status_code == 201, response.get_data(as_text=True)
+        queries = counter.count
+
+    print(f'{size:>5} students: p50 {percentile(latencies, 50) * 1000:7.1f} ms  '
+          f'p99 {percentile(latencies, 99) * 1000:7.1f} ms  {queries} queries per call')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 40, 160, 640])
+    parser.add_argument('--calls', type=int, default=20)
+    args = parser.parse_args()
+
+    import logging
+    logging.getLogger('app').setLevel(logging.ERROR)
+    for size in args.sizes:
+        run(size, args.calls)
+
+
+if __name__ == '__main__':
+    main()
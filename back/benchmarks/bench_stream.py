@@ -0,0 +1,58 @@
+# benchmarks/bench_stream.py
+"""Peak memory and time-to-first-byte of a large list, streamed or not.
+
+Run from back/:  python benchmarks/bench_stream.py --students 500 --days 200
+
+Seeds students x days attendance records in two classrooms and fetches
+/api/attendance/teacher/<id> with STREAM_LISTS off and on. Peak memory is the
+tracemalloc peak while the response is produced and consumed.
+"""
+import argparse
+import time
+import tracemalloc
+
+from common import make_app, reset_schema, seed, seed_activity, login
+
+
+def fetch(app, client, headers, url, stream):
+    app.config['STREAM_LISTS'] = stream
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(url, headers=headers, buffered=False)
+    chunks = iter(response.response)
+    first = next(chunks)
+    ttfb = time.perf_counter() - start
+    size = len(first) + sum(len(chunk) for chunk in chunks)
+    total = time.perf_counter() - start
+    response.close()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return ttfb, total, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--students', type=int, default=250, help='students per classroom')
+    parser.add_argument('--days', type=int, default=100)
+    args = parser.parse_args()
+
+    app = make_app()
+    reset_schema(app)
+    ids = seed(app, classrooms=2, students_per_classroom=args.students, teachers=2)
+    seed_activity(app, ids, evaluations_per_classroom=1, attendance_days=args.days)
+
+    import logging
+    logging.getLogger('app').setLevel(logging.ERROR)
+
+    client = app.test_client()
+    headers = login(client, 'admin@bench.local')
+    url = f"/api/attendance/teacher/{ids['teacher_ids'][0]}"
+    rows = 2 * args.students * args.days
+    for stream in (False, True):
+        ttfb, total, peak, size = fetch(app, client, headers, url, stream)
+        print(f"{'streamed' if stream else 'buffered'}: {rows} rows, {size / 1e6:.1f} MB body, "
+              f"first byte {ttfb * 1000:.0f} ms, total {total * 1000:.0f} ms, peak memory {peak / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+# benchmarks/check_list_queries.py
+"""Query count of the list endpoints must not grow with the number of rows.
+
+Run from back/:  python benchmarks/check_list_queries.py
+
+Seeds a small and a larger school, calls every list endpoint on both and
+fails if any endpoint issues more SQL statements on the larger one. It also
+checks that the bulk serializers return exactly what ``to_dict`` returns.
+Exits non-zero on failure.
+"""
+import argparse
+import sys
+
+from common import make_app, reset_schema, seed, seed_activity, login, QueryCounter
+
+
+def endpoints(ids, period_id):
+    classroom_id = ids['classroom_ids'][0]
+    teacher_id = ids['teacher_ids'][0]
+    return [
+        ('admin', '/api/admin/teachers'),
+        ('admin', '/api/admin/classrooms'),
+        ('teacher', '/api/admin/classrooms'),
+        ('admin', '/api/admin/students'),
+        ('teacher', '/api/admin/students'),
+        ('admin', '/api/admin/assignments'),
+        ('admin', '/api/admin/users'),
+        ('admin', '/api/students/'),
+        ('admin', f'/api/students/classroom/{classroom_id}'),
+        ('teacher', '/api/students/my-assignments'),
+        ('teacher', '/api/students/my-classrooms'),
+        ('teacher', '/api/students/my-students'),
+        ('admin', '/api/grades/student/1'),
+        ('admin', f'/api/grades/classroom/{classroom_id}/period/{period_id}'),
+        ('admin', f'/api/grades/teacher/{teacher_id}'),
+        ('admin', f'/api/reports/classroom/{classroom_id}/period/{period_id}'),
+        ('admin', f'/api/reports/teacher/{teacher_id}/period/{period_id}'),
+        ('admin', f'/api/attendance/classroom/{classroom_id}?date=2024-09-02'),
+        ('admin', '/api/attendance/student/1'),
+        ('admin', f'/api/attendance/teacher/{teacher_id}'),
+    ]
+
+
+def measure(size):
+    """{(role, url): (status, rows, queries)} for a school of the given size"""
+    from app import db
+    from app.services.PrincipalService import PrincipalService
+    from app.services.AccessService import AccessService
+
+    app = make_app()
+    reset_schema(app)
+    PrincipalService.clear()
+    AccessService.invalidate()
+    ids = seed(app, classrooms=size, students_per_classroom=size * 2, teachers=size)
+    period_id = seed_activity(app, ids, evaluations_per_classroom=size)
+
+    client = app.test_client()
+    headers = {
+        'admin': login(client, 'admin@bench.local'),
+        'teacher': login(client, 'teacher0@bench.local'),
+    }
+    with app.app_context():
+        engine = db.engine
+
+    results = {}
+    for role, url in endpoints(ids, period_id):
+        client.get(url, headers=headers[role])  # warm the principal and access caches
+        # Lists are streamed: their queries run while the body is read
+        with QueryCounter(engine) as counter:
+            response = client.get(url, headers=headers[role])
+            payload = response.get_json()
+        rows = len(payload) if isinstance(payload, list) else sum(len(v) for v in payload.values())
+        results[(role, url)] = (response.status_code, rows, counter.count)
+    return app, results
+
+
+def check_shapes(app):
+    """Bulk serializers must match to_dict on the current database"""
+    from app.models import (User, Teacher, Student, Classroom, TeacherAssignment, Grade, ReportCard,
+                            Attendance, EvaluationPeriod)
+    from app.utils import serializers
+
+    cases = [
+        (User, serializers.serialize_users, lambda o: o.to_dict()),
+        (Teacher, serializers.serialize_teachers, lambda o: o.to_dict()),
+        (Student, serializers.serialize_students, lambda o: o.to_dict()),
+        (Classroom, serializers.serialize_classrooms, lambda o: o.to_dict()),
+        (TeacherAssignment, serializers.serialize_assignments, lambda o: o.to_dict()),
+        (Grade, serializers.serialize_grades, lambda o: o.to_dict()),
+        (ReportCard, serializers.serialize_report_cards, lambda o: o.to_dict()),
+        (Attendance, serializers.serialize_attendances, lambda o: o.to_dict()),
+        (EvaluationPeriod, serializers.serialize_evaluation_periods, lambda o: o.to_dict()),
+    ]
+    failures = []
+    with app.app_context():
+        for model, serialize, to_dict in cases:
+            rows = model.query.order_by(model.id).all()
+            if serialize(rows) != [to_dict(row) for row in rows]:
+                failures.append(model.__name__)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--small', type=int, default=2)
+    parser.add_argument('--large', type=int, default=6)
+    args = parser.parse_args()
+
+    import logging
+    logging.getLogger('app').setLevel(logging.ERROR)
+
+    _, small = measure(args.small)
+    app, large = measure(args.large)
+
+    failed = False
+    for key, (status, rows, queries) in large.items():
+        small_status, small_rows, small_queries = small[key]
+        ok = status == 200 and queries <= small_queries
+        failed |= not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {key[0]:<7} {key[1]:<45} "
+              f"rows {small_rows:>4} -> {rows:<5} queries {small_queries:>3} -> {queries:<3} status {status}")
+
+    mismatched = check_shapes(app)
+    for name in mismatched:
+        print(f'FAIL serializer output differs from {name}.to_dict()')
+
+    sys.exit(1 if failed or mismatched else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+# benchmarks/common.py
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run against ``BENCH_DATABASE_URL`` (a throwaway SQLite file by
+default). Point it at a scratch PostgreSQL database for numbers that match
+production; never point it at a real school database, the schema is dropped.
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_URL = 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'school_bench.db')
+
+
+def make_app(**config):
+    """Create the Flask app bound to the benchmark database"""
+    os.environ['DATABASE_URL'] = os.environ.get('BENCH_DATABASE_URL', DEFAULT_URL)
+    from app import create_app
+    app = create_app()
+    app.config.update(config)
+    return app
+
+
+def reset_schema(app):
+    from app import db
+    from app import models  # noqa: F401 - register every table on the metadata
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+
+def seed(app, classrooms=10, students_per_classroom=40, teachers=20, subjects=8):
+    """Bulk-insert a synthetic school; returns ids useful to the benchmarks.
+
+    Every user's password is ``secret``. Teacher ``i`` is head of classroom
+    ``i`` (when it exists) and teaches two subjects in two classrooms.
+    """
+    from app import db
+    from app.models import User, Teacher, Student, Classroom, Subject, TeacherAssignment
+    from werkzeug.security import generate_password_hash
+
+    password_hash = generate_password_hash('secret', method='scrypt')
+    with app.app_context():
+        db.session.execute(db.insert(User), [{
+            'email': 'admin@bench.local', 'password_hash': password_hash,
+            'first_name': 'Admin', 'last_name': 'Bench', 'role': 'admin', 'is_active': True,
+        }])
+        db.session.execute(db.insert(User), [{
+            'email': f'teacher{i}@bench.local', 'password_hash': password_hash,
+            'first_name': 'Teacher', 'last_name': str(i), 'role': 'teacher', 'is_active': True,
+        } for i in range(teachers)])
+        teacher_user_ids = [row.id for row in db.session.query(User.id).filter(User.role == 'teacher').order_by(User.id)]
+        db.session.execute(db.insert(Teacher), [{
+            'user_id': user_id, 'employee_number': f'EMP{i:05d}', 'is_head_teacher': i < classrooms,
+        } for i, user_id in enumerate(teacher_user_ids)])
+        teacher_ids = [row.id for row in db.session.query(Teacher.id).order_by(Teacher.id)]
+
+        db.session.execute(db.insert(Classroom), [{
+            'name': f'Class {i}', 'level': f'Form {i % 5 + 1}', 'academic_year': '2024-2025',
+            'head_teacher_id': teacher_ids[i] if i < len(teacher_ids) else None, 'max_students': students_per_classroom,
+        } for i in range(classrooms)])
+        classroom_ids = [row.id for row in db.session.query(Classroom.id).order_by(Classroom.id)]
+
+        db.session.execute(db.insert(Subject), [{
+            'name': f'Subject {i}', 'code': f'SUB{i}', 'coefficient': i % 4 + 1,
+        } for i in range(subjects)])
+        subject_ids = [row.id for row in db.session.query(Subject.id).order_by(Subject.id)]
+
+        assignments = []
+        for i, teacher_id in enumerate(teacher_ids):
+            for k in range(2):
+                assignments.append({
+                    'teacher_id': teacher_id,
+                    'subject_id': subject_ids[(i + k) % len(subject_ids)],
+                    'classroom_id': classroom_ids[(i + k) % len(classroom_ids)],
+                    'academic_year': '2024-2025', 'is_active': True,
+                })
+        db.session.execute(db.insert(TeacherAssignment), assignments)
+
+        total = classrooms * students_per_classroom
+        db.session.execute(db.insert(User), [{
+            'email': f'student{i}@bench.local', 'password_hash': password_hash,
+            'first_name': 'Student', 'last_name': str(i), 'role': 'student', 'is_active': True,
+        } for i in range(total)])
+        student_user_ids = [row.id for row in db.session.query(User.id).filter(User.role == 'student').order_by(User.id)]
+        db.session.execute(db.insert(Student), [{
+            'user_id': user_id, 'student_number': f'STU{i:07d}',
+            'classroom_id': classroom_ids[i // students_per_classroom],
+            'enrollment_date': date(2024, 9, 1), 'is_enrolled': True,
+        } for i, user_id in enumerate(student_user_ids)])
+        db.session.commit()
+
+        return {
+            'teacher_ids': teacher_ids,
+            'classroom_ids': classroom_ids,
+            'subject_ids': subject_ids,
+        }
+
+
+def seed_activity(app, ids, evaluations_per_classroom=2, attendance_days=5):
+    """Add one evaluation period with evaluations, grades, attendance and
+    report cards on top of ``seed``; returns the period id."""
+    from datetime import timedelta
+    from app import db
+    from app.models import (Student, EvaluationPeriod, EvaluationType, Evaluation, Grade,
+                            Attendance, ReportCard, TeacherAssignment, Teacher)
+
+    start = date(2024, 9, 2)
+    with app.app_context():
+        db.session.execute(db.insert(EvaluationPeriod), [{
+            'name': 'First Term', 'academic_year': '2024-2025',
+            'start_date': start, 'end_date': start + timedelta(days=90), 'is_active': True,
+        }])
+        period_id = db.session.query(EvaluationPeriod.id).scalar()
+        db.session.execute(db.insert(EvaluationType), [
+            {'name': 'Test', 'default_weight': 1.0},
+            {'name': 'Exam', 'default_weight': 2.0},
+        ])
+        type_ids = [row.id for row in db.session.query(EvaluationType.id).order_by(EvaluationType.id)]
+
+        assignments = db.session.query(
+            TeacherAssignment.teacher_id, TeacherAssignment.subject_id, TeacherAssignment.classroom_id
+        ).order_by(TeacherAssignment.id).all()
+        evaluations = []
+        for classroom_id in ids['classroom_ids']:
+            taught = [a for a in assignments if a.classroom_id == classroom_id] or assignments[:1]
+            for k in range(evaluations_per_classroom):
+                a = taught[k % len(taught)]
+                evaluations.append({
+                    'name': f'Evaluation {k}', 'evaluation_period_id': period_id,
+                    'evaluation_type_id': type_ids[k % len(type_ids)], 'subject_id': a.subject_id,
+                    'classroom_id': classroom_id, 'evaluation_date': start + timedelta(days=7 * (k + 1)),
+                    'created_by': a.teacher_id, 'max_points': 20, 'weight': 1.0, 'is_published': True,
+                })
+        if evaluations:
+            db.session.execute(db.insert(Evaluation), evaluations)
+        evaluation_rows = db.session.query(Evaluation.id, Evaluation.classroom_id, Evaluation.subject_id).all()
+
+        students = db.session.query(Student.id, Student.classroom_id).order_by(Student.id).all()
+        grades = []
+        for evaluation in evaluation_rows:
+            for student in students:
+                if student.classroom_id == evaluation.classroom_id:
+                    points = (student.id * 7 + evaluation.id * 3) % 21
+                    grades.append({
+                        'student_id': student.id, 'evaluation_id': evaluation.id,
+                        'subject_id': evaluation.subject_id, 'points_earned': points,
+                        'points_possible': 20, 'percentage': points * 5, 'is_excused': False,
+                    })
+        if grades:
+            db.session.execute(db.insert(Grade), grades)
+
+        recorder = db.session.query(Teacher.user_id).order_by(Teacher.id).first().user_id
+        statuses = ('present', 'present', 'present', 'absent', 'late')
+        attendance = [{
+            'student_id': student.id, 'classroom_id': student.classroom_id,
+            'date': start + timedelta(days=day), 'status': statuses[(student.id + day) % len(statuses)],
+            'recorded_by': recorder,
+        } for day in range(attendance_days) for student in students]
+        if attendance:
+            db.session.execute(db.insert(Attendance), attendance)
+
+        head_of = {classroom_id: ids['teacher_ids'][i % len(ids['teacher_ids'])]
+                   for i, classroom_id in enumerate(ids['classroom_ids'])}
+        db.session.execute(db.insert(ReportCard), [{
+            'student_id': student.id, 'evaluation_period_id': period_id,
+            'generated_by': head_of[student.classroom_id],
+        } for student in students])
+        # Attendance was bulk-inserted around AttendanceService, so derive the rollups
+        from app.services.AttendanceRollupService import AttendanceRollupService
+        AttendanceRollupService.rebuild()
+        db.session.commit()
+        # A live database has planner statistics; without them SQLite picks poor plans for bulk-loaded tables
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+        return period_id
+
+
+def login(client, email, password='secret'):
+    response = client.post('/api/auth/login', json={'email': email, 'password': password})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+class QueryCounter:
+    """Counts SQL statements sent to the engine while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        from sqlalchemy import event
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+
+@contextmanager
+def timed(label):
+    start = time.perf_counter()
+    yield
+    print(f'{label}: {(time.perf_counter() - start) * 1000:.1f} ms')
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
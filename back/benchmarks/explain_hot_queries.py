@@ -0,0 +1,163 @@
+# benchmarks/explain_hot_queries.py
+"""Plans and timings of the hot list queries without and with their indexes.
+
+Run from back/:  python benchmarks/explain_hot_queries.py --classrooms 40 --students 40 --days 60
+
+Seeds a large school, drops the indexes added by migration 5f2e8a1c9d47
+(the report card one has since become a unique constraint and stays),
+runs every query below and records its plan and median time, then creates
+the indexes again, runs ANALYZE and repeats. The queries are built with the
+same ORM expressions the routes use. On PostgreSQL the plan is
+``EXPLAIN ANALYZE``; SQLite has no ANALYZE variant, so it shows
+``EXPLAIN QUERY PLAN`` and the timing comes from running the query.
+"""
+import argparse
+import statistics
+import time
+
+from common import make_app, reset_schema, seed, seed_activity
+
+HOT_INDEXES = (
+    'ix_attendances_classroom_id_date',
+    'ix_grades_evaluation_id',
+    'ix_evaluations_evaluation_period_id_classroom_id',
+    'ix_evaluations_created_by',
+    'ix_students_classroom_id_enrolled',
+    'ix_teacher_subject_classroom_active',
+    'ix_students_user_id',
+    'ix_teachers_user_id',
+    'ix_classrooms_head_teacher_id',
+)
+
+# attendances (student_id, date), grades (student_id, evaluation_id) and
+# report_cards (student_id, evaluation_period_id) are served by these unique
+# constraints, which stay in place for both runs
+UNIQUE_CONSTRAINTS = (
+    'uq_attendances_student_id_date',
+    'uq_grades_student_id_evaluation_id',
+    'uq_report_cards_student_id_evaluation_period_id',
+)
+
+
+def hot_queries(ids, period_id):
+    """(label, query) pairs mirroring the filters of the list routes"""
+    from datetime import date
+    from app.models import Attendance, Grade, Evaluation, ReportCard, Student, Teacher, TeacherAssignment
+
+    classroom_id = ids['classroom_ids'][len(ids['classroom_ids']) // 2]
+    teacher_id = ids['teacher_ids'][len(ids['teacher_ids']) // 2]
+    student = Student.query.filter_by(classroom_id=classroom_id).order_by(Student.id).first()
+    teacher_user_id = Teacher.query.get(teacher_id).user_id
+    day = date(2024, 9, 2)
+
+    return [
+        ('attendance of a classroom on a day',
+         Attendance.query.filter_by(classroom_id=classroom_id, date=day).order_by(Attendance.id)),
+        ('attendance history of a student',
+         Attendance.query.filter_by(student_id=student.id).order_by(Attendance.date.desc(), Attendance.id.desc())),
+        ('teacher attendance page',
+         Attendance.query.filter(Attendance.classroom_id.in_([classroom_id]), Attendance.date >= day)
+         .order_by(Attendance.date.desc(), Attendance.id.desc()).limit(51)),
+        ('grades of a student in a period',
+         Grade.query.filter_by(student_id=student.id).join(Grade.evaluation)
+         .filter_by(evaluation_period_id=period_id).order_by(Grade.id)),
+        ('grades of a classroom in a period',
+         Grade.query.join(Student).join(Evaluation, Grade.evaluation_id == Evaluation.id).filter(
+             Student.classroom_id == classroom_id, Student.is_enrolled == True,
+             Evaluation.evaluation_period_id == period_id).order_by(Grade.id)),
+        ('grades entered by a teacher',
+         Grade.query.join(Evaluation, Grade.evaluation_id == Evaluation.id)
+         .filter(Evaluation.created_by == teacher_id).order_by(Grade.id).limit(51)),
+        ('report cards of a classroom',
+         ReportCard.query.join(Student).filter(
+             Student.classroom_id == classroom_id, Student.is_enrolled == True,
+             ReportCard.evaluation_period_id == period_id).order_by(ReportCard.id)),
+        ('report card of a student',
+         ReportCard.query.filter_by(student_id=student.id, evaluation_period_id=period_id)),
+        ('enrolled students of a classroom',
+         Student.query.filter_by(classroom_id=classroom_id, is_enrolled=True).order_by(Student.id)),
+        ('active assignments of a teacher',
+         TeacherAssignment.query.filter_by(teacher_id=teacher_id, is_active=True)),
+        ('teacher profile of a user',
+         Teacher.query.filter_by(user_id=teacher_user_id)),
+    ]
+
+
+def to_sql(query, dialect):
+    return str(query.statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+
+
+def measure(connection, sql, repeat):
+    if connection.dialect.name == 'postgresql':
+        plan = [row[0] for row in connection.exec_driver_sql(f'EXPLAIN ANALYZE {sql}')]
+    else:
+        plan = [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        connection.exec_driver_sql(sql).fetchall()
+        timings.append(time.perf_counter() - start)
+    return plan, statistics.median(timings) * 1000
+
+
+def run_all(engine, statements, repeat):
+    with engine.connect() as connection:
+        connection.exec_driver_sql('ANALYZE')
+        return {label: measure(connection, sql, repeat) for label, sql in statements}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--classrooms', type=int, default=40)
+    parser.add_argument('--students', type=int, default=40, help='students per classroom')
+    parser.add_argument('--teachers', type=int, default=60)
+    parser.add_argument('--evaluations', type=int, default=6, help='evaluations per classroom')
+    parser.add_argument('--days', type=int, default=60, help='days of attendance')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--plans', action='store_true', help='print full plans')
+    args = parser.parse_args()
+
+    from app import db
+    import logging
+    logging.getLogger('app').setLevel(logging.ERROR)
+
+    app = make_app()
+    reset_schema(app)
+    ids = seed(app, classrooms=args.classrooms, students_per_classroom=args.students, teachers=args.teachers)
+    period_id = seed_activity(app, ids, evaluations_per_classroom=args.evaluations, attendance_days=args.days)
+
+    with app.app_context():
+        engine = db.engine
+        statements = [(label, to_sql(query, engine.dialect)) for label, query in hot_queries(ids, period_id)]
+        indexes = [index for table in db.metadata.tables.values() for index in table.indexes
+                   if index.name in HOT_INDEXES]
+        missing = set(HOT_INDEXES) - {index.name for index in indexes}
+        missing |= set(UNIQUE_CONSTRAINTS) - {constraint.name for table in db.metadata.tables.values()
+                                              for constraint in table.constraints}
+        assert not missing, f'indexes missing from the models: {sorted(missing)}'
+
+        with engine.begin() as connection:
+            for index in indexes:
+                index.drop(connection)
+        before = run_all(engine, statements, args.repeat)
+
+        with engine.begin() as connection:
+            for index in indexes:
+                index.create(connection)
+        after = run_all(engine, statements, args.repeat)
+
+    print(f'{engine.dialect.name}, {args.classrooms * args.students} students, '
+          f'{args.classrooms * args.students * args.days} attendance rows, median of {args.repeat} runs\n')
+    for label, _ in statements:
+        (plan_before, ms_before), (plan_after, ms_after) = before[label], after[label]
+        print(f'{label:<36} {ms_before:8.2f} ms -> {ms_after:7.2f} ms  x{ms_before / max(ms_after, 1e-6):.1f}')
+        if args.plans or engine.dialect.name == 'sqlite':
+            for title, plan in (('before', plan_before), ('after', plan_after)):
+                lines = plan if args.plans else [' | '.join(plan)]
+                for line in lines:
+                    print(f'    {title:<6} {line}')
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,9 @@ from app import create_app, db
 from app.models import *
 from flask import Flask
 from flask_cors import CORS
+from flask.cli import AppGroup
+import click
+import sys
 
 app = create_app()
 
@@ -31,5 +34,66 @@ def create_admin():
     db.session.commit()
     print("Admin user created! Email: admin@ecole.com, Password: admin123")
 
+attendance_cli = AppGroup('attendance', help='Attendance maintenance commands')
+
+@attendance_cli.command('rebuild-rollups')
+def rebuild_attendance_rollups():
+    """Recompute attendance rollups from the attendances table"""
+    from app.services.AttendanceRollupService import AttendanceRollupService
+    
+    daily, tallies, bitmaps = AttendanceRollupService.rebuild()
+    db.session.commit()
+    print(f"Attendance rollups rebuilt: {daily} classroom-days, {tallies} student-period tallies, "
+          f"{bitmaps} student-period bitmaps")
+
+app.cli.add_command(attendance_cli)
+
+grades_cli = AppGroup('grades', help='Grade maintenance commands')
+
+@grades_cli.command('recompute')
+@click.option('--evaluation', 'evaluation_id', type=int, help='Only this evaluation')
+@click.option('--classroom', 'classroom_id', type=int, help='Only this classroom')
+@click.option('--period', 'period_id', type=int, help='Only this evaluation period')
+def recompute_grades(evaluation_id, classroom_id, period_id):
+    """Recompute percentages and letters from points, max_points and the grading scales"""
+    from app.services.GradingScaleService import GradingScaleService
+    
+    regraded = GradingScaleService.recompute(evaluation_id, [classroom_id] if classroom_id else None, period_id)
+    db.session.commit()
+    print(f"Grades recomputed: {regraded} changed")
+
+app.cli.add_command(grades_cli)
+
+reports_cli = AppGroup('reports', help='Report card commands')
+
+@reports_cli.command('generate-all')
+@click.option('--period', 'period_id', type=int, required=True, help='Evaluation period')
+@click.option('--workers', type=int, help='Worker processes (default REPORTS_WORKERS, the number of CPUs)')
+@click.option('--resume', is_flag=True, help='Skip the classrooms done by the last run for this period')
+@click.option('--no-pdf', is_flag=True, help='Only write the report cards, without rendering PDFs')
+def generate_all_reports(period_id, workers, resume, no_pdf):
+    """Generate every classroom's report cards and PDFs in parallel"""
+    from app.models.EvaluationPeriod import EvaluationPeriod
+    from app.services.ReportService import ReportService
+    
+    if db.session.get(EvaluationPeriod, period_id) is None:
+        raise click.BadParameter(f'Evaluation period {period_id} not found', param_hint='--period')
+    
+    def progress(done, total, classroom_id, result):
+        if isinstance(result, Exception):
+            click.echo(f"\nClassroom {classroom_id} failed: {result}", err=True)
+        click.echo(f"\rClassrooms {done}/{total}", nl=done == total)
+    
+    summary = ReportService.generate_all(period_id, workers, resume, not no_pdf, progress)
+    
+    click.echo(f"Run {summary['run_id']}: {summary['written']} report cards, {summary['pdfs']} PDFs, "
+          f"{summary['skipped']} students skipped in {summary['seconds']} s "
+          f"({summary['classrooms']} classrooms, {summary['resumed']} already done)")
+    if summary['failed']:
+        click.echo(f"Failed classrooms: {', '.join(map(str, summary['failed']))}; rerun with --resume", err=True)
+        sys.exit(1)
+
+app.cli.add_command(reports_cli)
+
 if __name__ == '__main__':
     app.run(debug=True)
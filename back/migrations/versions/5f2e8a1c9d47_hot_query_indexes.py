@@ -0,0 +1,62 @@
+"""hot query indexes
+
+Revision ID: 5f2e8a1c9d47
+Revises: bd8a6e6aa9c6
+Create Date: 2026-10-16 15:02:44.671208
+
+Composite and partial indexes for the filters the list routes actually run
+(see benchmarks/explain_hot_queries.py for the plans before and after).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f2e8a1c9d47'
+down_revision = 'bd8a6e6aa9c6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Attendance by classroom and day, and a student's history by date
+    op.create_index('ix_attendances_classroom_id_date', 'attendances', ['classroom_id', 'date'], unique=False)
+    op.create_index('ix_attendances_student_id_date', 'attendances', ['student_id', 'date'], unique=False)
+
+    # Grades of a student / of an evaluation, evaluations of a period per classroom
+    op.create_index('ix_grades_student_id_evaluation_id', 'grades', ['student_id', 'evaluation_id'], unique=False)
+    op.create_index(op.f('ix_grades_evaluation_id'), 'grades', ['evaluation_id'], unique=False)
+    op.create_index('ix_evaluations_evaluation_period_id_classroom_id', 'evaluations',
+                    ['evaluation_period_id', 'classroom_id'], unique=False)
+    op.create_index(op.f('ix_evaluations_created_by'), 'evaluations', ['created_by'], unique=False)
+
+    op.create_index('ix_report_cards_student_id_evaluation_period_id', 'report_cards',
+                    ['student_id', 'evaluation_period_id'], unique=False)
+
+    # Partial indexes: only enrolled students and active assignments are looked up
+    op.create_index('ix_students_classroom_id_enrolled', 'students', ['classroom_id'], unique=False,
+                    postgresql_where=sa.text('is_enrolled'), sqlite_where=sa.text('is_enrolled = 1'))
+    op.create_index('ix_teacher_subject_classroom_active', 'teacher_subject_classroom',
+                    ['teacher_id', 'classroom_id'], unique=False,
+                    postgresql_where=sa.text('is_active'), sqlite_where=sa.text('is_active = 1'))
+
+    # User -> profile lookups on every authenticated request, head teacher lookups
+    op.create_index(op.f('ix_students_user_id'), 'students', ['user_id'], unique=False)
+    op.create_index(op.f('ix_teachers_user_id'), 'teachers', ['user_id'], unique=False)
+    op.create_index(op.f('ix_classrooms_head_teacher_id'), 'classrooms', ['head_teacher_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_classrooms_head_teacher_id'), table_name='classrooms')
+    op.drop_index(op.f('ix_teachers_user_id'), table_name='teachers')
+    op.drop_index(op.f('ix_students_user_id'), table_name='students')
+    op.drop_index('ix_teacher_subject_classroom_active', table_name='teacher_subject_classroom')
+    op.drop_index('ix_students_classroom_id_enrolled', table_name='students')
+    op.drop_index('ix_report_cards_student_id_evaluation_period_id', table_name='report_cards')
+    op.drop_index(op.f('ix_evaluations_created_by'), table_name='evaluations')
+    op.drop_index('ix_evaluations_evaluation_period_id_classroom_id', table_name='evaluations')
+    op.drop_index(op.f('ix_grades_evaluation_id'), table_name='grades')
+    op.drop_index('ix_grades_student_id_evaluation_id', table_name='grades')
+    op.drop_index('ix_attendances_student_id_date', table_name='attendances')
+    op.drop_index('ix_attendances_classroom_id_date', table_name='attendances')
@@ -0,0 +1,33 @@
+"""attendance unique student date
+
+Revision ID: 9e4fc304097d
+Revises: 5f2e8a1c9d47
+Create Date: 2026-10-16 16:10:37.209514
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4fc304097d'
+down_revision = '5f2e8a1c9d47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the latest record when a student was marked twice on the same day
+    op.execute(
+        'DELETE FROM attendances WHERE id NOT IN '
+        '(SELECT MAX(id) FROM attendances GROUP BY student_id, date)'
+    )
+    # The unique constraint's index replaces the plain (student_id, date) one
+    op.drop_index('ix_attendances_student_id_date', table_name='attendances')
+    with op.batch_alter_table('attendances', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_attendances_student_id_date', ['student_id', 'date'])
+
+
+def downgrade():
+    with op.batch_alter_table('attendances', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_attendances_student_id_date', type_='unique')
+    op.create_index('ix_attendances_student_id_date', 'attendances', ['student_id', 'date'], unique=False)
@@ -0,0 +1,38 @@
+"""grades unique student evaluation
+
+Revision ID: ddf100969580
+Revises: 4387c01e6dc6
+Create Date: 2026-10-16 21:03:18.902215
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'ddf100969580'
+down_revision = '4387c01e6dc6'
+branch_labels = None
+depends_on = None
+
+_DUPLICATES = 'SELECT id FROM grades WHERE id NOT IN (SELECT MAX(id) FROM grades GROUP BY student_id, evaluation_id)'
+
+
+def upgrade():
+    # Keep the latest grade when a student was graded twice for the same
+    # evaluation, and tell offline clients about the ones removed
+    op.execute(
+        'INSERT INTO sync_tombstones (table_name, row_id, classroom_id, deleted_at) '
+        "SELECT 'grades', g.id, e.classroom_id, CURRENT_TIMESTAMP FROM grades g "
+        f'LEFT JOIN evaluations e ON e.id = g.evaluation_id WHERE g.id IN ({_DUPLICATES})'
+    )
+    op.execute(f'DELETE FROM grades WHERE id IN ({_DUPLICATES})')
+    # The unique constraint's index replaces the plain (student_id, evaluation_id) one
+    op.drop_index('ix_grades_student_id_evaluation_id', table_name='grades')
+    with op.batch_alter_table('grades', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_grades_student_id_evaluation_id', ['student_id', 'evaluation_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('grades', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_grades_student_id_evaluation_id', type_='unique')
+    op.create_index('ix_grades_student_id_evaluation_id', 'grades', ['student_id', 'evaluation_id'], unique=False)
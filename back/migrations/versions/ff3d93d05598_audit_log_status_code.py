@@ -0,0 +1,26 @@
+"""audit log status code
+
+Revision ID: ff3d93d05598
+Revises: 4c24184192f8
+Create Date: 2026-10-16 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ff3d93d05598'
+down_revision = '4c24184192f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('status_code', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+        batch_op.drop_column('status_code')
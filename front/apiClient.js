@@ -5,6 +5,9 @@ export class ApiClient {
         this.authManager = authManager;
         this.requestInterceptors = [];
         this.responseInterceptors = [];
+        // GET url -> { etag, body } of the last 200 that carried an ETag
+        this.etagCache = new Map();
+        this.etagCacheSize = API_CONFIG.etagCacheSize || 100;
     }
 
     // Helper method to extract endpoint information from config
@@ -256,6 +259,11 @@ export class ApiClient {
                 recorded_at: record.recorded_at || new Date().toISOString()
             }));
         }
+
+        // Batch of roll calls (several classrooms or days in one request)
+        if (Array.isArray(data.roll_calls)) {
+            transformed.roll_calls = data.roll_calls.map(rollCall => this.transformAttendanceData(rollCall));
+        }
         
         return transformed;
     }
@@ -297,6 +305,21 @@ export class ApiClient {
     }
 
     async call(method, endpoint, data = null, requiresAuth = true, ...endpointParams) {
+        try {
+            return await this.send(method, endpoint, data, requiresAuth, ...endpointParams);
+        } catch (error) {
+            // Access tokens are short-lived: renew once with the refresh token and retry
+            if (error.tokenExpired && await this.authManager.refreshAccessToken()) {
+                return this.send(method, endpoint, data, requiresAuth, ...endpointParams);
+            }
+            if (error.tokenExpired) {
+                this.authManager.logout();
+            }
+            throw error;
+        }
+    }
+
+    async send(method, endpoint, data = null, requiresAuth = true, ...endpointParams) {
         const headers = {
             'Content-Type': 'application/json',
             'Accept': 'application/json',
@@ -336,6 +359,13 @@ export class ApiClient {
             timeout: API_CONFIG.timeout || 15000
         };
 
+        // Revalidate instead of refetching lists we already have
+        const url = `${API_CONFIG.baseUrl}${endpointInfo.path}`;
+        const cached = config.method === 'GET' ? this.etagCache.get(url) : null;
+        if (cached) {
+            headers['If-None-Match'] = cached.etag;
+        }
+
         // FIX: Transform data before sending to backend
         if (data && ['POST', 'PUT', 'PATCH'].includes(method.toUpperCase())) {
             const transformedData = this.transformDataForBackend(data, endpointInfo.path);
@@ -348,7 +378,6 @@ export class ApiClient {
         }
 
         try {
-            const url = `${API_CONFIG.baseUrl}${endpointInfo.path}`;
             console.log('Making API call to:', url, 'Method:', method, 'Auth required:', needsAuth);
             
             // Create AbortController for timeout
@@ -366,10 +395,19 @@ export class ApiClient {
                 await interceptor(response);
             }
             
+            // Not modified since the cached copy: skip the body entirely
+            if (response.status === 304 && cached) {
+                return structuredClone(cached.body);
+            }
+
             // Handle authentication errors
             if (response.status === 401) {
-                this.authManager.logout();
-                throw new Error('Session expired. Please login again.');
+                const error = new Error('Session expired. Please login again.');
+                error.tokenExpired = needsAuth;
+                if (!needsAuth) {
+                    this.authManager.logout();
+                }
+                throw error;
             }
 
             // Handle forbidden errors
@@ -396,6 +434,10 @@ export class ApiClient {
             const contentType = response.headers.get('content-type');
             if (contentType && contentType.includes('application/json')) {
                 const result = await response.json();
+                const etag = response.headers.get('ETag');
+                if (config.method === 'GET' && etag) {
+                    this.rememberETag(url, etag, result);
+                }
                 return result;
             } else {
                 return await response.text();
@@ -415,6 +457,19 @@ export class ApiClient {
         }
     }
 
+    rememberETag(url, etag, body) {
+        this.etagCache.delete(url);
+        if (this.etagCache.size >= this.etagCacheSize) {
+            // Map keeps insertion order: drop the least recently stored entry
+            this.etagCache.delete(this.etagCache.keys().next().value);
+        }
+        this.etagCache.set(url, { etag, body: structuredClone(body) });
+    }
+
+    clearETagCache() {
+        this.etagCache.clear();
+    }
+
     // Convenience methods with proper parameter handling
     async get(endpoint, requiresAuth = true, ...params) {
         return this.call('GET', endpoint, null, requiresAuth, ...params);
@@ -533,6 +533,7 @@ class SchoolManagementApp {
                     if (!classroomId || !periodId) {
                         throw new Error('Classroom and evaluation period are required for classroom reports');
                     }
+                    await this.gradesReportsManager.generateClassroomReportCards(classroomId, periodId);
                     reports = await this.gradesReportsManager.loadClassroomReports(classroomId, periodId);
                     break;
                     
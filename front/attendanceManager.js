@@ -49,6 +49,46 @@ export class AttendanceManager {
         }
     }
 
+    // Students x dates grid in a single request; see decodeAttendanceMatrix
+    async loadAttendanceMatrix(classroomId, start, end) {
+        if (!classroomId || !start || !end) {
+            throw new Error('Classroom ID, start and end dates are required');
+        }
+
+        try {
+            const endpointConfig = resolveEndpoint(API_CONFIG.endpoints.attendance.classroomMatrix, classroomId);
+            const matrix = await this.authManager.apiClient.get({
+                ...endpointConfig,
+                path: `${endpointConfig.path}?start=${start}&end=${end}`
+            });
+            return this.decodeAttendanceMatrix(matrix);
+        } catch (error) {
+            console.error('Error loading attendance matrix:', error);
+            this.showMessage(`Failed to load attendance: ${error.message}`, 'error');
+            return null;
+        }
+    }
+
+    // Each cell is one digit per date: 0 = not recorded, n = statuses[n - 1]
+    decodeAttendanceMatrix(matrix) {
+        if (!matrix || !Array.isArray(matrix.students)) {
+            return null;
+        }
+        const statuses = matrix.statuses || [];
+        const totalsByStatus = (totals = []) => Object.fromEntries(statuses.map((status, i) => [status, totals[i] || 0]));
+
+        return {
+            dates: matrix.dates || [],
+            statuses,
+            students: matrix.students.map(student => ({
+                ...student,
+                statuses: Array.from(student.cells || '', code => statuses[Number(code) - 1] || null),
+                totals: totalsByStatus(student.totals)
+            })),
+            dateTotals: (matrix.date_totals || []).map(totalsByStatus)
+        };
+    }
+
     async loadTeacherAttendance(teacherId, date) {
         if (!teacherId) {
             throw new Error('Teacher ID is required');
@@ -225,6 +265,9 @@ export class AttendanceManager {
                 <button class="btn btn-info" onclick="window.attendanceManager.generateAttendanceSummary('${classroomId}', '${date}')" ${students.length === 0 ? 'disabled' : ''}>
                     <i class="fas fa-chart-bar"></i> Summary
                 </button>
+                <button class="btn btn-info" onclick="window.attendanceManager.showMonthlyAttendance('${classroomId}', '${date}')" ${students.length === 0 ? 'disabled' : ''}>
+                    <i class="fas fa-calendar-alt"></i> Month
+                </button>
             </div>
         `;
         
@@ -666,6 +709,59 @@ export class AttendanceManager {
         return summary;
     }
 
+    // Month of the given date, loaded with one matrix request instead of one request per day
+    async showMonthlyAttendance(classroomId, date) {
+        const [year, month] = date.split('-').map(Number);
+        const lastDay = new Date(year, month, 0).getDate();
+        const pad = (n) => String(n).padStart(2, '0');
+        const start = `${year}-${pad(month)}-01`;
+        const end = `${year}-${pad(month)}-${pad(lastDay)}`;
+
+        const matrix = await this.loadAttendanceMatrix(classroomId, start, end);
+        if (!matrix) {
+            return;
+        }
+        if (matrix.students.length === 0) {
+            this.showMessage('No students found for this classroom', 'info');
+            return;
+        }
+
+        const initials = { present: 'P', absent: 'A', late: 'L', excused: 'E' };
+        const header = matrix.dates.map(d => `<th>${Number(d.slice(8))}</th>`).join('');
+        const rows = matrix.students.map(student => {
+            const attended = student.totals.present + student.totals.late;
+            const recorded = attended + student.totals.absent + student.totals.excused;
+            const rate = recorded > 0 ? Math.round((attended / recorded) * 100) : null;
+            const cells = student.statuses.map(status => status
+                ? `<td class="status-indicator ${status}" title="${status}">${initials[status] || '?'}</td>`
+                : '<td></td>').join('');
+            return `
+                <tr>
+                    <td>${this.escapeHtml(student.first_name || 'N/A')} ${this.escapeHtml(student.last_name || 'N/A')}</td>
+                    ${cells}
+                    <td><strong>${rate === null ? '-' : rate + '%'}</strong></td>
+                </tr>
+            `;
+        }).join('');
+        const absentRow = matrix.dateTotals.map(totals => `<td>${totals.absent || ''}</td>`).join('');
+
+        const content = `
+            <div class="attendance-matrix-wrapper">
+                <table class="data-table attendance-matrix">
+                    <thead><tr><th>Student</th>${header}<th>Rate</th></tr></thead>
+                    <tbody>${rows}</tbody>
+                    <tfoot><tr><th>Absent</th>${absentRow}<td></td></tr></tfoot>
+                </table>
+            </div>
+        `;
+
+        if (window.uiUtils && typeof window.uiUtils.showModal === 'function') {
+            window.uiUtils.showModal(content, `Attendance ${start} to ${end}`);
+        }
+
+        return matrix;
+    }
+
     generateAttendanceReport(students, attendanceData) {
         const report = {
             totalStudents: students.length,
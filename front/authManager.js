@@ -7,6 +7,8 @@ export class AuthManager {
         this.currentUser = null;
         this.selectedRole = 'teacher';
         this.token = null;
+        this.refreshToken = null;
+        this.refreshPromise = null;
         this.apiClient = new ApiClient(this);
         this.clockInterval = null;
         this.initializeAuth();
@@ -18,6 +20,7 @@ export class AuthManager {
         if (savedData && savedData.token && savedData.user) {
             this.currentUser = savedData.user;
             this.token = savedData.token;
+            this.refreshToken = savedData.refreshToken || null;
             this.showDashboard();
         }
 
@@ -276,8 +279,9 @@ export class AuthManager {
             
             if (response && response.access_token && response.user) {
                 this.token = response.access_token;
+                this.refreshToken = response.refresh_token || null;
                 this.currentUser = response.user;
-                this.storeAuth(response.user, response.access_token);
+                this.storeAuth(response.user, response.access_token, this.refreshToken);
                 this.showMessage('Login successful!', 'success');
                 
                 window.dispatchEvent(new CustomEvent('userLoggedIn', { 
@@ -759,9 +763,9 @@ export class AuthManager {
         }
     }
 
-    storeAuth(user, token) {
+    storeAuth(user, token, refreshToken = this.refreshToken) {
         try {
-            const authData = { user: user, token: token };
+            const authData = { user: user, token: token, refreshToken: refreshToken };
             localStorage.setItem('school_auth', JSON.stringify(authData));
         } catch (error) {
             console.error('Error storing auth data:', error);
@@ -779,11 +783,46 @@ export class AuthManager {
         }
     }
 
+    // Exchange the refresh token for a new access token (no password needed).
+    // Concurrent callers share one request. Resolves to true on success.
+    async refreshAccessToken() {
+        if (!this.refreshToken) return false;
+        
+        if (!this.refreshPromise) {
+            this.refreshPromise = (async () => {
+                try {
+                    const endpoint = API_CONFIG.endpoints.auth.refreshToken;
+                    const response = await fetch(`${API_CONFIG.baseUrl}${endpoint.path}`, {
+                        method: endpoint.method,
+                        headers: {
+                            'Accept': 'application/json',
+                            'Authorization': `Bearer ${this.refreshToken}`
+                        }
+                    });
+                    if (!response.ok) return false;
+                    
+                    const data = await response.json();
+                    this.token = data.access_token;
+                    this.storeAuth(this.currentUser, this.token, this.refreshToken);
+                    return true;
+                } catch (error) {
+                    console.error('Token refresh failed:', error);
+                    return false;
+                } finally {
+                    this.refreshPromise = null;
+                }
+            })();
+        }
+        return this.refreshPromise;
+    }
+
     logout() {
         console.log('Logout initiated');
         
         this.currentUser = null;
         this.token = null;
+        this.refreshToken = null;
+        this.apiClient.clearETagCache();
         
         try {
             localStorage.removeItem('school_auth');
@@ -315,6 +315,11 @@ export const API_CONFIG = {
         method: 'POST',
         requiredRole: [ROLES.TEACHER, ROLES.ADMIN]
       },
+      bulk: {
+        path: '/grades/bulk',
+        method: 'POST',
+        requiredRole: [ROLES.TEACHER, ROLES.ADMIN]
+      },
       update: (gradeId) => ({ 
         path: `/grades/${gradeId}`, 
         method: 'PUT',
@@ -335,6 +340,31 @@ export const API_CONFIG = {
         method: 'GET',
         requiredRole: [ROLES.TEACHER, ROLES.ADMIN]
       }),
+      classroomGradebook: (classroomId, periodId) => ({
+        path: `/grades/classroom/${classroomId}/period/${periodId}/matrix`,
+        method: 'GET',
+        requiredRole: [ROLES.TEACHER, ROLES.ADMIN]
+      }),
+      classroomAverages: (classroomId, periodId) => ({
+        path: `/grades/averages/classroom/${classroomId}/period/${periodId}`,
+        method: 'GET',
+        requiredRole: [ROLES.TEACHER, ROLES.ADMIN]
+      }),
+      schoolAverages: (periodId) => ({
+        path: `/grades/averages/period/${periodId}`,
+        method: 'GET',
+        requiredRole: [ROLES.ADMIN]
+      }),
+      evaluationStats: (evaluationId) => ({
+        path: `/grades/stats/evaluation/${evaluationId}`,
+        method: 'GET',
+        requiredRole: [ROLES.TEACHER, ROLES.ADMIN]
+      }),
+      subjectStats: (classroomId, periodId, subjectId) => ({
+        path: `/grades/stats/classroom/${classroomId}/period/${periodId}/subject/${subjectId}`,
+        method: 'GET',
+        requiredRole: [ROLES.TEACHER, ROLES.ADMIN]
+      }),
       teacherGrades: (teacherId) => ({ 
         path: `/grades/teacher/${teacherId}`, 
         method: 'GET',
@@ -349,6 +379,21 @@ export const API_CONFIG = {
         method: 'POST',
         requiredRole: [ROLES.TEACHER, ROLES.ADMIN]
       }),
+      generateClassroom: (classroomId, periodId) => ({
+        path: `/reports/generate/classroom/${classroomId}/${periodId}`,
+        method: 'POST',
+        requiredRole: [ROLES.TEACHER, ROLES.ADMIN]
+      }),
+      generateSchool: (periodId) => ({
+        path: `/reports/generate/school/${periodId}`,
+        method: 'POST',
+        requiredRole: [ROLES.ADMIN]
+      }),
+      batches: {
+        path: '/reports/batches',
+        method: 'GET',
+        requiredRole: [ROLES.ADMIN]
+      },
       classroomReports: (classroomId, periodId) => ({ 
         path: `/reports/classroom/${classroomId}/period/${periodId}`, 
         method: 'GET',
@@ -378,6 +423,11 @@ export const API_CONFIG = {
         method: 'GET',
         requiredRole: [ROLES.TEACHER, ROLES.ADMIN]
       }),
+      classroomMatrix: (classroomId) => ({ 
+        path: `/attendance/classroom/${classroomId}/matrix`, 
+        method: 'GET',
+        requiredRole: [ROLES.TEACHER, ROLES.ADMIN]
+      }),
       studentAttendance: (studentId) => ({ 
         path: `/attendance/student/${studentId}`, 
         method: 'GET',
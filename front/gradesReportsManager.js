@@ -29,6 +29,40 @@ export class GradesReportsManager {
         }
     }
 
+    // Grade a whole evaluation in one request: entries are {student_id, points, comments}.
+    // With partial, valid rows are saved even if others are rejected.
+    async addGrades(evaluationId, entries, { partial = false } = {}) {
+        if (!evaluationId || !Array.isArray(entries) || entries.length === 0) {
+            throw new Error('An evaluation and at least one grade are required');
+        }
+
+        try {
+            const result = await this.authManager.apiClient.post(
+                API_CONFIG.endpoints.grades.bulk,
+                {
+                    evaluation_id: parseInt(evaluationId),
+                    partial: Boolean(partial),
+                    grades: entries.map(entry => ({
+                        student_id: parseInt(entry.student_id),
+                        points: parseFloat(entry.points ?? entry.points_earned ?? entry.grade),
+                        comments: entry.comments || null,
+                        is_excused: Boolean(entry.is_excused || false)
+                    }))
+                }
+            );
+            const rejected = result.errors ? result.errors.length : 0;
+            this.authManager.showMessage(
+                rejected ? `${result.written} grades saved, ${rejected} rejected` : `${result.written} grades saved`,
+                rejected ? 'warning' : 'success'
+            );
+            return result;
+        } catch (error) {
+            console.error('Error adding grades:', error);
+            this.authManager.showMessage('Failed to add grades: ' + error.message, 'error');
+            throw error;
+        }
+    }
+
     // FIX: Transform grade data to match backend schema
     transformGradeDataForBackend(gradeData) {
         // Backend expects: student_id, evaluation_id, subject_id, points_earned, points_possible, etc.
@@ -187,6 +221,110 @@ export class GradesReportsManager {
         }
     }
 
+    // Students x evaluations of a classroom for a period in a single request
+    async loadGradebook(classroomId, periodId) {
+        if (!classroomId || !periodId) {
+            throw new Error('Classroom ID and period ID are required');
+        }
+
+        try {
+            const endpointConfig = resolveEndpoint(
+                API_CONFIG.endpoints.grades.classroomGradebook,
+                classroomId,
+                periodId
+            );
+            const gradebook = await this.authManager.apiClient.get(endpointConfig);
+            return this.decodeGradebook(gradebook);
+        } catch (error) {
+            console.error('Error loading gradebook:', error);
+            this.authManager.showMessage('Failed to load gradebook: ' + error.message, 'error');
+            return null;
+        }
+    }
+
+    // The response is columnar: points[i][j] is student i on evaluation j (null = not graded),
+    // averages[i][k] is student i in subject k out of gradebook.scale
+    decodeGradebook(gradebook) {
+        if (!gradebook || !gradebook.students) {
+            return null;
+        }
+        const columns = (table) => Object.keys(table || {});
+        const rowsOf = (table) => (table && table.id ? table.id : []).map((_, i) =>
+            Object.fromEntries(columns(table).map(key => [key, table[key][i]])));
+        const excused = new Set((gradebook.excused || []).map(([i, j]) => `${i}:${j}`));
+        const subjects = rowsOf(gradebook.subjects);
+
+        return {
+            scale: gradebook.scale,
+            evaluations: rowsOf(gradebook.evaluations),
+            subjects,
+            students: rowsOf(gradebook.students).map((student, i) => ({
+                ...student,
+                points: (gradebook.points[i] || []).map((points, j) => ({ points, excused: excused.has(`${i}:${j}`) })),
+                averages: Object.fromEntries(subjects.map((subject, k) => [subject.id, gradebook.averages[i][k]])),
+                overall: gradebook.overall ? gradebook.overall[i] : null
+            }))
+        };
+    }
+
+    // Subject and overall averages out of 20 of a classroom (or, without classroomId, the whole school)
+    async loadAverages(periodId, classroomId = null) {
+        if (!periodId) {
+            throw new Error('Period ID is required');
+        }
+
+        try {
+            const endpointConfig = classroomId
+                ? resolveEndpoint(API_CONFIG.endpoints.grades.classroomAverages, classroomId, periodId)
+                : resolveEndpoint(API_CONFIG.endpoints.grades.schoolAverages, periodId);
+            const averages = await this.authManager.apiClient.get(endpointConfig);
+            const subjectIds = averages.subjects.id;
+            return averages.students.id.map((studentId, i) => ({
+                student_id: studentId,
+                overall: averages.overall[i],
+                subjects: Object.fromEntries(subjectIds.map((subjectId, k) => [subjectId, averages.averages[i][k]]))
+            }));
+        } catch (error) {
+            console.error('Error loading averages:', error);
+            return [];
+        }
+    }
+
+    // Mean, median, std, min/max and histogram {edges, counts} of an evaluation's points
+    async loadEvaluationStats(evaluationId) {
+        if (!evaluationId) {
+            throw new Error('Evaluation ID is required');
+        }
+
+        try {
+            const endpointConfig = resolveEndpoint(API_CONFIG.endpoints.grades.evaluationStats, evaluationId);
+            return await this.authManager.apiClient.get(endpointConfig);
+        } catch (error) {
+            console.error('Error loading evaluation statistics:', error);
+            return null;
+        }
+    }
+
+    // Same statistics over a subject's grades in a classroom and period, scaled to 20
+    async loadSubjectStats(classroomId, periodId, subjectId) {
+        if (!classroomId || !periodId || !subjectId) {
+            throw new Error('Classroom ID, period ID and subject ID are required');
+        }
+
+        try {
+            const endpointConfig = resolveEndpoint(
+                API_CONFIG.endpoints.grades.subjectStats,
+                classroomId,
+                periodId,
+                subjectId
+            );
+            return await this.authManager.apiClient.get(endpointConfig);
+        } catch (error) {
+            console.error('Error loading subject statistics:', error);
+            return null;
+        }
+    }
+
     async deleteGrade(gradeId) {
         if (!gradeId) {
             throw new Error('Grade ID is required');
@@ -299,6 +437,46 @@ export class GradesReportsManager {
         }
     }
 
+    // Report cards of a whole classroom, ranked, in one request; returns the batch {written, skipped, duration_ms}
+    async generateClassroomReportCards(classroomId, periodId, comments = null) {
+        if (!classroomId || !periodId) {
+            throw new Error('Classroom ID and period ID are required');
+        }
+
+        try {
+            const endpointConfig = resolveEndpoint(
+                API_CONFIG.endpoints.reports.generateClassroom,
+                classroomId,
+                periodId
+            );
+            const result = await this.authManager.apiClient.post(endpointConfig, { teacher_comments: comments });
+            this.authManager.showMessage(result.message, 'success');
+            return result.batch;
+        } catch (error) {
+            console.error('Error generating classroom report cards:', error);
+            this.authManager.showMessage('Failed to generate report cards: ' + error.message, 'error');
+            throw error;
+        }
+    }
+
+    // Report cards of every enrolled student (admin), signed by each classroom's head teacher
+    async generateSchoolReportCards(periodId) {
+        if (!periodId) {
+            throw new Error('Period ID is required');
+        }
+
+        try {
+            const endpointConfig = resolveEndpoint(API_CONFIG.endpoints.reports.generateSchool, periodId);
+            const result = await this.authManager.apiClient.post(endpointConfig, {});
+            this.authManager.showMessage(result.message, 'success');
+            return result.batch;
+        } catch (error) {
+            console.error('Error generating school report cards:', error);
+            this.authManager.showMessage('Failed to generate report cards: ' + error.message, 'error');
+            throw error;
+        }
+    }
+
     async loadClassroomReports(classroomId, periodId) {
         if (!classroomId) {
             throw new Error('Classroom ID is required');